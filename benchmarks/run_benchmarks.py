@@ -0,0 +1,266 @@
+"""grinaの公開関数のベンチマーク
+
+node.py / network.py / core.pyの全ての公開関数を、シードを固定した合成グラフ
+（Erdős–Rényi, Barabási–Albert, 相互性の高い有向グラフ）で実行し、
+実行時間・ピークメモリ（RSS）・スループット（エッジ数/秒）をJSONに記録する。
+計測は指標ごとに別プロセスで行い、他の指標のメモリ使用量の影響を受けないようにする。
+
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 --output result.json
+    python benchmarks/run_benchmarks.py --baseline result.json  # 回帰の検出
+"""
+import argparse
+import inspect
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+GRAPHS = ("er", "ba", "reciprocal")
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+MODULES = ("grina.node", "grina.network", "grina.core")
+# 全ノードからの探索を行う指標は、このエッジ数を超えるグラフでは実行しない
+ALL_PAIRS_METRICS = (
+    "calc_close_centralities",
+    "calc_between_centralities",
+    "betweenness_centrality_parallel",
+    "approximate_betweenness_centrality",
+    "get_degree_expansion_elongation",
+    "get_distance_profile",
+)
+ALL_PAIRS_MAX_EDGES = 100_000
+# 無向グラフのみを受け付ける指標
+UNDIRECTED_METRICS = ("components_density", "components_size")
+# グラフ以外に引数が必要な指標
+EXTRA_KWARGS = {
+    "approximate_betweenness_centrality": {"epsilon": 0.05, "seed": 0},
+}
+
+
+def make_graph(kind, n_edges, seed=0):
+    """シードを固定した合成有向グラフを作る。
+
+    Args:
+        kind (str): "er"（平均次数10のErdős–Rényi）, "ba"（m=3のBarabási–Albert、向きは一様乱数）
+            or "reciprocal"（エッジの半分に逆向きのエッジがある）
+        n_edges (int): おおよそのエッジ数
+        seed (int, optional): 乱数のシード
+
+    Returns:
+        nx.DiGraph: 有向グラフ
+    """
+    import networkx as nx
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    if kind == "er":
+        n = max(n_edges // 10, 2)
+        src = rng.integers(0, n, n_edges)
+        dst = rng.integers(0, n, n_edges)
+    elif kind == "ba":
+        n = max(n_edges // 3, 4)
+        g = nx.barabasi_albert_graph(n, 3, seed=seed)
+        edges = np.array(g.edges(), dtype=np.int64).reshape(-1, 2)
+        flip = rng.random(len(edges)) < 0.5
+        src = np.where(flip, edges[:, 1], edges[:, 0])
+        dst = np.where(flip, edges[:, 0], edges[:, 1])
+    elif kind == "reciprocal":
+        n = max(n_edges // 10, 2)
+        half = n_edges * 2 // 3
+        src = rng.integers(0, n, half)
+        dst = rng.integers(0, n, half)
+        back = rng.random(half) < 0.5
+        src, dst = np.concatenate([src, dst[back]]), np.concatenate([dst, src[back]])
+    else:
+        raise ValueError(f"Unknown graph: {kind}")
+    dg = nx.DiGraph()
+    dg.add_nodes_from(range(n))
+    dg.add_edges_from(zip(src.tolist(), dst.tolist()))
+    return dg
+
+
+def public_metrics():
+    """node.py / network.py / core.pyで定義された公開関数の(モジュール名, 関数名)"""
+    import importlib
+    metrics = []
+    for module_name in MODULES:
+        module = importlib.import_module(module_name)
+        for name, fn in inspect.getmembers(module, inspect.isfunction):
+            if fn.__module__ == module_name and not name.startswith("_"):
+                metrics.append((module_name, name))
+    return metrics
+
+
+def _peak_rss_mb(who=resource.RUSAGE_SELF):
+    rss = resource.getrusage(who).ru_maxrss
+    # macOSはバイト、Linuxはキロバイト
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+def run_one(kind, n_edges, module_name, metric, repeat, seed, warmup=1):
+    """1つの指標を計測する（ワーカープロセスで実行する）。
+    遅延インポートやワーカープールの起動を含めないよう、計測前にwarmup回実行する。
+    ピークRSSはウォームアップも含めたプロセス全体の値とする。"""
+    import importlib
+    dg = make_graph(kind, n_edges, seed)
+    if metric in UNDIRECTED_METRICS:
+        from grina.core import undirected_view
+        dg = undirected_view(dg)
+    fn = getattr(importlib.import_module(module_name), metric)
+    kwargs = EXTRA_KWARGS.get(metric, {})
+    graph_rss = _peak_rss_mb()
+    for _ in range(warmup):
+        fn(dg, **kwargs)
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(dg, **kwargs)
+        times.append(time.perf_counter() - started)
+    from grina.parallel import close_pool
+    close_pool()
+    wall = min(times)
+    return {
+        "wall": wall,
+        "graph_rss_mb": graph_rss,
+        "peak_rss_mb": _peak_rss_mb(),
+        "children_peak_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN),
+        "edges_per_sec": dg.number_of_edges() / wall if wall > 0 else None,
+        "n_nodes": dg.number_of_nodes(),
+        "n_edges": dg.number_of_edges(),
+    }
+
+
+def measure(kind, n_edges, module_name, metric, repeat, seed, timeout, warmup=1):
+    """別プロセスで1つの指標を計測する。"""
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker",
+           kind, str(n_edges), module_name, metric, str(repeat), str(seed),
+           str(warmup)]
+    entry = {"graph": kind, "size": n_edges, "metric": f"{module_name}.{metric}"}
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        entry["status"] = "timeout"
+        return entry
+    if proc.returncode != 0:
+        entry["status"] = "error"
+        entry["error"] = proc.stderr.strip().splitlines()[-1:] or [""]
+        entry["error"] = entry["error"][0]
+        return entry
+    entry.update(json.loads(proc.stdout.strip().splitlines()[-1]))
+    entry["status"] = "ok"
+    return entry
+
+
+def compare(results, baseline, tolerance, min_seconds):
+    """基準の結果と比べて、実行時間またはピークメモリが悪化した計測を返す。
+
+    Args:
+        results (list): 今回の計測結果
+        baseline (list): 基準の計測結果
+        tolerance (float): 許容する悪化の割合（0.25なら25%）
+        min_seconds (float): これより小さい実行時間の差は無視する
+
+    Returns:
+        list: (計測結果, 基準の計測結果, 理由)のリスト
+    """
+    index = {(b["graph"], b["size"], b["metric"]): b for b in baseline}
+    regressions = []
+    for r in results:
+        b = index.get((r["graph"], r["size"], r["metric"]))
+        if b is None or r["status"] != "ok" or b.get("status") != "ok":
+            if b is not None and b.get("status") == "ok" and r["status"] != "ok":
+                regressions.append((r, b, r["status"]))
+            continue
+        if (r["wall"] > b["wall"] * (1 + tolerance)
+                and r["wall"] - b["wall"] > min_seconds):
+            regressions.append((r, b, f"wall {b['wall']:.3f}s -> {r['wall']:.3f}s"))
+        extra = r["peak_rss_mb"] - r["graph_rss_mb"]
+        base_extra = b["peak_rss_mb"] - b["graph_rss_mb"]
+        if extra > max(base_extra, 1.0) * (1 + tolerance) and extra - base_extra > 10:
+            regressions.append((r, b, f"memory +{base_extra:.0f}MB -> +{extra:.0f}MB"))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--graphs", nargs="+", default=list(GRAPHS), choices=GRAPHS)
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES),
+                        help="エッジ数")
+    parser.add_argument("--metrics", nargs="+", default=None,
+                        help="計測する関数名（省略時は全ての公開関数）")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="各指標の実行回数（最小の実行時間を記録する）")
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="計測前に実行する回数（計測に含めない）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--all-pairs-max-edges", type=int, default=ALL_PAIRS_MAX_EDGES)
+    parser.add_argument("--output", default=None, help="結果のJSONの出力先")
+    parser.add_argument("--baseline", default=None, help="比較する基準のJSON")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-seconds", type=float, default=0.05)
+    parser.add_argument("--worker", nargs=7, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        kind, n_edges, module_name, metric, repeat, seed, warmup = args.worker
+        result = run_one(kind, int(n_edges), module_name, metric, int(repeat),
+                         int(seed), int(warmup))
+        print(json.dumps(result))
+        return 0
+
+    metrics = public_metrics()
+    if args.metrics is not None:
+        metrics = [(m, name) for m, name in metrics if name in args.metrics]
+    results = []
+    for kind in args.graphs:
+        for size in args.sizes:
+            for module_name, metric in metrics:
+                if metric in ALL_PAIRS_METRICS and size > args.all_pairs_max_edges:
+                    results.append({"graph": kind, "size": size,
+                                    "metric": f"{module_name}.{metric}",
+                                    "status": "skipped"})
+                    continue
+                entry = measure(kind, size, module_name, metric, args.repeat,
+                                args.seed, args.timeout, args.warmup)
+                results.append(entry)
+                if entry["status"] == "ok":
+                    print(f"{kind:>10} {size:>9} {metric:<40} "
+                          f"{entry['wall']:9.4f}s {entry['peak_rss_mb']:8.1f}MB",
+                          flush=True)
+                else:
+                    print(f"{kind:>10} {size:>9} {metric:<40} {entry['status']}",
+                          flush=True)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance, args.min_seconds)
+        for r, _, reason in regressions:
+            print(f"REGRESSION {r['graph']} {r['size']} {r['metric']}: {reason}")
+        if regressions:
+            return 1
+        print("no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,61 @@
-from grina.node import *
-from grina.network import *
-from grina.core import *
+"""GRIps Network Analysis module.
+
+サブモジュールは最初に属性へアクセスしたときに読み込む（PEP 562）。
+`import grina` の時点ではnumpy/networkx/igraphなどを読み込まない。
+"""
+import importlib
+
+# 以前の `from grina.<module> import *` の順序
+_MODULES = (
+    "node",
+    "network",
+    "core",
+    "compiled",
+    "reciprocity",
+    "table",
+    "eccentricity",
+    "eigenvector",
+    "closeness",
+    "io",
+    "batch",
+    "cache",
+    "stream",
+    "temporal",
+    "backends",
+    "profiling",
+    "scheduler",
+)
+# 属性としては公開するが、中身はトップレベルに公開しないモジュール
+_INTERNAL_MODULES = ("parallel", "aio")
+
+
+def _public_names(module):
+    names = getattr(module, "__all__", None)
+    if names is None:
+        names = [name for name in vars(module) if not name.startswith("_")]
+    return names
+
+
+def __getattr__(name):
+    if name in _MODULES or name in _INTERNAL_MODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    if name == "__all__":
+        names = list(_MODULES + _INTERNAL_MODULES)
+        for module_name in _MODULES:
+            module = importlib.import_module(f"{__name__}.{module_name}")
+            names.extend(n for n in _public_names(module) if n not in names)
+        globals()["__all__"] = names
+        return names
+    if name.startswith("_"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    for module_name in _MODULES:
+        module = importlib.import_module(f"{__name__}.{module_name}")
+        if name in vars(module):
+            value = getattr(module, name)
+            globals()[name] = value
+            return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__getattr__("__all__")))
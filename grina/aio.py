@@ -0,0 +1,147 @@
+import asyncio
+import functools
+import logging
+import weakref
+from grina import node
+from grina.parallel import Job
+
+logger = logging.getLogger("grina")
+
+# イベントループごとに同時に実行する計算の数の上限
+MAX_CONCURRENT_JOBS = 2
+
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def set_max_concurrent_jobs(n):
+    """同時に実行する計算の数の上限を設定する（以降に始める計算から適用する）。
+
+    Raises:
+        ValueError: nが1未満の場合
+    """
+    global MAX_CONCURRENT_JOBS
+    if n < 1:
+        raise ValueError("n must be at least 1")
+    MAX_CONCURRENT_JOBS = n
+    _semaphores.clear()
+
+
+def _semaphore(loop):
+    if loop not in _semaphores:
+        _semaphores[loop] = asyncio.Semaphore(MAX_CONCURRENT_JOBS)
+    return _semaphores[loop]
+
+
+def _run_job(job, fn, args, kwargs):
+    with job:
+        return fn(*args, **kwargs)
+
+
+async def run_metric(fn, *args, progress=None, **kwargs):
+    """指標の関数fn(*args, **kwargs)をスレッドで実行し、結果を待つ。
+    並列計算は呼び出しごとの専用のワーカープールで行う（grina.parallel.Jobを参照）。
+    キャンセルされた場合は作業単位の区切りで計算を中断し、プールのワーカーを
+    終了してからCancelledErrorを送出する。同時に実行する計算の数は
+    イベントループごとにMAX_CONCURRENT_JOBSまでとし、超えた分は順番を待つ。
+    専用のプールのワーカーはforkserverで起動し、メインモジュールを読み込み直すため、
+    スクリプトから呼び出す場合は if __name__ == "__main__": で囲む必要がある
+    （囲んでいない場合はRuntimeErrorを送出する）。
+
+    Args:
+        fn (callable): 指標の関数
+        progress (callable, optional): progress(処理済みの始点数, 始点数)を受け取る関数。
+            イベントループのスレッドで呼び出す。
+
+    Raises:
+        asyncio.CancelledError: キャンセルされた場合
+        RuntimeError: 専用のプールのワーカーが異常終了した場合
+
+    Returns:
+        fnの戻り値
+    """
+    loop = asyncio.get_running_loop()
+    if progress is not None:
+        progress = functools.partial(loop.call_soon_threadsafe, progress)
+    job = Job(progress)
+    async with _semaphore(loop):
+        future = loop.run_in_executor(None, _run_job, job, fn, args, kwargs)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            job.cancel()
+            # 計算が中断し、専用のプールが終了するまで待つ
+            try:
+                await future
+            except Exception:
+                logger.debug(f"{fn.__name__} was cancelled")
+            raise
+
+
+async def get_degree_expansion_elongation(dg, processes=None, progress=None):
+    """grina.node.get_degree_expansion_elongationのawaitable版
+
+    Args:
+        dg (nx.DiGraph or CompiledGraph): 有向グラフ
+        processes (int, optional): プロセス数
+        progress (callable, optional): run_metricを参照
+
+    Returns:
+        tuple: (ノードIDと拡張度の辞書, ノードIDと伸長度の辞書)
+    """
+    return await run_metric(
+        node.get_degree_expansion_elongation, dg, processes, progress=progress
+    )
+
+
+async def get_distance_profile(dg, mode="out", processes=None, progress=None):
+    """grina.node.get_distance_profileのawaitable版
+
+    Args:
+        dg (nx.DiGraph, nx.Graph or CompiledGraph): グラフ
+        mode (str, optional): "out", "in" or "all"
+        processes (int, optional): プロセス数
+        progress (callable, optional): run_metricを参照
+
+    Returns:
+        NodeTable: ノードごとの指標の表
+    """
+    return await run_metric(
+        node.get_distance_profile, dg, mode, processes, progress=progress
+    )
+
+
+async def calc_between_centralities(dg, processes=None, progress=None, **kwargs):
+    """grina.node.calc_between_centralitiesのawaitable版
+    中断と進捗の通知に対応するため、厳密な計算は"numpy"バックエンドで行う。
+
+    Args:
+        dg (nx.DiGraph, nx.Graph or CompiledGraph): グラフ
+        processes (int, optional): プロセス数
+        progress (callable, optional): run_metricを参照
+        **kwargs: calc_between_centralitiesのその他の引数
+
+    Returns:
+        dict: 媒介中心性の降順に並べたノードIDと媒介中心性の辞書
+    """
+    kwargs.setdefault("backend", "numpy")
+    return await run_metric(
+        node.calc_between_centralities, dg, processes, progress=progress, **kwargs
+    )
+
+
+async def calc_close_centralities(dg, progress=None, **kwargs):
+    """grina.node.calc_close_centralitiesのawaitable版
+    中断と進捗の通知に対応するため、"scipy"バックエンドで計算する。
+
+    Args:
+        dg (nx.DiGraph, nx.Graph or CompiledGraph): グラフ
+        progress (callable, optional): run_metricを参照
+        **kwargs: calc_close_centralitiesのその他の引数
+
+    Returns:
+        dict: 近接中心性の降順に並べたノードIDと近接中心性の辞書
+    """
+    kwargs.setdefault("backend", "scipy")
+    return await run_metric(
+        node.calc_close_centralities, dg, progress=progress, **kwargs
+    )
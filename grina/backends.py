@@ -0,0 +1,140 @@
+from contextlib import contextmanager
+import importlib.util
+import logging
+
+logger = logging.getLogger("grina")
+
+# バックエンド名 → 必要なパッケージ
+BACKENDS = {
+    "numpy": "numpy",
+    "scipy": "scipy",
+    "networkx": "networkx",
+    "igraph": "igraph",
+}
+
+_registry = {}
+_current = None
+_available = {}
+
+
+def register(metric, backend):
+    """指標の実装をバックエンドに登録するデコレータ
+
+    Args:
+        metric (str): 指標名（"betweenness"など）
+        backend (str): バックエンド名
+
+    Returns:
+        callable: デコレータ
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}")
+
+    def decorator(fn):
+        _registry.setdefault(metric, {})[backend] = fn
+        return fn
+    return decorator
+
+
+def is_available(backend):
+    """バックエンドのパッケージがインストールされているかを、importせずに確認する。"""
+    if backend not in _available:
+        _available[backend] = importlib.util.find_spec(BACKENDS[backend]) is not None
+    return _available[backend]
+
+
+def available_backends(metric=None):
+    """利用できるバックエンド名のリスト
+
+    Args:
+        metric (str, optional): 指定した場合はその指標の実装があるものに限る
+
+    Returns:
+        list: バックエンド名
+    """
+    names = _registry.get(metric, {}) if metric is not None else BACKENDS
+    return [name for name in names if is_available(name)]
+
+
+def set_backend(backend):
+    """全体で使うバックエンドを設定する。Noneの場合は指標ごとの既定の実装に戻す。
+
+    Raises:
+        ValueError: 未知のバックエンド名の場合
+    """
+    global _current
+    if backend is not None and backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}")
+    _current = backend
+
+
+def get_backend():
+    """全体で使うバックエンド名（未設定の場合はNone）"""
+    return _current
+
+
+@contextmanager
+def use_backend(backend):
+    """withブロックの中だけ全体のバックエンドを切り替える。"""
+    previous = get_backend()
+    set_backend(backend)
+    try:
+        yield
+    finally:
+        set_backend(previous)
+
+
+def dispatch(metric, backend=None):
+    """指標の実装を選ぶ。
+    呼び出しごとの指定 > set_backendの設定 の順に選び、どちらもなければNoneを返す
+    （呼び出し側の既定の実装を使う）。全体の設定にその指標の実装がない場合もNoneとする。
+
+    Args:
+        metric (str): 指標名
+        backend (str, optional): 呼び出しごとに指定したバックエンド名
+
+    Raises:
+        ValueError: 呼び出しごとに指定したバックエンドにその指標の実装がない場合
+        ImportError: 選んだバックエンドのパッケージがない場合
+
+    Returns:
+        callable: 実装の関数、またはNone
+    """
+    implementations = _registry.get(metric, {})
+    if backend is None:
+        backend = _current
+        if backend is None:
+            return None
+        if backend not in implementations:
+            logger.debug(f"{metric} has no {backend} backend; using the default")
+            return None
+    elif backend not in implementations:
+        raise ValueError(
+            f"{metric} is not implemented for backend {backend}. "
+            f"Available: {list(implementations)}"
+        )
+    if not is_available(backend):
+        raise ImportError(f"backend {backend} requires {BACKENDS[backend]}")
+    return implementations[backend]
+
+
+def resolve_metric(name):
+    """指標名（grina.node / grina.networkの公開関数名）から関数を取得する。
+
+    Args:
+        name (str): 指標名
+
+    Raises:
+        ValueError: 未知の指標名の場合
+
+    Returns:
+        callable: 指標の関数
+    """
+    # node / networkはこのモジュールを読み込むため、呼び出し時に読み込む
+    from grina import network, node
+    fn = None
+    if not name.startswith("_"):
+        fn = getattr(node, name, None) or getattr(network, name, None)
+    if fn is None or not callable(fn):
+        raise ValueError(f"Unknown metric: {name}")
+    return fn
@@ -0,0 +1,173 @@
+from collections import deque
+import inspect
+import logging
+import pickle
+import networkx as nx
+from grina.backends import resolve_metric
+from grina.compiled import CompiledGraph, compile_graph
+from grina.parallel import get_pool
+
+logger = logging.getLogger("grina")
+
+# このノード数以下のグラフはワーカーに送らずに計算する
+INLINE_THRESHOLD_NODES = 30
+# 1バッチに詰めるグラフ数とエッジ数の上限
+BATCH_GRAPHS = 256
+BATCH_EDGES = 200_000
+
+
+def _metric_functions(metrics):
+    """指標名（または関数）のリストを(名前, 関数, processesを受け取るか)のリストにする。"""
+    functions = []
+    for metric in metrics:
+        fn = metric if callable(metric) else resolve_metric(metric)
+        name = metric if isinstance(metric, str) else fn.__name__
+        try:
+            takes_processes = "processes" in inspect.signature(fn).parameters
+        except (TypeError, ValueError):
+            takes_processes = False
+        functions.append((name, fn, takes_processes))
+    return functions
+
+
+def _check_picklable(functions):
+    """ワーカーに送る指標の関数がpickleできることを確認する。
+    ラムダ式や関数内で定義した関数はワーカーへ送れないため、計算を始める前にエラーとする。"""
+    for name, fn, _ in functions:
+        try:
+            pickle.dumps(fn)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            raise ValueError(
+                f"metric {name} cannot be sent to worker processes; "
+                "use a module-level function or processes=1"
+            ) from e
+
+
+def _analyze(cg, functions, errors):
+    """1つのグラフについて全ての指標を算出する。"""
+    results = {}
+    for name, fn, takes_processes in functions:
+        try:
+            if takes_processes:
+                results[name] = fn(cg, processes=1)
+            else:
+                results[name] = fn(cg)
+        except (ZeroDivisionError, nx.NetworkXException) as e:
+            if errors == "raise":
+                raise
+            logger.debug(f"{name} is not available: {e}")
+            results[name] = float("nan")
+    return results
+
+
+def _analyze_batch(graphs, functions, errors):
+    return [
+        _analyze(CompiledGraph(*graph), functions, errors) for graph in graphs
+    ]
+
+
+class _Batch:
+    """ワーカーに送るグラフのまとまり"""
+
+    def __init__(self):
+        self.graphs = []
+        self.n_edges = 0
+        self.result = None
+
+    def add(self, cg):
+        # キャッシュ済みのCSRやnetworkxのグラフは送らず、エッジ配列だけを渡す
+        self.graphs.append((cg.nodes, cg.src, cg.dst, cg.weight, cg.directed))
+        self.n_edges += cg.n_edges
+        return len(self.graphs) - 1
+
+    def submit(self, pool, functions, errors):
+        if self.result is None:
+            self.result = pool.apply_async(
+                _analyze_batch, (self.graphs, functions, errors)
+            )
+            self.graphs = None
+
+    def ready(self):
+        return self.result is not None and self.result.ready()
+
+
+def analyze_many(graphs, metrics, processes=None, errors="raise",
+                 inline_threshold=INLINE_THRESHOLD_NODES,
+                 batch_graphs=BATCH_GRAPHS, batch_edges=BATCH_EDGES):
+    """多数のグラフについて指標をまとめて算出し、入力と同じ順に結果を返す。
+    グラフは一度だけCompiledGraphに変換し、全ての指標で使い回す。
+    小さいグラフはプロセス内で計算し、それ以外はエッジ配列のみをバッチに詰めて
+    使い回しのワーカープールに送る。ワーカーでは指標をprocesses=1で実行する。
+    結果は先頭から順に、算出でき次第返す（未完了のバッチは最大でワーカー数の4倍まで）。
+
+    Args:
+        graphs (iterable): nx.Graph, nx.DiGraph or CompiledGraphの列
+        metrics (list): 指標名（grina.node / grina.networkの関数名）または関数のリスト
+        processes (int, optional): プロセス数。1の場合は全てプロセス内で計算する。
+        errors (str, optional): "raise"の場合は例外をそのまま送出し、
+            "nan"の場合はZeroDivisionErrorとnx.NetworkXExceptionをNaNとする。
+        inline_threshold (int, optional): このノード数以下のグラフはプロセス内で計算する
+        batch_graphs (int, optional): 1バッチのグラフ数の上限
+        batch_edges (int, optional): 1バッチのエッジ数の上限
+
+    Raises:
+        ValueError: 未知の指標名またはerrorsが指定された場合、
+            またはprocessesが1以外でpickleできない関数（ラムダ式など）が指定された場合
+
+    Yields:
+        dict: 指標名 → 値
+    """
+    if errors not in ("raise", "nan"):
+        raise ValueError(f"Unknown errors: {errors}")
+    functions = _metric_functions(metrics)
+    if processes == 1:
+        for g in graphs:
+            yield _analyze(compile_graph(g), functions, errors)
+        return
+
+    _check_picklable(functions)
+    pool = get_pool(processes)
+    max_batches = len(pool._pool) * 4
+    # 入力順の結果の待ち行列。要素は("ready", 結果) or ("batch", _Batch, 位置)
+    queue = deque()
+    batch = None
+    n_batches = 0
+
+    def head_ready():
+        kind, value, _ = queue[0]
+        return kind == "ready" or value.ready()
+
+    def pop():
+        nonlocal batch, n_batches
+        kind, value, position = queue.popleft()
+        if kind == "ready":
+            return value
+        if value is batch:
+            batch = None
+        value.submit(pool, functions, errors)
+        results = value.result.get()
+        if position == len(results) - 1:
+            n_batches -= 1
+        return results[position]
+
+    for g in graphs:
+        cg = compile_graph(g)
+        if cg.n_nodes <= inline_threshold:
+            queue.append(("ready", _analyze(cg, functions, errors), None))
+        else:
+            if batch is None:
+                batch = _Batch()
+                n_batches += 1
+            queue.append(("batch", batch, batch.add(cg)))
+            if len(batch.graphs) >= batch_graphs or batch.n_edges >= batch_edges:
+                batch.submit(pool, functions, errors)
+                batch = None
+        while queue and head_ready():
+            yield pop()
+        while n_batches > max_batches:
+            yield pop()
+
+    if batch is not None:
+        batch.submit(pool, functions, errors)
+    while queue:
+        yield pop()
@@ -0,0 +1,197 @@
+from collections import OrderedDict, namedtuple
+import copy
+import functools
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import numpy as np
+from grina.compiled import compile_graph
+
+logger = logging.getLogger("grina")
+
+CacheStats = namedtuple(
+    "CacheStats", ["hits", "misses", "disk_hits", "evictions", "size"]
+)
+
+# キーに含めない（結果に影響しない）引数
+IGNORED_PARAMETERS = ("processes",)
+
+
+def graph_fingerprint(g):
+    """グラフの構造から指紋（16進文字列）を求める。
+    向き、ノードIDの並び、(始点, 終点)の順に並べたエッジと重みをblake2bでハッシュする。
+    エッジの追加順が異なっても同じグラフであれば同じ指紋になる。
+
+    Args:
+        g (nx.Graph, nx.DiGraph or CompiledGraph): グラフ
+
+    Returns:
+        str: 指紋
+    """
+    cg = compile_graph(g)
+    src, dst = cg.src, cg.dst
+    if not cg.directed:
+        src, dst = np.minimum(src, dst), np.maximum(src, dst)
+    order = np.lexsort((dst, src))
+    h = hashlib.blake2b(digest_size=20)
+    h.update(b"directed" if cg.directed else b"undirected")
+    h.update(repr(cg.nodes).encode())
+    h.update(np.ascontiguousarray(src[order], dtype=np.int64).tobytes())
+    h.update(np.ascontiguousarray(dst[order], dtype=np.int64).tobytes())
+    h.update(np.ascontiguousarray(cg.weight[order], dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def _hashable(value):
+    """キーに含める引数の表現。配列はreprが省略されるため、内容のハッシュに置き換える。"""
+    if isinstance(value, np.ndarray):
+        digest = hashlib.blake2b(
+            np.ascontiguousarray(value).tobytes(), digest_size=20
+        ).hexdigest()
+        return ("ndarray", value.dtype.str, value.shape, digest)
+    if isinstance(value, (tuple, list)):
+        return type(value).__name__, tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return "dict", tuple((repr(k), _hashable(v)) for k, v in value.items())
+    return value
+
+
+class ResultCache:
+    """グラフの指紋と指標・引数をキーとする指標の結果のキャッシュ
+    メモリ上ではmaxsize件までを最近使った順に保持し（LRU）、
+    directoryを指定した場合はディスクにも保存してプロセスをまたいで再利用する。
+    返す値は深いコピーのため、タプル内の辞書や表の列を書き換えてもキャッシュには影響しない。
+
+    Args:
+        maxsize (int, optional): メモリ上に保持する件数
+        directory (str, optional): ディスクの保存先。Noneの場合はメモリのみ。
+    """
+
+    def __init__(self, maxsize=128, directory=None):
+        self.maxsize = maxsize
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self._memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(fn, g, args=(), kwargs=None):
+        """関数・グラフ・引数からキャッシュのキーを作る。
+
+        Args:
+            fn (callable): 指標の関数
+            g (nx.Graph, nx.DiGraph or CompiledGraph): グラフ
+            args (tuple, optional): グラフ以外の位置引数
+            kwargs (dict, optional): キーワード引数
+
+        Returns:
+            str: キー
+        """
+        kwargs = {
+            k: v for k, v in (kwargs or {}).items()
+            if k not in IGNORED_PARAMETERS
+        }
+        h = hashlib.blake2b(digest_size=20)
+        h.update(graph_fingerprint(g).encode())
+        h.update(f"{fn.__module__}.{fn.__qualname__}".encode())
+        h.update(repr(_hashable((args, sorted(kwargs.items())))).encode())
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        """キーに対応する結果を返す。メモリになければディスクを探す。"""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(self._memory[key])
+        if self.directory is not None and os.path.exists(self._path(key)):
+            try:
+                with open(self._path(key), "rb") as f:
+                    value = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError) as e:
+                logger.warning(f"failed to load cache {key}: {e}")
+            else:
+                self.hits += 1
+                self.disk_hits += 1
+                self._remember(key, value)
+                return copy.deepcopy(value)
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        """結果を保存する。ディスクへは一時ファイルに書いてから置き換える。"""
+        self._remember(key, value)
+        if self.directory is not None:
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, self._path(key))
+            except BaseException:
+                os.unlink(tmp)
+                raise
+
+    def call(self, fn, g, *args, **kwargs):
+        """キャッシュがあればそれを返し、なければfn(g, *args, **kwargs)を計算して保存する。
+        グラフは一度だけCompiledGraphに変換し、キーの算出とfnの両方に渡すため、
+        fnはgrinaの指標関数と同じくCompiledGraphを受け付ける必要がある。"""
+        g = compile_graph(g)
+        key = self.key(fn, g, args, kwargs)
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = fn(g, *args, **kwargs)
+            self.put(key, value)
+            value = copy.deepcopy(value)
+        return value
+
+    def wrap(self, fn):
+        """fnをキャッシュを通して呼び出す関数を返す。
+
+        Args:
+            fn (callable): fn(g, ...)の形の指標の関数（gにはCompiledGraphを渡す）
+
+        Returns:
+            callable: キャッシュ付きの関数
+        """
+        @functools.wraps(fn)
+        def cached(g, *args, **kwargs):
+            return self.call(fn, g, *args, **kwargs)
+        return cached
+
+    def clear(self, disk=False):
+        """メモリ上のキャッシュを消去する。disk=Trueの場合はディスクの保存分も消去する。"""
+        self._memory.clear()
+        if disk and self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith(".pkl"):
+                    os.unlink(os.path.join(self.directory, name))
+
+    def stats(self):
+        """ヒット・ミスの回数などを返す。
+
+        Returns:
+            CacheStats: (ヒット数, ミス数, うちディスクからのヒット数, 追い出した件数, メモリ上の件数)
+        """
+        return CacheStats(
+            self.hits, self.misses, self.disk_hits, self.evictions,
+            len(self._memory),
+        )
+
+    def __len__(self):
+        return len(self._memory)
@@ -0,0 +1,103 @@
+from collections import namedtuple
+import heapq
+import numpy as np
+from grina.compiled import compile_graph
+from grina.table import NodeTable
+
+TopKCloseness = namedtuple("TopKCloseness", ["table", "bfs_runs", "bfs_pruned"])
+
+
+def top_k_closeness(dg, k):
+    """近接中心性の上位k件を、全ノードからの探索を行わずに求める。
+    igraphのcloseness()と同じく、向きを無視したグラフで到達可能なノードのみを対象に
+    (到達可能なノード数 - 1) / 距離の和 を近接中心性とする。
+    連結成分の大きさcは事前に分かるため、深さdまで探索した時点で
+    未到達のノードは深さd+1に高々(フロンティアの次数の和 - 親へのエッジ)個、
+    残りは深さd+2以上にあるとして距離の和の下界、すなわち近接中心性の上界が得られる。
+    上界がk番目の値を下回った時点でそのノードの探索を打ち切る。
+    次数の大きいノードから探索し、早い段階でk番目の値を大きくする。
+
+    Args:
+        dg (nx.DiGraph, nx.Graph or CompiledGraph): グラフ
+        k (int): 求める件数
+
+    Returns:
+        TopKCloseness: (closeness_centrality列を持つ上位k件のNodeTable（降順）,
+            探索したノード数, 途中で打ち切ったノード数)
+    """
+    cg = compile_graph(dg)
+    n = cg.n_nodes
+    indptr, indices = cg.undirected_csr
+    degree = np.diff(indptr)
+    _, labels = cg.weak_components
+    component_sizes = np.bincount(labels, minlength=n)[labels]
+
+    seen = np.full(n, -1, dtype=np.int64)
+    # (近接中心性, -インデックス)の最小ヒープで上位k件を保持する
+    heap = []
+    runs = 0
+    pruned = 0
+    k = max(0, min(k, n))
+    if k > 0:
+        order = np.lexsort((np.arange(n), -degree))
+    else:
+        order = np.empty(0, dtype=np.int64)
+    for v in order.tolist():
+        c = int(component_sizes[v])
+        if c == 1:
+            continue
+        runs += 1
+        seen[v] = v
+        frontier = np.array([v], dtype=np.int64)
+        reached = 1
+        farness = 0
+        level = 0
+        closeness = None
+        while True:
+            starts = indptr[frontier]
+            counts = indptr[frontier + 1] - starts
+            total = int(counts.sum())
+            if len(heap) == k:
+                remaining = c - reached
+                # 次の階層の大きさの上界（深さ1以降は親へのエッジを除く）
+                bound = total - (len(frontier) if level > 0 else 0)
+                near = min(bound, remaining)
+                lower = farness + (level + 1) * near + (level + 2) * (remaining - near)
+                if (c - 1) / lower < heap[0][0]:
+                    pruned += 1
+                    break
+            offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            heads = indices[np.repeat(starts, counts) + offsets]
+            heads = np.unique(heads[seen[heads] != v])
+            level += 1
+            if len(heads) == 0:
+                break
+            seen[heads] = v
+            reached += len(heads)
+            farness += level * len(heads)
+            frontier = heads
+            if reached == c:
+                closeness = (c - 1) / farness
+                break
+        if closeness is None:
+            continue
+        item = (closeness, -v)
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    rows = [-i for _, i in sorted(heap, reverse=True)]
+    values = [value for value, _ in sorted(heap, reverse=True)]
+    if len(rows) < k:
+        # 孤立ノードの近接中心性は定義されない（igraphと同じくNaN）
+        isolated = np.flatnonzero(component_sizes == 1)[:k - len(rows)].tolist()
+        rows += isolated
+        values += [np.nan] * len(isolated)
+    nodes = cg.nodes
+    table = NodeTable(
+        [nodes[i] for i in rows],
+        {"closeness_centrality": np.array(values, dtype=np.float64)},
+        index=rows,
+    )
+    return TopKCloseness(table, runs, pruned)
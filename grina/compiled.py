@@ -0,0 +1,265 @@
+import copy
+from functools import cached_property
+import networkx as nx
+import numpy as np
+from grina.profiling import phase
+
+
+def _csr(n, rows, cols):
+    """(行, 列)のペアからCSR形式の(indptr, indices)を作る。"""
+    with phase("conversion"):
+        order = np.argsort(rows, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return indptr, cols[order]
+
+
+class CompiledGraph:
+    """整数インデックス化したグラフ
+    ノードID ↔ 整数インデックスの対応と、エッジ配列・CSR形式の隣接リストを保持する。
+    一度作成すれば、grinaの各指標関数にnx.Graph/nx.DiGraphの代わりに渡すことができ、
+    指標ごとのグラフ変換（無向化、隣接行列化、igraph化など）を省略できる。
+
+    Attributes:
+        nodes (list): インデックス → ノードID
+        index (dict): ノードID → インデックス
+        directed (bool): 有向グラフかどうか
+        src (np.ndarray): エッジの始点インデックス
+        dst (np.ndarray): エッジの終点インデックス
+        weight (np.ndarray): エッジの重み（重みがなければ1）
+    """
+
+    def __init__(self, nodes, src, dst, weight=None, directed=True, graph=None):
+        self.nodes = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.directed = directed
+        self.src = np.asarray(src, dtype=np.int64)
+        self.dst = np.asarray(dst, dtype=np.int64)
+        if weight is None:
+            weight = np.ones(len(self.src))
+        self.weight = np.asarray(weight, dtype=np.float64)
+        self._graph = graph
+
+    @classmethod
+    def from_networkx(cls, g, weight="weight"):
+        """networkxのグラフから作成する。
+
+        Args:
+            g (nx.Graph or nx.DiGraph): グラフ
+            weight (str, optional): 重みとして扱うエッジ属性名
+
+        Returns:
+            CompiledGraph: 整数インデックス化したグラフ
+        """
+        with phase("conversion"):
+            nodes = list(g)
+            index = {node: i for i, node in enumerate(nodes)}
+            m = g.number_of_edges()
+            src = np.empty(m, dtype=np.int64)
+            dst = np.empty(m, dtype=np.int64)
+            weights = np.empty(m, dtype=np.float64)
+            for i, (u, v, w) in enumerate(g.edges(data=weight, default=1)):
+                src[i] = index[u]
+                dst[i] = index[v]
+                weights[i] = w
+            return cls(nodes, src, dst, weights, directed=g.is_directed(), graph=g)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    @property
+    def n_nodes(self):
+        return len(self.nodes)
+
+    @property
+    def n_edges(self):
+        return len(self.src)
+
+    def number_of_nodes(self):
+        return self.n_nodes
+
+    def number_of_edges(self):
+        return self.n_edges
+
+    def is_directed(self):
+        return self.directed
+
+    @cached_property
+    def out_csr(self):
+        """出次方向の隣接リスト（無向グラフでは両方向）
+
+        Returns:
+            tuple: (indptr, indices)
+        """
+        if self.directed:
+            return _csr(self.n_nodes, self.src, self.dst)
+        not_loop = self.src != self.dst
+        rows = np.concatenate([self.src, self.dst[not_loop]])
+        cols = np.concatenate([self.dst, self.src[not_loop]])
+        return _csr(self.n_nodes, rows, cols)
+
+    @cached_property
+    def in_csr(self):
+        """入次方向の隣接リスト（無向グラフでは両方向）
+
+        Returns:
+            tuple: (indptr, indices)
+        """
+        if self.directed:
+            return _csr(self.n_nodes, self.dst, self.src)
+        return self.out_csr
+
+    @cached_property
+    def undirected_pairs(self):
+        """向きを無視した重複のないエッジ(u <= v)の配列
+
+        Returns:
+            tuple: (u, v)
+        """
+        n = self.n_nodes
+        with phase("conversion"):
+            lo = np.minimum(self.src, self.dst)
+            hi = np.maximum(self.src, self.dst)
+            keys = np.unique(lo * n + hi)
+            return keys // n, keys % n
+
+    @cached_property
+    def undirected_csr(self):
+        """無向グラフとしての隣接リスト。自己ループは1回だけ含む。
+
+        Returns:
+            tuple: (indptr, indices)
+        """
+        if not self.directed:
+            return self.out_csr
+        lo, hi = self.undirected_pairs
+        not_loop = lo != hi
+        rows = np.concatenate([lo, hi[not_loop]])
+        cols = np.concatenate([hi, lo[not_loop]])
+        return _csr(self.n_nodes, rows, cols)
+
+    @cached_property
+    def weak_components(self):
+        """弱連結成分（無向グラフでは連結成分）のラベル
+
+        Returns:
+            tuple: (連結成分の数, ノードごとの連結成分のラベル)
+        """
+        from scipy.sparse.csgraph import connected_components
+        adjacency = self.scipy_matrix("out")
+        with phase("compute"):
+            return connected_components(
+                adjacency, directed=self.directed, connection="weak"
+            )
+
+    @property
+    def n_undirected_edges(self):
+        """無向グラフに変換したときのエッジ数"""
+        if not self.directed:
+            return self.n_edges
+        return len(self.undirected_pairs[0])
+
+    def out_degree(self):
+        return np.diff(self.out_csr[0])
+
+    def in_degree(self):
+        return np.diff(self.in_csr[0])
+
+    def undirected_degree(self):
+        """無向グラフに変換したときの次数。networkxと同様に自己ループは2と数える。"""
+        lo, hi = self.undirected_pairs
+        n = self.n_nodes
+        return np.bincount(lo, minlength=n) + np.bincount(hi, minlength=n)
+
+    def scipy_matrix(self, kind="out", weighted=False):
+        """scipy.sparseのCSR行列に変換する。
+
+        Args:
+            kind (str, optional): "out", "in" or "undirected"
+            weighted (bool, optional): Trueの場合はエッジの重みを値とする（"out"のみ）
+
+        Returns:
+            scipy.sparse.csr_matrix: 隣接行列
+        """
+        import scipy.sparse as sp
+        n = self.n_nodes
+        if weighted:
+            if kind != "out":
+                raise ValueError("weighted matrix is only available for kind='out'")
+            src, dst, weight = self.src, self.dst, self.weight
+            if not self.directed:
+                not_loop = src != dst
+                src, dst = (np.concatenate([src, dst[not_loop]]),
+                            np.concatenate([dst, src[not_loop]]))
+                weight = np.concatenate([weight, weight[not_loop]])
+            return sp.csr_matrix((weight, (src, dst)), shape=(n, n))
+        indptr, indices = {
+            "out": self.out_csr,
+            "in": self.in_csr,
+            "undirected": self.undirected_csr,
+        }[kind]
+        with phase("conversion"):
+            data = np.ones(len(indices), dtype=np.float64)
+            return sp.csr_matrix((data, indices, indptr), shape=(n, n))
+
+    def unweighted(self):
+        """重みを全て1としたCompiledGraphを返す。
+        ノード・エッジ配列と作成済みのCSRは共有し、重みの配列のみを新たに作る。"""
+        g = copy.copy(self)
+        g.weight = np.ones(self.n_edges)
+        g._graph = None
+        return g
+
+    def to_networkx(self):
+        """networkxのグラフを返す。元のグラフがあればそれを返す。"""
+        if self._graph is None:
+            with phase("conversion"):
+                g = nx.DiGraph() if self.directed else nx.Graph()
+                g.add_nodes_from(self.nodes)
+                nodes = self.nodes
+                g.add_weighted_edges_from(
+                    (nodes[u], nodes[v], w)
+                    for u, v, w in zip(self.src.tolist(), self.dst.tolist(),
+                                       self.weight.tolist())
+                )
+                self._graph = g
+        return self._graph
+
+    @cached_property
+    def _igraph(self):
+        import igraph as ig
+        with phase("conversion"):
+            edges = np.column_stack([self.src, self.dst]).tolist()
+            return ig.Graph(n=self.n_nodes, edges=edges, directed=self.directed)
+
+    def to_igraph(self):
+        """igraphのグラフを返す。頂点の番号はインデックスと一致する。"""
+        return self._igraph
+
+
+def compile_graph(g):
+    """グラフをCompiledGraphに変換する。CompiledGraphはそのまま返す。
+
+    Args:
+        g (nx.Graph, nx.DiGraph or CompiledGraph): グラフ
+
+    Returns:
+        CompiledGraph: 整数インデックス化したグラフ
+    """
+    if isinstance(g, CompiledGraph):
+        return g
+    return CompiledGraph.from_networkx(g)
+
+
+def as_networkx(g):
+    """CompiledGraphをnetworkxのグラフに戻す。networkxのグラフはそのまま返す。"""
+    if isinstance(g, CompiledGraph):
+        return g.to_networkx()
+    return g
+
+
+def graph_type(g):
+    """型チェック用のグラフの型。CompiledGraphはnx.DiGraph or nx.Graphとみなす。"""
+    if isinstance(g, CompiledGraph):
+        return nx.DiGraph if g.directed else nx.Graph
+    return type(g)
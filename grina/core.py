@@ -1,16 +1,121 @@
+from collections.abc import Mapping
+import networkx as nx
+from grina.compiled import CompiledGraph, as_networkx
+from grina.profiling import profiled
+
+
+class _UnitWeightData(Mapping):
+    """エッジ属性の読み取り専用ビュー。weight属性だけを1として見せる。"""
+
+    __slots__ = ("_data", "_weight")
+
+    def __init__(self, data, weight):
+        self._data = data
+        self._weight = weight
+
+    def __getitem__(self, key):
+        if key == self._weight:
+            return 1
+        return self._data[key]
+
+    def __iter__(self):
+        yield from self._data
+        if self._weight not in self._data:
+            yield self._weight
+
+    def __len__(self):
+        return len(self._data) + (self._weight not in self._data)
+
+    def __contains__(self, key):
+        return key == self._weight or key in self._data
+
+    def copy(self):
+        return dict(self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class _UnitWeightAdjacency(Mapping):
+    """隣接辞書（ノード → 隣接ノード → (キー →) エッジ属性）の読み取り専用ビュー
+    参照されたエッジ属性のみを_UnitWeightDataで包み、辞書はコピーしない。"""
+
+    __slots__ = ("_mapping", "_depth", "_weight")
+
+    def __init__(self, mapping, depth, weight):
+        self._mapping = mapping
+        self._depth = depth
+        self._weight = weight
+
+    def __getitem__(self, key):
+        value = self._mapping[key]
+        if self._depth == 1:
+            return _UnitWeightData(value, self._weight)
+        return _UnitWeightAdjacency(value, self._depth - 1, self._weight)
+
+    def __iter__(self):
+        return iter(self._mapping)
+
+    def __len__(self):
+        return len(self._mapping)
+
+    def __contains__(self, key):
+        return key in self._mapping
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+def unweighted_view(g, weight="weight"):
+    """エッジの重みを全て1として見せる読み取り専用のビュー
+    ノード・エッジ・属性の辞書はコピーせず、元のグラフの変更はビューにも反映される。
+    重み以外のエッジ属性はそのまま見える。変更可能なグラフが必要な場合は.copy()する。
+
+    Args:
+        g (nx.Graph, nx.DiGraph or CompiledGraph): グラフ
+        weight (str, optional): 1とするエッジ属性名
+
+    Returns:
+        nx.Graph, nx.DiGraph or CompiledGraph: 読み取り専用のグラフ
+            （CompiledGraphの場合は配列を共有するCompiledGraph）
+    """
+    if isinstance(g, CompiledGraph):
+        return g.unweighted()
+    view = nx.graphviews.generic_graph_view(g)
+    depth = 3 if g.is_multigraph() else 2
+    if view.is_directed():
+        view._succ = _UnitWeightAdjacency(g._succ, depth, weight)
+        view._pred = _UnitWeightAdjacency(g._pred, depth, weight)
+    else:
+        view._adj = _UnitWeightAdjacency(g._adj, depth, weight)
+    return view
+
+
+def undirected_view(g, unweighted=False, weight="weight"):
+    """向きを無視した読み取り専用のビュー（nx.Graph.to_undirected(as_view=True)）
+    双方向のエッジは1本として見え、属性はi->jのエッジのものを優先する。
+
+    Args:
+        g (nx.Graph, nx.DiGraph or CompiledGraph): グラフ
+        unweighted (bool, optional): Trueの場合は重みも1として見せる
+        weight (str, optional): unweighted=Trueの場合に1とするエッジ属性名
+
+    Returns:
+        nx.Graph: 読み取り専用の無向グラフ
+    """
+    view = as_networkx(g).to_undirected(as_view=True)
+    if unweighted:
+        view = unweighted_view(view, weight)
+    return view
+
+
+@profiled
 def to_unweighted(dg):
     """ネットワークの重みを全て1に変換する。
+    グラフはコピーせず、重みを1として見せる読み取り専用のビューを返す（unweighted_viewを参照）。
     Args:
-        dg (nx.DiGraph or nx.Graph): 有向グラフ or 無向グラフ
+        dg (nx.DiGraph, nx.Graph or CompiledGraph): 有向グラフ or 無向グラフ
     Returns:
-        nx.DiGraph or nx.Graph: 有向グラフ or 無向グラフ
+        nx.DiGraph or nx.Graph: 有向グラフ or 無向グラフ（読み取り専用）
     """
-    unweight_dg = dg.copy()
-    edges = []
-    for edge in unweight_dg.edges():
-        edges.append(
-            (edge[0], edge[1], {'weight': 1})
-        )
-    unweight_dg.update(edges=edges)
-    return unweight_dg
-
+    return unweighted_view(as_networkx(dg))
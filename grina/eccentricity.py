@@ -0,0 +1,171 @@
+from collections import namedtuple
+import numpy as np
+from grina.compiled import compile_graph
+from grina.parallel import bfs_distances, csr_adjacency, expansion_elongation_arrays
+
+Eccentricities = namedtuple("Eccentricities", ["values", "bfs_runs", "bfs_saved"])
+
+
+def _adjacencies(cg, mode):
+    """探索の向きに応じた(順方向, 逆方向)の隣接行列"""
+    if mode == "all" or not cg.directed:
+        adjacency = csr_adjacency(*cg.undirected_csr)
+        return adjacency, adjacency
+    out_adj = csr_adjacency(*cg.out_csr)
+    in_adj = csr_adjacency(*cg.in_csr)
+    if mode == "out":
+        return out_adj, in_adj
+    if mode == "in":
+        return in_adj, out_adj
+    raise ValueError(f"Unknown mode: {mode}")
+
+
+def _bounding(cg, mode, target):
+    """上界・下界の伝搬による離心率の算出（Takes & Kosters）
+    ピボットwからの探索で得た距離を使い、wと同じ強連結成分のノードvについて
+        max(d(v,w), ecc(w) - d(w,v)) <= ecc(v) <= d(v,w) + ecc(w)
+    で離心率の範囲を絞り込む。同じ強連結成分のノードは到達可能なノード集合が等しいため、
+    到達可能なノードのみを対象とする離心率でもこの範囲は成り立つ。
+    ピボットは上界が最大のノードと下界が最小のノードを交互に選ぶ。
+    有向グラフで絞り込みの効果が逆方向の探索に見合わない場合は、残りを個別に探索する。
+
+    Args:
+        cg (CompiledGraph): グラフ
+        mode (str): "out", "in" or "all"
+        target (str): "all"（全ノードの離心率）, "diameter" or "radius"
+
+    Returns:
+        tuple: (下界, 上界, 探索回数)
+    """
+    from scipy.sparse.csgraph import connected_components
+    forward, backward = _adjacencies(cg, mode)
+    symmetric = forward is backward
+    n = cg.n_nodes
+    _, labels = connected_components(
+        forward, directed=not symmetric, connection="strong"
+    )
+    component_sizes = np.bincount(labels)
+    degree = np.diff(forward.indptr)
+    lower = np.zeros(n, dtype=np.int64)
+    upper = np.full(n, np.iinfo(np.int64).max)
+    active = np.ones(n, dtype=bool)
+    runs = 0
+    pick_upper = True
+    # 有向グラフでは逆方向の探索が必要になるため、
+    # 1回あたり1ノード以上を確定できない場合は絞り込みをやめる
+    use_bounds = True
+    bounded_pivots = 0
+    bounded_resolved = 0
+
+    while active.any():
+        candidates = np.flatnonzero(active)
+        if pick_upper:
+            order = np.lexsort((degree[candidates], upper[candidates]))
+            w = candidates[order[-1]]
+        else:
+            order = np.lexsort((-degree[candidates], lower[candidates]))
+            w = candidates[order[0]]
+        pick_upper = not pick_upper
+        n_active = len(candidates)
+
+        d_forward = bfs_distances(forward, [w])[0]
+        runs += 1
+        ecc = int(np.max(d_forward[np.isfinite(d_forward)]))
+        lower[w] = upper[w] = ecc
+        # 逆方向の探索が割に合うのは3ノード以上の強連結成分のみ
+        bounded = use_bounds and component_sizes[labels[w]] > (1 if symmetric else 2)
+        if bounded:
+            if symmetric:
+                d_backward = d_forward
+            else:
+                d_backward = bfs_distances(backward, [w])[0]
+                runs += 1
+            same = np.flatnonzero(labels == labels[w])
+            d_f = d_forward[same].astype(np.int64)
+            d_b = d_backward[same].astype(np.int64)
+            lower[same] = np.maximum(lower[same], np.maximum(d_b, ecc - d_f))
+            upper[same] = np.minimum(upper[same], d_b + ecc)
+
+        if target == "all":
+            active &= lower != upper
+        elif target == "diameter":
+            active &= upper > lower.max()
+        elif target == "radius":
+            active &= lower < upper.min()
+        active[w] = False
+
+        if bounded and not symmetric:
+            bounded_pivots += 1
+            bounded_resolved += n_active - np.count_nonzero(active) - 1
+            if bounded_pivots >= 10 and bounded_resolved < bounded_pivots:
+                use_bounds = False
+    return lower, upper, runs
+
+
+def calc_eccentricities(dg, mode="out", method="bounded"):
+    """離心率（伸長度）の算出
+    到達可能なノードまでの最短経路長の最大値をノードごとに求める。
+    method="bounded"では上界・下界の伝搬によって、全ノードからの探索を行わずに
+    厳密な離心率を求める。method="bfs"では全ノードから探索する。
+
+    Args:
+        dg (nx.DiGraph, nx.Graph or CompiledGraph): グラフ
+        mode (str, optional): 探索の向き。"out", "in" or "all"（無向）
+        method (str, optional): "bounded" or "bfs"
+
+    Returns:
+        Eccentricities: (ノードIDと離心率の辞書, 探索回数, 省略できた探索回数)。
+            探索回数は逆方向の探索も含む。省略できた探索回数は全ノードからの探索（n回）
+            と比べた回数で、逆方向の探索のために上回った場合は0とする。
+    """
+    cg = compile_graph(dg)
+    n = cg.n_nodes
+    if n == 0:
+        return Eccentricities({}, 0, 0)
+    if method == "bfs":
+        forward, _ = _adjacencies(cg, mode)
+        _, _, values = expansion_elongation_arrays(forward, np.arange(n))
+        runs = n
+    elif method == "bounded":
+        values, _, runs = _bounding(cg, mode, "all")
+    else:
+        raise ValueError(f"Unknown method: {method}")
+    return Eccentricities(
+        dict(zip(cg.nodes, values.tolist())), runs, max(n - runs, 0)
+    )
+
+
+def calc_diameter(dg, mode="all"):
+    """直径（離心率の最大値）の算出
+    上界が直径の下界以下になったノードを探索対象から除き、早期に打ち切る。
+
+    Args:
+        dg (nx.DiGraph, nx.Graph or CompiledGraph): グラフ
+        mode (str, optional): 探索の向き。"out", "in" or "all"（無向）
+
+    Returns:
+        int: 直径
+    """
+    cg = compile_graph(dg)
+    if cg.n_nodes == 0:
+        return 0
+    lower, _, _ = _bounding(cg, mode, "diameter")
+    return int(lower.max())
+
+
+def calc_radius(dg, mode="all"):
+    """半径（離心率の最小値）の算出
+    下界が半径の上界以上になったノードを探索対象から除き、早期に打ち切る。
+
+    Args:
+        dg (nx.DiGraph, nx.Graph or CompiledGraph): グラフ
+        mode (str, optional): 探索の向き。"out", "in" or "all"（無向）
+
+    Returns:
+        int: 半径
+    """
+    cg = compile_graph(dg)
+    if cg.n_nodes == 0:
+        return 0
+    _, upper, _ = _bounding(cg, mode, "radius")
+    return int(upper.min())
@@ -0,0 +1,247 @@
+import os
+import numpy as np
+from grina.compiled import CompiledGraph
+from grina.table import _import_pyarrow
+
+# 一度に読み込むエッジ数の既定値
+CHUNK_ROWS = 1_000_000
+
+_REDUCERS = {
+    "sum": np.add.reduceat,
+    "max": np.maximum.reduceat,
+    "min": np.minimum.reduceat,
+}
+
+
+def _aggregate(src, dst, weight, aggregate):
+    """同じ(始点, 終点)のエッジを1本にまとめ、重みを集約する。
+    安定ソートのため、"first"/"last"は読み込んだ順で最初/最後の重みになる。
+    """
+    if len(src) == 0:
+        return src, dst, weight
+    order = np.lexsort((dst, src))
+    src, dst, weight = src[order], dst[order], weight[order]
+    new = np.empty(len(src), dtype=bool)
+    new[0] = True
+    np.not_equal(src[1:], src[:-1], out=new[1:])
+    new[1:] |= dst[1:] != dst[:-1]
+    starts = np.flatnonzero(new)
+    if aggregate in _REDUCERS:
+        weight = _REDUCERS[aggregate](weight, starts)
+    elif aggregate == "first":
+        weight = weight[starts]
+    elif aggregate == "last":
+        weight = weight[np.append(starts[1:], len(src)) - 1]
+    else:
+        raise ValueError(f"Unknown aggregate: {aggregate}")
+    return src[starts], dst[starts], weight
+
+
+class EdgeListBuilder:
+    """エッジ列を少しずつ受け取り、CompiledGraphを作る。
+    ノードIDは出現順に整数インデックスへ変換し（nx.from_pandas_edgelistと同じ順序）、
+    重複するエッジはチャンクごとに集約したうえで、溜まった量に応じてまとめて集約する。
+    networkxのグラフを経由しないため、メモリはエッジ数に比例する配列分のみで済む。
+
+    Args:
+        directed (bool, optional): 有向グラフとして扱うか。Falseの場合はu-vとv-uを同じエッジとする。
+        aggregate (str, optional): 重複するエッジの重みの集約方法。
+            "sum", "max", "min", "first" or "last"
+        relabel (bool, optional): Falseの場合は0以上の整数のノードIDをそのままインデックスとし、
+            ノードは0から最大のIDまでとする。
+    """
+
+    def __init__(self, directed=True, aggregate="sum", relabel=True):
+        if aggregate not in _REDUCERS and aggregate not in ("first", "last"):
+            raise ValueError(f"Unknown aggregate: {aggregate}")
+        self.directed = directed
+        self.aggregate = aggregate
+        self.relabel = relabel
+        self.n_rows = 0
+        self._index = {}
+        self._nodes = []
+        self._max_id = -1
+        self._merged = (np.empty(0, dtype=np.int64),) * 2 + (np.empty(0),)
+        self._pending = []
+        self._n_pending = 0
+
+    def _indices(self, src, dst):
+        """ノードIDを整数インデックスに変換する。"""
+        if not self.relabel:
+            src = np.asarray(src, dtype=np.int64)
+            dst = np.asarray(dst, dtype=np.int64)
+            if len(src) and min(src.min(), dst.min()) < 0:
+                raise ValueError("node ids must be non-negative when relabel=False")
+            if len(src):
+                self._max_id = max(self._max_id, int(src.max()), int(dst.max()))
+            return src, dst
+        import pandas as pd
+        src, dst = np.asarray(src), np.asarray(dst)
+        # 行ごとに始点・終点の順で並べ、最初に出現した順にインデックスを割り当てる
+        if src.dtype.kind in "iu" and dst.dtype.kind in "iu":
+            ids = np.empty(2 * len(src), dtype=np.int64)
+        else:
+            ids = np.empty(2 * len(src), dtype=object)
+        ids[0::2] = src
+        ids[1::2] = dst
+        codes, uniques = pd.factorize(ids)
+        index = self._index
+        lookup = np.empty(len(uniques), dtype=np.int64)
+        for i, node in enumerate(uniques.tolist()):
+            position = index.get(node)
+            if position is None:
+                position = index[node] = len(self._nodes)
+                self._nodes.append(node)
+            lookup[i] = position
+        mapped = lookup[codes]
+        return mapped[0::2], mapped[1::2]
+
+    def add_edges(self, src, dst, weight=None):
+        """エッジを追加する。
+
+        Args:
+            src (array-like): 始点のノードID
+            dst (array-like): 終点のノードID
+            weight (array-like, optional): 重み。Noneの場合は1（"sum"では出現回数になる）
+        """
+        if len(src) != len(dst):
+            raise ValueError("src and dst must have the same length")
+        src, dst = self._indices(src, dst)
+        if weight is None:
+            weight = np.ones(len(src))
+        else:
+            weight = np.asarray(weight, dtype=np.float64)
+        if not self.directed:
+            src, dst = np.minimum(src, dst), np.maximum(src, dst)
+        self.n_rows += len(src)
+        chunk = _aggregate(src, dst, weight, self.aggregate)
+        self._pending.append(chunk)
+        self._n_pending += len(chunk[0])
+        # 未集約のエッジが集約済みのエッジ数を超えたらまとめて集約する（償却O(E log E)）
+        if self._n_pending > max(len(self._merged[0]), CHUNK_ROWS):
+            self._compact()
+
+    def _compact(self):
+        if not self._pending:
+            return
+        parts = [self._merged] + self._pending
+        self._merged = _aggregate(
+            np.concatenate([p[0] for p in parts]),
+            np.concatenate([p[1] for p in parts]),
+            np.concatenate([p[2] for p in parts]),
+            self.aggregate,
+        )
+        self._pending = []
+        self._n_pending = 0
+
+    def build(self):
+        """集約したエッジからCompiledGraphを作る。
+
+        Returns:
+            CompiledGraph: 整数インデックス化したグラフ
+        """
+        self._compact()
+        src, dst, weight = self._merged
+        nodes = self._nodes if self.relabel else range(self._max_id + 1)
+        return CompiledGraph(nodes, src, dst, weight, directed=self.directed)
+
+
+def _csv_chunks(path, columns, chunksize, **kwargs):
+    import pandas as pd
+    for frame in pd.read_csv(path, usecols=columns, chunksize=chunksize, **kwargs):
+        yield {name: frame[name].to_numpy() for name in columns}
+
+
+def _parquet_chunks(path, columns, chunksize):
+    _import_pyarrow()
+    import pyarrow.parquet as pq
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+        yield {
+            name: batch.column(i).to_numpy(zero_copy_only=False)
+            for i, name in enumerate(columns)
+        }
+
+
+def read_edgelist(path, source="source", target="target", weight=None,
+                  directed=True, aggregate="sum", chunksize=CHUNK_ROWS,
+                  file_format=None, **kwargs):
+    """CSVまたはParquetのエッジリストをチャンクごとに読み込み、CompiledGraphを作る。
+    pandasのDataFrameやnetworkxのグラフを経由せず、読み込みながら重複するエッジを集約する。
+
+    Args:
+        path (str): ファイルのパス
+        source (str, optional): 始点の列名
+        target (str, optional): 終点の列名
+        weight (str, optional): 重みの列名。Noneの場合は各行の重みを1とする。
+        directed (bool, optional): 有向グラフとして扱うか
+        aggregate (str, optional): 重複するエッジの重みの集約方法（EdgeListBuilderを参照）
+        chunksize (int, optional): 一度に読み込む行数
+        file_format (str, optional): "csv" or "parquet"。Noneの場合は拡張子から判断する。
+        **kwargs: pd.read_csvに渡す引数（sepなど）
+
+    Raises:
+        ValueError: ファイル形式が判断できない場合
+        ImportError: Parquetの読み込みにpyarrowがない場合
+
+    Returns:
+        CompiledGraph: 整数インデックス化したグラフ
+    """
+    if file_format is None:
+        ext = os.path.splitext(str(path))[1].lower()
+        if ext in (".parquet", ".pq"):
+            file_format = "parquet"
+        elif ext in (".csv", ".tsv", ".txt"):
+            file_format = "csv"
+        else:
+            raise ValueError(f"Cannot infer the file format of {path}")
+    columns = [source, target] + ([weight] if weight is not None else [])
+    if file_format == "csv":
+        chunks = _csv_chunks(path, columns, chunksize, **kwargs)
+    elif file_format == "parquet":
+        chunks = _parquet_chunks(path, columns, chunksize)
+    else:
+        raise ValueError(f"Unknown file format: {file_format}")
+
+    builder = EdgeListBuilder(directed=directed, aggregate=aggregate)
+    for chunk in chunks:
+        builder.add_edges(
+            chunk[source], chunk[target],
+            chunk[weight] if weight is not None else None,
+        )
+    return builder.build()
+
+
+def read_binary_edges(path, id_dtype=np.int64, weight_dtype=None,
+                      directed=True, aggregate="sum", chunksize=CHUNK_ROWS,
+                      relabel=False):
+    """(始点, 終点[, 重み])の固定長レコードを並べたバイナリファイルをメモリマップで読み込む。
+    ファイル全体をメモリに載せず、chunksize行ずつ集約する。
+
+    Args:
+        path (str): ファイルのパス
+        id_dtype (np.dtype, optional): ノードIDの型
+        weight_dtype (np.dtype, optional): 重みの型。Noneの場合は重みなし。
+        directed (bool, optional): 有向グラフとして扱うか
+        aggregate (str, optional): 重複するエッジの重みの集約方法（EdgeListBuilderを参照）
+        chunksize (int, optional): 一度に処理する行数
+        relabel (bool, optional): Falseの場合はノードIDをそのままインデックスとする。
+
+    Returns:
+        CompiledGraph: 整数インデックス化したグラフ
+    """
+    fields = [("source", id_dtype), ("target", id_dtype)]
+    if weight_dtype is not None:
+        fields.append(("weight", weight_dtype))
+    dtype = np.dtype(fields)
+    builder = EdgeListBuilder(directed=directed, aggregate=aggregate, relabel=relabel)
+    if os.path.getsize(path) == 0:
+        return builder.build()
+    records = np.memmap(path, dtype=dtype, mode="r")
+    for start in range(0, len(records), chunksize):
+        chunk = records[start:start + chunksize]
+        builder.add_edges(
+            chunk["source"], chunk["target"],
+            chunk["weight"] if weight_dtype is not None else None,
+        )
+    del records
+    return builder.build()
@@ -1,8 +1,17 @@
+from collections import namedtuple
 import networkx as nx
 import numpy as np
+from grina.compiled import compile_graph, graph_type
+from grina.profiling import phase, profiled
+from grina.reciprocity import ReciprocalEdgeIndex, reciprocity_counts
 
+ComponentAnalysis = namedtuple(
+    "ComponentAnalysis", ["nodes", "labels", "sizes", "n_edges", "densities"]
+)
 
-def teacher_disciple_degree(dg):
+
+@profiled
+def teacher_disciple_degree(dg, backend=None):
     """師弟度
     全関係数に対する単方向の接続数
     全関係数は無向グラフの全エッジ数として算出
@@ -10,8 +19,10 @@ def teacher_disciple_degree(dg):
     隣接行列Aに変換して、A - A.T差分を算出し、非ゼロの要素数をカウント。
     
     i->jの関係からj->iの関係を減じて、0以上であれば単方向の接続数を求めることができる。
+    大規模なグラフでは隣接行列を作らず、エッジ配列から同じ値を算出する。
     Args:
-        dg (nx.DiGraph): [description]
+        dg (nx.DiGraph or CompiledGraph): [description]
+        backend (str, optional): "dense" or "sparse"。Noneの場合はグラフの規模で自動選択。
 
     Raises:
         Exception: [description]
@@ -19,18 +30,14 @@ def teacher_disciple_degree(dg):
     Returns:
         dict: [description]
     """
-    if type(dg) != nx.DiGraph:
+    if graph_type(dg) != nx.DiGraph:
         raise Exception("dg is not DiGraph type.")
-    g = dg.to_undirected()
-    all_edges = len(g.edges)
-    adj = nx.to_numpy_array(dg)
-    i_adj = np.where(adj > 0, 1, 0)
-    diff = i_adj - i_adj.T
-    unidirect = np.count_nonzero(diff) / 2
-    return unidirect / all_edges
+    counts = reciprocity_counts(dg, backend)
+    return counts.unidirect / counts.n_relations
 
 
-def colleague_degree(dg):
+@profiled
+def colleague_degree(dg, backend=None):
     """同僚度
     全関係数に対する単方向の接続数
     全関係数は無向グラフの全エッジ数として算出
@@ -38,9 +45,11 @@ def colleague_degree(dg):
     隣接行列Aに変換して、A ○ A.T（アダマール積）を算出し、非ゼロの要素数をカウント。
     
     i->jの関係とj->iの関係の両方が存在すれば、1になるので、双方向の接続数を求めることができる。
+    大規模なグラフでは隣接行列を作らず、エッジ配列から同じ値を算出する。
 
     Args:
-        dg (nx.DiGraph)): [description]
+        dg (nx.DiGraph or CompiledGraph): [description]
+        backend (str, optional): "dense" or "sparse"。Noneの場合はグラフの規模で自動選択。
 
     Raises:
         Exception: [description]
@@ -48,22 +57,19 @@ def colleague_degree(dg):
     Returns:
         float: [description]
     """
-    if type(dg) != nx.DiGraph:
+    if graph_type(dg) != nx.DiGraph:
         raise Exception("dg is not DiGraph type.")
-    g = dg.to_undirected()
-    all_edges = len(g.edges)
-    adj = nx.to_numpy_array(dg)
-    i_adj = np.where(adj > 0, 1, 0)
-    diff = i_adj * i_adj.T
-    bidirect = np.count_nonzero(diff) / 2
-    return bidirect / all_edges
+    counts = reciprocity_counts(dg, backend)
+    return counts.bidirect / counts.n_relations
 
 
-def unidirect_density(dg):
+@profiled
+def unidirect_density(dg, backend=None):
     """単方向密度
     師弟度の分母を完全グラフの場合のエッジ数にしたもの
     Args:
-        dg (nx.DiGraph): [description]
+        dg (nx.DiGraph or CompiledGraph): [description]
+        backend (str, optional): "dense" or "sparse"。Noneの場合はグラフの規模で自動選択。
 
     Raises:
         Exception: [description]
@@ -71,22 +77,21 @@ def unidirect_density(dg):
     Returns:
         float: [description]
     """
-    if type(dg) != nx.DiGraph:
+    if graph_type(dg) != nx.DiGraph:
         raise Exception("dg is not DiGraph type.")
-    N = len(dg.nodes)
+    N = len(dg)
     all_relations = N * (N-1) / 2
-    adj = nx.to_numpy_array(dg)
-    i_adj = np.where(adj > 0, 1, 0)
-    diff = i_adj - i_adj.T
-    unidirect = np.count_nonzero(diff) / 2
-    return unidirect / all_relations
+    counts = reciprocity_counts(dg, backend)
+    return counts.unidirect / all_relations
 
 
-def bidirect_density(dg):
+@profiled
+def bidirect_density(dg, backend=None):
     """双方向密度
     同僚度の分母を完全グラフの場合のエッジ数にしたもの
     Args:
-        dg (nx.DiGraph): [description]
+        dg (nx.DiGraph or CompiledGraph): [description]
+        backend (str, optional): "dense" or "sparse"。Noneの場合はグラフの規模で自動選択。
 
     Raises:
         Exception: [description]
@@ -94,22 +99,65 @@ def bidirect_density(dg):
     Returns:
         float: [description]
     """
-    if type(dg) != nx.DiGraph:
+    if graph_type(dg) != nx.DiGraph:
         raise Exception("dg is not DiGraph type.")
-    N = len(dg.nodes)
+    N = len(dg)
     all_relations = N * (N-1) / 2
-    adj = nx.to_numpy_array(dg)
-    i_adj = np.where(adj > 0, 1, 0)
-    diff = i_adj * i_adj.T
-    bidirect = np.count_nonzero(diff) / 2
-    return bidirect / all_relations
+    counts = reciprocity_counts(dg, backend)
+    return counts.bidirect / all_relations
+
 
+@profiled
+def analyze_components(g, connection="weak"):
+    """連結成分の一括解析
+    連結成分のラベル付けを1回行い、成分ごとのノード数・エッジ数・密度をまとめて求める。
+    成分はノード数の降順に並べ、ラベルもその順番で0から振り直す。
+
+    Args:
+        g (nx.Graph, nx.DiGraph or CompiledGraph): グラフ
+        connection (str, optional): 有向グラフの場合の連結性。"weak" or "strong"
 
+    Returns:
+        ComponentAnalysis: (ノードIDのリスト, ノードごとの成分ラベル,
+            成分ごとのノード数, 成分ごとのエッジ数, 成分ごとの密度)
+    """
+    from scipy.sparse.csgraph import connected_components
+    cg = compile_graph(g)
+    n = cg.n_nodes
+    if n == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return ComponentAnalysis(cg.nodes, empty, empty, empty, np.zeros(0))
+    adjacency = cg.scipy_matrix("out")
+    with phase("compute"):
+        _, labels = connected_components(
+            adjacency, directed=cg.directed, connection=connection
+        )
+        sizes = np.bincount(labels)
+    with phase("sorting"):
+        order = np.argsort(-sizes, kind="stable")
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        labels = rank[labels]
+        sizes = sizes[order]
+
+    with phase("compute"):
+        inner = labels[cg.src] == labels[cg.dst]
+        n_edges = np.bincount(labels[cg.src[inner]], minlength=len(sizes))
+        pairs = sizes * (sizes - 1)
+        densities = np.divide(
+            n_edges, pairs, out=np.zeros(len(sizes)), where=pairs > 0
+        )
+        if not cg.directed:
+            densities *= 2
+    return ComponentAnalysis(cg.nodes, labels, sizes, n_edges, densities)
+
+
+@profiled
 def components_density(g):
     """コンポーネントごとのネットワーク密度
 
     Args:
-        g (nx.Graph)): [description]
+        g (nx.Graph or CompiledGraph): [description]
 
     Raises:
         Exception: [description]
@@ -117,20 +165,12 @@ def components_density(g):
     Returns:
         list: [description]
     """
-    if type(g) != nx.Graph:
+    if graph_type(g) != nx.Graph:
         raise Exception("g is not Graph type.")
-    component_list = [
-        g.subgraph(c)
-        for c in sorted(nx.connected_components(g),
-                        key=len,
-                        reverse=True)
-    ]
-    densities = []
-    for component in component_list:
-        densities.append(nx.density(component))
-    return densities
+    return analyze_components(g).densities.tolist()
 
 
+@profiled
 def components_size(g):
     """コンポーネントごとのネットワークサイズ
 
@@ -143,45 +183,42 @@ def components_size(g):
     Returns:
         list: [description]
     """
-    if type(g) != nx.Graph:
+    if graph_type(g) != nx.Graph:
         raise Exception("g is not Graph type.")
-    component_list = [
-        g.subgraph(c)
-        for c in sorted(nx.connected_components(g),
-                        key=len,
-                        reverse=True)
-    ]
-    sizes = []
-    for component in component_list:
-        sizes.append(component.number_of_nodes())
-    return sizes
+    return analyze_components(g).sizes.tolist()
 
+@profiled
 def get_n_bidirect_connect(dg):
-    checked_bidirect_edges = []
-    for source, target in dg.out_edges:
-        for ttarget, _ in dg.adj[target].items():
-            if source == ttarget and\
-               (target, source) not in checked_bidirect_edges:
-                checked_bidirect_edges.append((source, target))
-    return len(checked_bidirect_edges)
+    """双方向の接続数（自己ループは1本として数える）
+
+    Args:
+        dg (nx.DiGraph, nx.Graph or CompiledGraph): グラフ
 
+    Returns:
+        int: 双方向の接続数
+    """
+    return ReciprocalEdgeIndex(dg).n_bidirect
 
+
+@profiled
 def get_n_unidirect_connect(dg):
-    counter = 0
-    for source, target in dg.out_edges:
-        counter += 1
-        for ttarget, _ in dg.adj[target].items():
-            if source == ttarget:
-                counter -= 1
-                break
-    return counter
+    """単方向の接続数（逆向きのエッジが存在しないエッジの数）
+
+    Args:
+        dg (nx.DiGraph, nx.Graph or CompiledGraph): グラフ
+
+    Returns:
+        int: 単方向の接続数
+    """
+    return ReciprocalEdgeIndex(dg).n_unidirect
 
 
+@profiled
 def calc_network_density(dg):
-    n_nodes = len(dg.nodes)
-    n_edges = len(dg.edges)
+    n_nodes = dg.number_of_nodes()
+    n_edges = dg.number_of_edges()
     if n_nodes > 1:
-        if(type(dg) == nx.DiGraph):   
+        if(graph_type(dg) == nx.DiGraph):   
             return n_edges / (n_nodes * (n_nodes - 1))
         else:
             return 2 * n_edges / (n_nodes * (n_nodes - 1))
@@ -1,26 +1,104 @@
 import os
-import itertools
+import math
+import numbers
+import time
 import logging
 import networkx as nx
 import numpy as np
-from grina.core import to_unweighted
-from grina.parallel import expansion_elongation, wrapper4parallel
-import igraph as ig
+from grina.backends import dispatch, register
+from grina.closeness import top_k_closeness
+from grina.compiled import CompiledGraph, as_networkx, compile_graph, graph_type
+from grina.eigenvector import sparse_eigenvector_centrality
+from grina.profiling import phase, profiled
+from grina.reciprocity import node_reciprocity_table
+from grina.parallel import (
+    brandes_arrays, closeness_arrays, distance_profile_arrays,
+    expansion_elongation_arrays, get_pool, map_sources
+)
+from grina.scheduler import map_components
+from grina.table import NodeTable
 import multiprocessing
 
 logger = logging.getLogger("grina")
 N_PROCESSES = multiprocessing.cpu_count()
 THRESHOLD_NODES = 3
-logger.info("This module can use {} processes".format(N_PROCESSES))
+# このノード数以下のグラフはプロセスプールを使わずに計算する
+PARALLEL_THRESHOLD_NODES = 500
 
-try:
-    import cugraph as cnx
-    logger.info("Imported cugraph!")
-except Exception:
-    import networkx as cnx
-    logger.info("Imported networkx.")
 
+@profiled
+def degree_features(dg, weight="weight"):
+    """次数に関する指標をまとめて算出する。
+    エッジ配列から入次数・出次数と重み付きの入次数・出次数（強度）を1回ずつ数え、
+    その他の列は配列演算で求める。
 
+    Args:
+        dg (nx.DiGraph or CompiledGraph): 有向グラフ
+        weight (str, optional): 強度の算出に使うエッジ属性名。
+            Noneの場合は全てのエッジの重みを1とする。
+
+    Raises:
+        Exception: クラスチェック
+
+    Returns:
+        NodeTable: in_degree, out_degree, diff_entry_exit（|入次数-出次数|）,
+            out_in_degree（出次数-入次数）, inxout_degree（入次数×出次数）,
+            gatekeeper_degree（(入次数×出次数)**0.5）, in_strength, out_strengthの列を持つ表
+    """
+    if graph_type(dg) != nx.DiGraph:
+        raise Exception("dg is not DiGraph")
+    if (weight is not None and weight != "weight"
+            and not isinstance(dg, CompiledGraph)):
+        cg = CompiledGraph.from_networkx(as_networkx(dg), weight=weight)
+    else:
+        cg = compile_graph(dg)
+    n = cg.n_nodes
+    with phase("compute"):
+        in_degree = np.bincount(cg.dst, minlength=n)
+        out_degree = np.bincount(cg.src, minlength=n)
+        if weight is None:
+            in_strength = in_degree.astype(np.float64)
+            out_strength = out_degree.astype(np.float64)
+        else:
+            in_strength = np.bincount(cg.dst, weights=cg.weight, minlength=n)
+            out_strength = np.bincount(cg.src, weights=cg.weight, minlength=n)
+        columns = _degree_columns(in_degree, out_degree)
+    return NodeTable(cg.nodes, {
+        **columns,
+        "in_strength": in_strength,
+        "out_strength": out_strength,
+    })
+
+
+def _degree_columns(in_degree, out_degree):
+    out_in = out_degree - in_degree
+    inxout = in_degree * out_degree
+    return {
+        "in_degree": in_degree,
+        "out_degree": out_degree,
+        "diff_entry_exit": np.abs(out_in),
+        "out_in_degree": out_in,
+        "inxout_degree": inxout,
+        "gatekeeper_degree": np.sqrt(inxout),
+    }
+
+
+def _degree_table(dg):
+    """次数の指標の表（get_n_entryなどの辞書を返す関数用）
+    networkxのグラフはエッジ配列を作らずに次数を直接読む。
+    in_degree/out_degreeを持つグラフ（MultiDiGraphやDiGraphの派生クラスを含む）を受け付ける。"""
+    if isinstance(dg, CompiledGraph):
+        return degree_features(dg, weight=None)
+    nodes = list(dg)
+    n = len(nodes)
+    with phase("compute"):
+        in_degree = np.fromiter((d for _, d in dg.in_degree()), dtype=np.int64, count=n)
+        out_degree = np.fromiter((d for _, d in dg.out_degree()), dtype=np.int64, count=n)
+        columns = _degree_columns(in_degree, out_degree)
+    return NodeTable(nodes, columns)
+
+
+@profiled
 def get_n_entry(dg):
     """入次数の算出
 
@@ -30,9 +108,12 @@ def get_n_entry(dg):
     Returns:
         [dict]: [description]
     """
-    return dict(dg.in_degree())
+    table = _degree_table(dg)
+    with phase("sorting"):
+        return table.to_dict("in_degree")
 
 
+@profiled
 def get_n_exit(dg):
     """出次数の算出
 
@@ -42,9 +123,12 @@ def get_n_exit(dg):
     Returns:
         [dict]: [description]
     """
-    return dict(dg.out_degree())
+    table = _degree_table(dg)
+    with phase("sorting"):
+        return table.to_dict("out_degree")
 
 
+@profiled
 def get_diff_entry_exit(dg):
     """入次数と出次数の差の算出
     |入次数-出次数|で計算
@@ -54,16 +138,12 @@ def get_diff_entry_exit(dg):
     Returns:
         [dict]: [description]
     """
-    diff_dict = {}
-    out_degrees = dict(dg.out_degree())
-    # print("node\t\t:absolute diff")
-    for node, in_degree in dg.in_degree():
-        diff = abs(in_degree-out_degrees[node])
-        # print(f"{node}\t:{diff}")
-        diff_dict[node] = diff
-    return diff_dict
+    table = _degree_table(dg)
+    with phase("sorting"):
+        return table.to_dict("diff_entry_exit")
 
 
+@profiled
 def get_out_in_degree(dg):
     """出次数 - 入次数で算出
 
@@ -73,15 +153,12 @@ def get_out_in_degree(dg):
     Returns:
         [type]: [description]
     """
-    out_in_dict = {}
-    out_degrees = dict(dg.out_degree())
-    # print("node\t\t:absolute diff")
-    for node, in_degree in dg.in_degree():
-        diff = out_degrees[node] - in_degree
-        out_in_dict[node] = diff
-    return out_in_dict
+    table = _degree_table(dg)
+    with phase("sorting"):
+        return table.to_dict("out_in_degree")
 
 
+@profiled
 def get_gatekeeper_degree(dg):
     """ゲートキーパー度
     (入次数×出次数)**0.5で計算
@@ -91,13 +168,12 @@ def get_gatekeeper_degree(dg):
     Returns:
         [type]: [description]
     """
-    gatekeeper_dgree_dict = {
-        k: np.sqrt(v) for k, v in get_inxout_degree(dg).items()
-    }
-    
-    return gatekeeper_dgree_dict
+    table = _degree_table(dg)
+    with phase("sorting"):
+        return table.to_dict("gatekeeper_degree")
 
 
+@profiled
 def get_inxout_degree(dg):
     """入次数X出次数で計算
 
@@ -107,97 +183,474 @@ def get_inxout_degree(dg):
     Returns:
         dict: [description]
     """
-    inxout_degree_dict = {}
-    out_degrees = dict(dg.out_degree())
-    # print("node\t\t:degree gatekeeper")
-    for node, in_degree in dg.in_degree():
-        inxout_degree = in_degree * out_degrees[node]
-        inxout_degree_dict[node] = inxout_degree
-    return inxout_degree_dict
+    table = _degree_table(dg)
+    with phase("sorting"):
+        return table.to_dict("inxout_degree")
+
+
+def _check_top_k(top_k):
+    """top_kが整数（またはNone）であることを確認する。
+
+    Raises:
+        ValueError: top_kが整数でない場合
+    """
+    if top_k is not None and (
+            not isinstance(top_k, numbers.Integral) or isinstance(top_k, bool)):
+        raise ValueError(f"top_k must be an integer: {top_k!r}")
+
+
+def _centrality_result(nodes, values, name, as_table, top_k=None):
+    """中心性の配列を表、または降順に並べた辞書として返す。
+    top_kを指定した場合は上位top_k件のみを返す。"""
+    table = NodeTable(nodes, {name: np.asarray(values, dtype=np.float64)})
+    return _table_result(table, name, as_table, top_k)
+
+
+def _table_result(table, name, as_table, top_k=None):
+    with phase("sorting"):
+        if top_k is not None:
+            table = table.top_k(name, top_k)
+            sort = False
+        else:
+            sort = True
+        if as_table:
+            return table
+        return table.to_dict(name, sort=sort)
+
+
+def _dict_to_arrays(values):
+    return list(values), np.fromiter(values.values(), dtype=np.float64, count=len(values))
+
+
+def _aligned(cg, values):
+    """ノードID → 値の辞書をcg.nodesの順の配列にする。"""
+    return np.fromiter((values[v] for v in cg.nodes), dtype=np.float64, count=cg.n_nodes)
+
+
+@register("degree_centrality", "numpy")
+def _degree_centrality_numpy(cg):
+    n = cg.n_nodes
+    degrees = (np.bincount(cg.src, minlength=n)
+               + np.bincount(cg.dst, minlength=n))
+    if n <= 1:
+        return np.ones(n)
+    return degrees * (1.0 / (n - 1.0))
+
+
+@register("degree_centrality", "networkx")
+def _degree_centrality_networkx(cg):
+    return _aligned(cg, nx.degree_centrality(cg.to_networkx()))
+
+
+@profiled
+def calc_degree_centralities(dg, as_table=False, top_k=None, backend=None):
+    """次数中心性の算出
+    nx.degree_centralityと同じく次数を(ノード数-1)で割った値を、次数の配列から求める。
+
+    Args:
+        dg (nx.DiGraph, nx.Graph or CompiledGraph): グラフ
+        as_table (bool, optional): Trueの場合はdegree_centrality列のNodeTableを返す
+        top_k (int, optional): 上位top_k件のみを返す（全体の並べ替えを行わない）
+        backend (str, optional): "numpy" or "networkx"。Noneの場合はset_backendの設定か"numpy"
+
+    Raises:
+        ValueError: top_kが整数でない場合
+
+    Returns:
+        dict: 次数中心性の降順に並べたノードIDと次数中心性の辞書
+    """
+    _check_top_k(top_k)
+    cg = compile_graph(dg)
+    impl = dispatch("degree_centrality", backend) or _degree_centrality_numpy
+    with phase("compute"):
+        values = impl(cg)
+    return _centrality_result(
+        cg.nodes, values, "degree_centrality", as_table, top_k
+    )
 
 
-def calc_degree_centralities(dg):
-    degree_centers = nx.degree_centrality(dg)
-    return {k:v for k,v in sorted(degree_centers.items(), key=lambda x:x[1], reverse=True)}
+@register("closeness", "igraph")
+def _closeness_igraph(cg):
+    return np.array(cg.to_igraph().closeness(), dtype=np.float64)
+
+
+@register("closeness", "scipy")
+def _closeness_scipy(cg):
+    n = cg.n_nodes
+    indptr, indices = cg.undirected_csr
+    res = map_components(closeness_arrays, cg.weak_components[1], indptr,
+                         indices, inline=n <= PARALLEL_THRESHOLD_NODES)
+    with phase("reduction"):
+        expansion = np.zeros(n)
+        farness = np.zeros(n)
+        for nodes, (sources, e, f) in res:
+            expansion[nodes[sources]] = e
+            farness[nodes[sources]] = f
+    # igraphと同じく、到達可能なノードがない場合はNaN
+    return np.divide(expansion, farness, out=np.full(n, np.nan), where=farness > 0)
+
+
+@register("closeness", "networkx")
+def _closeness_networkx(cg):
+    g = cg.to_networkx()
+    if g.is_directed():
+        g = g.to_undirected(as_view=True)
+    values = _aligned(cg, nx.closeness_centrality(g, wf_improved=False))
+    isolated = np.array([all(u == v for u in g[v]) for v in cg.nodes], dtype=bool)
+    values[isolated] = np.nan
+    return values
+
+
+@profiled
+def calc_close_centralities(dg, as_table=False, top_k=None, backend=None):
+    """近接中心性の算出（igraphのcloseness）
+    向きを無視したグラフで、到達可能なノードのみを対象に
+    (到達可能なノード数 - 1) / 距離の和 を求める。孤立ノードはNaN。
+    top_kを指定した場合は、上界による枝刈りで全ノードからの探索を省略する
+    （top_k_closenessを参照）。
 
+    Args:
+        dg (nx.DiGraph, nx.Graph or CompiledGraph): グラフ
+        as_table (bool, optional): Trueの場合はcloseness_centrality列のNodeTableを返す
+        top_k (int, optional): 上位top_k件のみを返す
+        backend (str, optional): "igraph", "scipy" or "networkx"。
+            Noneの場合はset_backendの設定か"igraph"（top_kの指定時は枝刈り）
 
-def calc_close_centralities(dg):
-    dg_ig = ig.Graph.from_networkx(dg)
-    keys = dg_ig.vs["_nx_name"]
-    close_centers = [(key, value) for key, value in zip(keys, dg_ig.closeness())]
-    return {k:v for k,v in sorted(close_centers, key=lambda x:x[1], reverse=True)}
+    Raises:
+        ValueError: top_kが整数でない場合
 
+    Returns:
+        dict: 近接中心性の降順に並べたノードIDと近接中心性の辞書
+    """
+    _check_top_k(top_k)
+    cg = compile_graph(dg)
+    impl = dispatch("closeness", backend)
+    if top_k is not None and impl is None:
+        with phase("compute"):
+            table = top_k_closeness(cg, top_k).table
+        return _table_result(table, "closeness_centrality", as_table)
+    impl = impl or _closeness_igraph
+    with phase("compute"):
+        values = impl(cg)
+    return _centrality_result(
+        cg.nodes, values, "closeness_centrality", as_table, top_k
+    )
 
-def calc_between_centralities(dg, processes=None):
-    if os.cpu_count() * 4 < len(dg.nodes()):
-        between_centers = betweenness_centrality_parallel(dg, processes)
+
+@register("betweenness", "numpy")
+def _betweenness_numpy(cg, processes=None):
+    return _aligned(cg, betweenness_centrality_parallel(cg, processes))
+
+
+@register("betweenness", "networkx")
+def _betweenness_networkx(cg, processes=None):
+    return _aligned(cg, nx.betweenness_centrality(cg.to_networkx()))
+
+
+@register("betweenness", "igraph")
+def _betweenness_igraph(cg, processes=None):
+    n = cg.n_nodes
+    values = np.array(cg.to_igraph().betweenness(directed=cg.directed), dtype=np.float64)
+    if n <= 2:
+        return np.zeros(n)
+    # nx.betweenness_centralityと同じ正規化
+    scale = 1 / ((n - 1) * (n - 2))
+    if not cg.directed:
+        scale *= 2
+    return values * scale
+
+
+@profiled
+def calc_between_centralities(dg, processes=None, epsilon=None, delta=0.1,
+                              time_budget=None, seed=None, return_error=False,
+                              as_table=False, top_k=None, backend=None):
+    """媒介中心性の算出
+    epsilonまたはtime_budgetを指定した場合はサンプリングによる近似値を求める。
+    （approximate_betweenness_centralityを参照。近似はbackendによらずNumPyで行う）
+
+    Args:
+        dg (nx.DiGraph, nx.Graph or CompiledGraph): グラフ
+        processes (int, optional): プロセス数
+        epsilon (float, optional): 近似の許容誤差
+        delta (float, optional): 誤差がepsilonを超える確率の上限
+        time_budget (float, optional): 近似計算の時間の上限（秒）
+        seed (int, optional): 乱数のシード
+        return_error (bool, optional): Trueの場合は誤差の上界も返す
+        as_table (bool, optional): Trueの場合はbetweenness_centrality列のNodeTableを返す
+        top_k (int, optional): 上位top_k件のみを返す
+        backend (str, optional): "numpy", "networkx" or "igraph"。Noneの場合はset_backendの設定か、
+            最大の弱連結成分のノード数がCPU数の4倍を超えれば"numpy"（並列）、それ以外は"networkx"
+
+    Raises:
+        ValueError: top_kが整数でない場合
+
+    Returns:
+        dict: 媒介中心性の降順に並べたノードIDと媒介中心性の辞書。
+            return_error=Trueの場合は(辞書, 誤差の上界)
+    """
+    _check_top_k(top_k)
+    error = 0.0
+    if epsilon is not None or time_budget is not None:
+        between_centers, error = approximate_betweenness_centrality(
+            dg, epsilon, delta, time_budget, seed, processes
+        )
+        nodes, values = _dict_to_arrays(between_centers)
     else:
-        between_centers = nx.betweenness_centrality(dg)
-    return {k:v for k,v in sorted(between_centers.items(), key=lambda x:x[1], reverse=True)}
+        cg = compile_graph(dg)
+        impl = dispatch("betweenness", backend)
+        if impl is None:
+            # 最大の弱連結成分がCPU数の4倍を超える場合のみ並列化の効果がある
+            if os.cpu_count() * 4 < np.bincount(cg.weak_components[1], minlength=1).max():
+                impl = _betweenness_numpy
+            else:
+                impl = _betweenness_networkx
+        with phase("compute"):
+            nodes, values = cg.nodes, impl(cg, processes)
+    between_centers = _centrality_result(
+        nodes, values, "betweenness_centrality", as_table, top_k
+    )
+    if return_error:
+        return between_centers, error
+    return between_centers
 
 
+@profiled
 def betweenness_centrality_parallel(G, processes=None):
-    """Parallel betweenness centrality  function"""
-    def chunks(l, n):
-        """Divide a list of nodes `l` in `n` chunks"""
-        l_c = iter(l)
-        while 1:
-            x = tuple(itertools.islice(l_c, n))
-            if not x:
-                return
-            yield x
-
-    p = multiprocessing.Pool(processes=processes)
-    node_divisor = len(p._pool) * 4
-    node_chunks = list(chunks(G.nodes(), G.order() // node_divisor))
-    num_chunks = len(node_chunks)
-    bt_sc = p.starmap(
-        nx.betweenness_centrality_subset,
-        zip(
-            [G] * num_chunks,
-            node_chunks,
-            [list(G)] * num_chunks,
-            [True] * num_chunks,
-            [None] * num_chunks,
-        ),
-    )
+    """Parallel betweenness centrality  function
+    弱連結成分ごとに分割し（map_componentsを参照）、使い回しのワーカープールで
+    成分の部分グラフごとにBrandesのアルゴリズムを実行して部分和を足し合わせる。
+    ノード数がPARALLEL_THRESHOLD_NODES以下の場合はプロセス内で計算する。
+    nx.betweenness_centrality(G)と同じく正規化した値を返す。
+
+    Args:
+        G (nx.DiGraph, nx.Graph or CompiledGraph): グラフ
+        processes (int, optional): プロセス数。Noneの場合はCPU数、1の場合は並列化しない。
+
+    Returns:
+        dict: ノードIDと媒介中心性の辞書
+    """
+    cg = compile_graph(G)
+    n = cg.n_nodes
+    indptr, indices = cg.out_csr
+    inline = processes == 1 or n <= PARALLEL_THRESHOLD_NODES
+    bt_sc = map_components(brandes_arrays, cg.weak_components[1], indptr,
+                           indices, processes, inline)
 
     # Reduce the partial solutions
-    bt_c = bt_sc[0]
-    for bt in bt_sc[1:]:
-        for n in bt:
-            bt_c[n] += bt[n]
-    return bt_c
-    
+    with phase("reduction"):
+        bt_c = np.zeros(n)
+        for nodes, partial in bt_sc:
+            bt_c[nodes] += partial
+        if n > 2:
+            bt_c *= 1 / ((n - 1) * (n - 2))
+        return dict(zip(cg.nodes, bt_c.tolist()))
+
+
+@profiled
+def approximate_betweenness_centrality(G, epsilon=None, delta=0.1,
+                                       time_budget=None, seed=None,
+                                       processes=None):
+    """媒介中心性の近似値の算出
+    始点ノードを一様にk個サンプリングし、Brandesのアルゴリズムの依存度をn/k倍して推定する。
+    1サンプルの寄与は[0, n/(n-1)]に収まるため、Hoeffdingの不等式と全ノードの和集合上界より
+    確率1-deltaで全ノードの誤差がepsilon以下になるサンプル数
+        k = (n/(n-1))**2 * ln(2n/delta) / (2 * epsilon**2)
+    を用いる。time_budgetを指定した場合は時間内でサンプリングを繰り返し、
+    達成できた誤差の上界を返す。必要なサンプル数がノード数以上の場合は厳密に計算する。
 
+    Args:
+        G (nx.DiGraph, nx.Graph or CompiledGraph): グラフ
+        epsilon (float, optional): 許容する誤差
+        delta (float, optional): 誤差がepsilonを超える確率の上限
+        time_budget (float, optional): 計算時間の上限（秒）
+        seed (int, optional): 乱数のシード
+        processes (int, optional): プロセス数。Noneの場合はCPU数、1の場合は並列化しない。
 
-def calc_eigen_centralities(dg):
-    eigen_centers = nx.eigenvector_centrality(dg, max_iter=1000)
-    return {k:v for k,v in sorted(eigen_centers.items(), key=lambda x:x[1], reverse=True)}
+    Raises:
+        ValueError: epsilonとtime_budgetのどちらも指定されていない場合
 
+    Returns:
+        tuple: (ノードIDと媒介中心性の推定値の辞書, 確率1-deltaで成り立つ誤差の上界)
+    """
+    if epsilon is None and time_budget is None:
+        raise ValueError("epsilon or time_budget must be specified.")
+    started = time.perf_counter()
+    cg = compile_graph(G)
+    n = cg.n_nodes
+    if n <= 2:
+        return dict.fromkeys(cg.nodes, 0.0), 0.0
+    value_range = n / (n - 1)
+    log_term = math.log(2 * n / delta)
+    required = None
+    if epsilon is not None:
+        required = math.ceil(value_range ** 2 * log_term / (2 * epsilon ** 2))
+        if required >= n:
+            logger.debug("sample size exceeds #nodes; computing exactly")
+            return betweenness_centrality_parallel(cg, processes), 0.0
+
+    indptr, indices = cg.out_csr
+    inline = processes == 1
+    n_batches = 1 if inline else len(get_pool(processes)._pool) * 4
+    rng = np.random.default_rng(seed)
+    round_size = required if time_budget is None else max(n_batches, 64)
+    betweenness = np.zeros(n)
+    k = 0
+    while True:
+        size = round_size if required is None else min(round_size, required - k)
+        samples = rng.integers(0, n, size=size)
+        source_batches = [
+            batch for batch in np.array_split(samples, n_batches) if len(batch)
+        ]
+        res = map_sources(brandes_arrays, indptr, indices, None, processes,
+                          inline, source_batches=source_batches)
+        with phase("reduction"):
+            betweenness += np.sum(res, axis=0)
+        k += size
+        if required is not None and k >= required:
+            break
+        if time_budget is not None and time.perf_counter() - started >= time_budget:
+            break
+
+    betweenness *= n / k / ((n - 1) * (n - 2))
+    achieved = value_range * math.sqrt(log_term / (2 * k))
+    return dict(zip(cg.nodes, betweenness.tolist())), achieved
+
+
+@register("eigenvector", "scipy")
+def _eigenvector_scipy(cg, tol=1e-06, nstart=None):
+    return _aligned(cg, sparse_eigenvector_centrality(
+        cg, tol=tol, max_iter=1000, nstart=nstart
+    ).values)
+
+
+@register("eigenvector", "networkx")
+def _eigenvector_networkx(cg, tol=1e-06, nstart=None):
+    return _aligned(cg, nx.eigenvector_centrality(
+        cg.to_networkx(), max_iter=1000, tol=tol, nstart=nstart, weight=None
+    ))
+
+
+@profiled
+def calc_eigen_centralities(dg, tol=1e-06, nstart=None, as_table=False,
+                            top_k=None, backend=None):
+    """固有ベクトル中心性の算出
+    疎行列のべき乗法で求める（sparse_eigenvector_centralityを参照）。
+
+    Args:
+        dg (nx.DiGraph, nx.Graph or CompiledGraph): グラフ
+        tol (float, optional): 収束判定の許容誤差
+        nstart (dict or np.ndarray, optional): 初期ベクトル（前回の結果など）
+        as_table (bool, optional): Trueの場合はeigenvector_centrality列のNodeTableを返す
+        top_k (int, optional): 上位top_k件のみを返す（全体の並べ替えを行わない）
+        backend (str, optional): "scipy" or "networkx"。Noneの場合はset_backendの設定か"scipy"
+
+    Raises:
+        ValueError: top_kが整数でない場合
+
+    Returns:
+        dict: 固有ベクトル中心性の降順に並べたノードIDと固有ベクトル中心性の辞書
+    """
+    _check_top_k(top_k)
+    cg = compile_graph(dg)
+    impl = dispatch("eigenvector", backend) or _eigenvector_scipy
+    with phase("compute"):
+        values = impl(cg, tol=tol, nstart=nstart)
+    return _centrality_result(
+        cg.nodes, values, "eigenvector_centrality", as_table, top_k
+    )
 
-def get_degree_expansion_elongation(dg):
+
+@profiled
+def get_degree_expansion_elongation(dg, processes=None):
     """拡張度の算出
     任意ノードから最短経路の終端ノード数
+    弱連結成分ごとに分割したCSR配列を共有メモリに一度だけ配置し（map_componentsを参照）、
+    使い回しのワーカープールが成分の部分グラフごとに最短経路長を求める。
+    ノード数がPARALLEL_THRESHOLD_NODES以下の場合はプロセス内で計算する。
     Arguments:
-        dg {DirectedGraph} -- 有向グラフのインスタンス
+        dg {DirectedGraph or CompiledGraph} -- 有向グラフのインスタンス
+        processes {int} -- プロセス数。Noneの場合はN_PROCESSES、1の場合は並列化しない。
     
     Returns:
-        dict -- ノードIDと拡張度の辞書
+        tuple -- (ノードIDと拡張度の辞書, ノードIDと伸長度の辞書)
     """
-    nodes = [str(n) for n in dg.nodes]
-    logger.debug(f"parallelization by #cpus: {N_PROCESSES}")
-    arguments = [(expansion_elongation, (dg, node)) for node in nodes]
-    res = []
-
-    with multiprocessing.Pool(N_PROCESSES) as p:
-        res = p.map(wrapper4parallel, arguments)
-
-    expansion_dict = {vertex: expansion for vertex, expansion, _ in res}
-    elongation_dict = {vertex: elongation for vertex, _, elongation in res}
+    cg = compile_graph(dg)
+    if processes is None:
+        processes = N_PROCESSES
+    n = cg.n_nodes
+    expansion = np.zeros(n, dtype=np.int64)
+    elongation = np.zeros(n, dtype=np.int64)
+
+    indptr, indices = cg.out_csr
+    inline = processes == 1 or n <= PARALLEL_THRESHOLD_NODES
+    if not inline:
+        logger.debug(f"parallelization by #cpus: {processes}")
+    res = map_components(expansion_elongation_arrays, cg.weak_components[1],
+                         indptr, indices, processes, inline)
+
+    with phase("reduction"):
+        for nodes, (batch, batch_expansion, batch_elongation) in res:
+            expansion[nodes[batch]] = batch_expansion
+            elongation[nodes[batch]] = batch_elongation
+        expansion_dict = dict(zip(cg.nodes, expansion.tolist()))
+        elongation_dict = dict(zip(cg.nodes, elongation.tolist()))
     return (expansion_dict, elongation_dict)
 
 
+@profiled
+def get_distance_profile(dg, mode="out", processes=None):
+    """距離に関する指標の一括算出
+    全ノードを始点とする1回の探索で、ノードごとに次の指標をまとめて求める。
+    - expansion: 拡張度（到達可能なノード数）
+    - elongation: 伸長度（到達可能なノードまでの最大の最短経路長）
+    - closeness: 近接中心性（拡張度 / 到達可能なノードまでの距離の総和）。
+      modeの向きに探索した値で、mode="all"の場合のみcalc_close_centralities（向きを無視）と
+      一致する。到達可能なノードがない場合はcalc_close_centralitiesのNaNに対して0とする。
+    - harmonic_closeness: 調和中心性（到達可能なノードまでの距離の逆数の総和）
+    - distance_histogram: ホップ数ごとのノード数（ノード数 × (最大ホップ数 + 1)）
+    Arguments:
+        dg {DirectedGraph, Graph or CompiledGraph} -- グラフのインスタンス
+        mode {str} -- 探索の向き。"out"（出次方向）, "in"（入次方向）, "all"（無向）
+        processes {int} -- プロセス数。Noneの場合はN_PROCESSES、1の場合は並列化しない。
+
+    Returns:
+        NodeTable -- ノードごとの指標の表
+    """
+    cg = compile_graph(dg)
+    if processes is None:
+        processes = N_PROCESSES
+    indptr, indices = {
+        "out": cg.out_csr,
+        "in": cg.in_csr,
+        "all": cg.undirected_csr,
+    }[mode]
+    n = cg.n_nodes
+    inline = processes == 1 or n <= PARALLEL_THRESHOLD_NODES
+    res = map_components(distance_profile_arrays, cg.weak_components[1],
+                         indptr, indices, processes, inline)
+
+    with phase("reduction"):
+        expansion = np.zeros(n, dtype=np.int64)
+        elongation = np.zeros(n, dtype=np.int64)
+        closeness = np.zeros(n)
+        harmonic = np.zeros(n)
+        width = max([batch[2].max() + 1 for _, batch in res], default=1)
+        histogram = np.zeros((n, width), dtype=np.int64)
+        for nodes, (batch, *values) in res:
+            batch = nodes[batch]
+            expansion[batch], elongation[batch] = values[0], values[1]
+            closeness[batch], harmonic[batch] = values[2], values[3]
+            histogram[batch, :values[4].shape[1]] = values[4]
+    return NodeTable(cg.nodes, {
+        "expansion": expansion,
+        "elongation": elongation,
+        "closeness": closeness,
+        "harmonic_closeness": harmonic,
+        "distance_histogram": histogram,
+    })
+
+
+@profiled
 def node_teacher_disciple_degree(dg):
     """師弟度
     あるノードの全関係に対する単方向の関係の割合
@@ -206,7 +659,7 @@ def node_teacher_disciple_degree(dg):
     全関係数から双方向の関係数を減ずることで求めることができる。
 
     Args:
-        dg (nx.DiGraph): 有向グラフ
+        dg (nx.DiGraph or CompiledGraph): 有向グラフ
 
     Raises:
         Exception: クラスチェック
@@ -214,24 +667,12 @@ def node_teacher_disciple_degree(dg):
     Returns:
         dict: ノードごとの師弟度辞書
     """
-    if type(dg) != nx.DiGraph:
-        raise Exception("dg is not DiGraph")
-    unweight_dg = to_unweighted(dg)
-    g = unweight_dg.to_undirected()
-    in_degrees = dict(unweight_dg.in_degree)
-    out_degrees = dict(unweight_dg.out_degree)
-    nodes = list(unweight_dg.nodes)
-    degrees = dict(g.degree)
-    content = {}
-    for node in nodes:
-        bidirect = in_degrees[node] + out_degrees[node] - degrees[node]
-        if degrees[node] > 0:
-            content[node] = (degrees[node] - bidirect) / degrees[node]
-        else:
-            content[node] = 0
-    return content
+    table = node_reciprocity_table(dg)
+    with phase("sorting"):
+        return table.to_dict("teacher_disciple_degree")
 
 
+@profiled
 def node_colleague_degree(dg):
     """同僚度
     あるノードの全関係に対する双方向の関係の割合
@@ -240,7 +681,7 @@ def node_colleague_degree(dg):
     接続されているエッジ数の合計から全単方向の関係数を減ずることで求めている。    
 
     Args:
-        dg (nx.DiGraph): 有向グラフ
+        dg (nx.DiGraph or CompiledGraph): 有向グラフ
 
     Raises:
         Exception: クラスチェック
@@ -248,29 +689,17 @@ def node_colleague_degree(dg):
     Returns:
         dict: ノードごとの同僚度
     """
-    if type(dg) != nx.DiGraph:
-        raise Exception("dg is not DiGraph")
-    unweight_dg = to_unweighted(dg)
-    g = unweight_dg.to_undirected()
-    in_degrees = dict(unweight_dg.in_degree)
-    out_degrees = dict(unweight_dg.out_degree)
-    nodes = list(unweight_dg.nodes)
-    degrees = dict(g.degree)
-    content = {}
-    for node in nodes:
-        bidirect = in_degrees[node] + out_degrees[node] - degrees[node]
-        if degrees[node] > 0:
-            content[node] = bidirect / degrees[node]
-        else:
-            content[node] = 0
-    return content
+    table = node_reciprocity_table(dg)
+    with phase("sorting"):
+        return table.to_dict("colleague_degree")
 
 
+@profiled
 def node_unidirect_density(dg):
     """単方向密度
     単方向の接続数 / 完全グラフとした時の接続数
     Args:
-        dg (nx.DiGraph): [description]
+        dg (nx.DiGraph or CompiledGraph): [description]
 
     Raises:
         Exception: [description]
@@ -278,26 +707,17 @@ def node_unidirect_density(dg):
     Returns:
         dict: [description]
     """
-    if type(dg) != nx.DiGraph:
-        raise Exception("dg is not DiGraph")
-    unweight_dg = to_unweighted(dg)
-    g = unweight_dg.to_undirected()
-    in_degrees = dict(unweight_dg.in_degree)
-    out_degrees = dict(unweight_dg.out_degree)
-    nodes = list(unweight_dg.nodes)
-    degrees = dict(g.degree)
-    content = {}
-    for node in nodes:
-        bidirect = in_degrees[node] + out_degrees[node] - degrees[node]
-        content[node] = (degrees[node] - bidirect) / (2 * len(nodes))
-    return content
+    table = node_reciprocity_table(dg)
+    with phase("sorting"):
+        return table.to_dict("unidirect_density")
 
 
+@profiled
 def node_bidirect_density(dg):
     """双方向密度
     単方向の接続数 / 完全グラフとした時の接続数
     Args:
-        dg (nx.DiGraph): [description]
+        dg (nx.DiGraph or CompiledGraph): [description]
 
     Raises:
         Exception: [description]
@@ -305,16 +725,6 @@ def node_bidirect_density(dg):
     Returns:
         dict: [description]
     """
-    if type(dg) != nx.DiGraph:
-        raise Exception("dg is not DiGraph")
-    unweight_dg = to_unweighted(dg)
-    g = unweight_dg.to_undirected()
-    in_degrees = dict(unweight_dg.in_degree)
-    out_degrees = dict(unweight_dg.out_degree)
-    nodes = list(unweight_dg.nodes)
-    degrees = dict(g.degree)
-    content = {}
-    for node in nodes:
-        bidirect = in_degrees[node] + out_degrees[node] - degrees[node]
-        content[node] = bidirect / (2 * len(nodes))
-    return content
\ No newline at end of file
+    table = node_reciprocity_table(dg)
+    with phase("sorting"):
+        return table.to_dict("bidirect_density")
@@ -1,4 +1,24 @@
+import atexit
+import logging
+import multiprocessing
+import os
+from multiprocessing import resource_tracker, shared_memory
 import networkx as nx
+import numpy as np
+import threading
+import time
+from grina.profiling import add_phase, is_profiling, phase
+
+logger = logging.getLogger("grina")
+
+# 1バッチで確保する距離行列の上限（バイト）
+BATCH_BYTES = 64 * 1024 * 1024
+# Jobの実行中、ワーカーの結果を待つ間に中断の要求を確認する間隔（秒）
+POLL_SECONDS = 0.05
+
+_pool = None
+_pool_processes = None
+_local = threading.local()
 
 
 def wrapper4parallel(args):
@@ -13,4 +33,540 @@ def expansion_elongation(G, vertex):
     ]
     expansion = len(shortest_path_lengths) - 1
     elongation = max(shortest_path_lengths)
-    return (vertex, expansion, elongation)
\ No newline at end of file
+    return (vertex, expansion, elongation)
+
+
+class SharedArrays:
+    """複数のnp.ndarrayを1つの共有メモリブロックに配置する。
+    ワーカーにはhandle（共有メモリ名と各配列の位置）だけを渡し、
+    グラフ本体はプロセス間で一度だけ共有する。
+
+    Args:
+        arrays (dict): 配列名 → np.ndarray
+    """
+
+    def __init__(self, arrays):
+        layout = {}
+        offset = 0
+        for key, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            layout[key] = (offset, array.shape, array.dtype.str)
+            offset += array.nbytes
+        self._shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for key, array in arrays.items():
+            start, shape, dtype = layout[key]
+            view = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf, offset=start)
+            view[...] = array
+        self.handle = (self._shm.name, layout)
+
+    def close(self):
+        """共有メモリを解放する。"""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_attached(handle, fn, *args):
+    """ワーカー側で共有メモリ上の配列にアタッチしてfn(arrays, *args)を実行する。
+    タスクが終わるとすぐに切り離すため、親が解放した共有メモリをワーカーが保持し続けることはない。
+    fnの戻り値は共有メモリ上の配列を参照してはならない。
+
+    Args:
+        handle (tuple): SharedArrays.handle
+        fn (callable): 配列名 → np.ndarray の辞書を受け取る関数
+
+    Returns:
+        fnの戻り値
+    """
+    name, layout = handle
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        arrays = {
+            key: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            for key, (offset, shape, dtype) in layout.items()
+        }
+        return fn(arrays, *args)
+    finally:
+        arrays = None
+        try:
+            shm.close()
+        except BufferError:
+            # 例外のトレースバックが配列を参照している場合は、参照が消えたときに解放される
+            logger.debug(f"shared memory {name} is still referenced")
+
+
+class JobCancelled(Exception):
+    """Job.cancel()により計算を中断した"""
+
+
+class Job:
+    """進捗の通知と中断に対応した計算
+    withブロックの中（同じスレッド）で呼び出した並列計算は、使い回しのワーカープールの
+    代わりにこのJob専用のプールを使い、始点ノードの処理数を進捗として通知する。
+    cancel()は別のスレッドから呼び出すことができ、計算は作業単位の区切りで
+    JobCancelledを送出する。ブロックを抜けるときに専用のプールを終了する
+    （例外で抜けた場合はワーカーを強制終了する）。
+    専用のプールのワーカーはforkserverで起動し、起動時にメインモジュールを読み込み直すため、
+    スクリプトから使う場合は if __name__ == "__main__": で呼び出しを囲む必要がある。
+    ワーカーが異常終了した場合は、待ち続けずにRuntimeErrorを送出する。
+
+    Args:
+        progress (callable, optional): progress(処理済みの始点数, 始点数)を受け取る関数。
+            計算を実行しているスレッドから呼び出す。
+
+    Attributes:
+        done (int): 処理済みの始点数
+        total (int): 実行中の計算の始点数
+    """
+
+    def __init__(self, progress=None):
+        self.progress = progress
+        self.done = 0
+        self.total = 0
+        self._cancelled = threading.Event()
+        self._pool = None
+        self._pool_processes = None
+        self._workers = []
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """中断を要求する。"""
+        self._cancelled.set()
+
+    def check(self):
+        """中断が要求されていればJobCancelledを送出する。
+
+        Raises:
+            JobCancelled: 中断が要求された場合
+            RuntimeError: 専用のプールのワーカーが異常終了した場合
+        """
+        if self._cancelled.is_set():
+            raise JobCancelled("job was cancelled")
+        for worker in self._workers:
+            if worker.exitcode:
+                raise RuntimeError(
+                    f"a worker process exited unexpectedly (exit code {worker.exitcode}). "
+                    "Job workers re-import the main module; "
+                    "guard the calling script with if __name__ == '__main__':"
+                )
+
+    def begin(self, total):
+        """始点数totalの計算を始める。"""
+        self.done = 0
+        self.total = total
+        self._report()
+
+    def advance(self, n):
+        """始点n個の処理が終わったことを通知する。"""
+        self.done += n
+        self._report()
+
+    def _report(self):
+        if self.progress is not None:
+            self.progress(self.done, self.total)
+
+    def get_pool(self, processes):
+        if self._pool is not None and self._pool_processes != processes:
+            self._close(terminate=False)
+        if self._pool is None:
+            self._pool = _start_pool(processes, _job_context())
+            self._pool_processes = processes
+            # プールが入れ替えたワーカーは追えないため、起動時のワーカーを監視する
+            self._workers = list(self._pool._pool)
+        return self._pool
+
+    def _close(self, terminate):
+        if self._pool is not None:
+            if terminate:
+                self._pool.terminate()
+            else:
+                self._pool.close()
+            self._pool.join()
+            self._pool = None
+            self._pool_processes = None
+            self._workers = []
+
+    def __enter__(self):
+        if getattr(multiprocessing.current_process(), "_inheriting", False):
+            # ワーカーの起動中にメインモジュールから呼び出された
+            raise RuntimeError(
+                "Job was started while a worker process was importing the main module; "
+                "guard the calling script with if __name__ == '__main__':"
+            )
+        if current_job() is not None:
+            raise RuntimeError("another job is running in this thread")
+        _local.job = self
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        _local.job = None
+        self._close(terminate=exc_type is not None)
+
+
+def current_job():
+    """このスレッドで実行中のJob（なければNone）"""
+    return getattr(_local, "job", None)
+
+
+def _job_context():
+    """Job専用のプールの開始方式
+    Jobは他のスレッドが動いている状態で実行されることが多く、そこからforkしたワーカーは
+    ロックを持ったまま複製されてデッドロックしうるため、使えればforkserverを使う。"""
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context()
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["grina.parallel", "grina.scheduler"])
+    return context
+
+
+def _start_pool(processes, context=multiprocessing):
+    logger.debug(f"start worker pool with {processes} processes")
+    with phase("pool"):
+        # ワーカーが共有メモリの管理プロセスを親と共有するよう、先に起動しておく
+        resource_tracker.ensure_running()
+        return context.Pool(processes)
+
+
+def get_pool(processes=None):
+    """プロセス間で使い回すワーカープールを返す。
+    プロセス数が変わった場合のみ作り直す。Jobの実行中はJob専用のプールを返す。
+
+    Args:
+        processes (int, optional): プロセス数。Noneの場合はCPU数。
+
+    Returns:
+        multiprocessing.pool.Pool: ワーカープール
+    """
+    global _pool, _pool_processes
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    job = current_job()
+    if job is not None:
+        return job.get_pool(processes)
+    if _pool is not None and _pool_processes != processes:
+        close_pool()
+    if _pool is None:
+        _pool = _start_pool(processes)
+        _pool_processes = processes
+    return _pool
+
+
+def submit(pool, fn, args):
+    """ワーカーにfn(*arg)のタスクを渡した順に1つずつ送る。
+
+    Returns:
+        list: AsyncResultのリスト
+    """
+    return [pool.apply_async(fn, arg) for arg in args]
+
+
+def collect(pending, sizes):
+    """submitしたタスクの結果を順に受け取る。
+    Jobの実行中は、待つ間に中断の要求を確認し、完了したタスクの始点数を進捗として通知する。
+
+    Args:
+        pending (list): submitの戻り値
+        sizes (list): タスクごとの始点数
+
+    Raises:
+        JobCancelled: Jobの中断が要求された場合
+
+    Returns:
+        list: タスクごとの結果
+    """
+    job = current_job()
+    results = []
+    for task, size in zip(pending, sizes):
+        if job is not None:
+            while not task.ready():
+                job.check()
+                task.wait(POLL_SECONDS)
+        results.append(task.get())
+        if job is not None:
+            job.advance(size)
+    return results
+
+
+def checked(items, sizes):
+    """プロセス内で順に処理する要素を返すイテレータ
+    Jobの実行中は、要素ごとに中断の要求を確認し、処理後に始点数を進捗として通知する。"""
+    job = current_job()
+    for item, size in zip(items, sizes):
+        if job is not None:
+            job.check()
+        yield item
+        if job is not None:
+            job.advance(size)
+
+
+def begin(total):
+    """Jobの実行中であれば、始点数totalの計算の開始を通知する。"""
+    job = current_job()
+    if job is not None:
+        job.begin(total)
+
+
+def close_pool():
+    """使い回しているワーカープールを終了する。"""
+    global _pool, _pool_processes
+    if _pool is not None:
+        _pool.close()
+        _pool.join()
+        _pool = None
+        _pool_processes = None
+
+
+atexit.register(close_pool)
+
+
+def batches(sources, n_nodes, n_workers):
+    """始点ノードをワーカー数に応じたバッチに分割する。
+    1バッチの距離行列がBATCH_BYTESを超えないように大きさを抑える。
+
+    Args:
+        sources (np.ndarray): 始点ノードのインデックス
+        n_nodes (int): ノード数
+        n_workers (int): ワーカー数
+
+    Returns:
+        list: 始点インデックスの配列のリスト
+    """
+    size = -(-len(sources) // (n_workers * 4))
+    size = max(1, min(size, BATCH_BYTES // (8 * max(n_nodes, 1))))
+    return [sources[i:i + size] for i in range(0, len(sources), size)]
+
+
+def csr_adjacency(indptr, indices):
+    """CSR配列(indptr, indices)からscipyの疎行列を作る。"""
+    import scipy.sparse as sp
+    n = len(indptr) - 1
+    with phase("conversion"):
+        data = np.ones(len(indices), dtype=np.float64)
+        return sp.csr_matrix((data, indices, indptr), shape=(n, n))
+
+
+def _kernel_on_arrays(arrays, kernel, sources):
+    return kernel(csr_adjacency(arrays["indptr"], arrays["indices"]), sources)
+
+
+def _run_kernel(kernel, handle, sources):
+    return run_attached(handle, _kernel_on_arrays, kernel, sources)
+
+
+def timed(fn, *args):
+    """fn(*args)を実行し、計測用にワーカーのプロセスIDと計算時間も返す。"""
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, os.getpid(), time.perf_counter() - started
+
+
+def untime(res, max_seconds=None):
+    """timedの戻り値のリストから結果を取り出し、最も長く計算していたワーカーの
+    計算時間（max_secondsが上限）を計測中の呼び出しのcomputeに加算する。"""
+    busy = {}
+    for _, pid, seconds in res:
+        busy[pid] = busy.get(pid, 0.0) + seconds
+    seconds = max(busy.values(), default=0.0)
+    if max_seconds is not None:
+        seconds = min(seconds, max_seconds)
+    add_phase("compute", seconds)
+    return [result for result, _, _ in res]
+
+
+def map_sources(kernel, indptr, indices, sources, processes=None, inline=False,
+                source_batches=None):
+    """CSR配列で表したグラフについて、始点ノードのバッチごとにkernelを実行する。
+    並列実行時はCSR配列を共有メモリに一度だけ配置し、使い回しのワーカープールで処理する。
+
+    Args:
+        kernel (callable): kernel(adjacency, sources)を受け取るモジュールレベルの関数
+        indptr (np.ndarray): CSRのindptr
+        indices (np.ndarray): CSRのindices
+        sources (np.ndarray): 始点ノードのインデックス
+        processes (int, optional): プロセス数
+        inline (bool, optional): Trueの場合はプロセス内で実行する
+        source_batches (list, optional): 分割済みの始点バッチ。指定した場合はsourcesを無視する。
+
+    Returns:
+        list: バッチごとのkernelの戻り値
+    """
+    n = len(indptr) - 1
+    if inline:
+        adjacency = csr_adjacency(indptr, indices)
+        if source_batches is None:
+            source_batches = batches(sources, n, 1)
+        sizes = [len(batch) for batch in source_batches]
+        begin(sum(sizes))
+        with phase("compute"):
+            return [
+                kernel(adjacency, batch)
+                for batch in checked(source_batches, sizes)
+            ]
+    pool = get_pool(processes)
+    if source_batches is None:
+        source_batches = batches(sources, n, len(pool._pool))
+    sizes = [len(batch) for batch in source_batches]
+    begin(sum(sizes))
+    with phase("ipc"), SharedArrays({"indptr": indptr, "indices": indices}) as shared:
+        args = [(kernel, shared.handle, batch) for batch in source_batches]
+        if not is_profiling():
+            return collect(submit(pool, _run_kernel, args), sizes)
+        # 最も長く計算していたワーカーの計算時間をcompute、残りをipcとする
+        args = [(_run_kernel, *arg) for arg in args]
+        return untime(collect(submit(pool, timed, args), sizes))
+
+
+def bfs_distances(adjacency, sources):
+    """始点ごとの最短経路長（ホップ数）を求める。到達不能はinf。
+
+    Args:
+        adjacency (scipy.sparse.csr_matrix): 隣接行列
+        sources (np.ndarray): 始点ノードのインデックス
+
+    Returns:
+        np.ndarray: (始点数, ノード数)の距離行列
+    """
+    from scipy.sparse.csgraph import shortest_path
+    return shortest_path(
+        adjacency, method="D", directed=True, unweighted=True, indices=sources
+    ).reshape(len(sources), -1)
+
+
+def expansion_elongation_arrays(adjacency, sources):
+    """始点ノードごとの到達可能なノード数と最大の最短経路長を求める。
+
+    Args:
+        adjacency (scipy.sparse.csr_matrix): 隣接行列
+        sources (np.ndarray): 始点ノードのインデックス
+
+    Returns:
+        tuple: (始点インデックス, 拡張度, 伸長度)
+    """
+    dist = bfs_distances(adjacency, sources)
+    reachable = np.isfinite(dist)
+    expansion = reachable.sum(axis=1) - 1
+    elongation = np.where(reachable, dist, 0).max(axis=1).astype(np.int64)
+    return sources, expansion, elongation
+
+
+def closeness_arrays(adjacency, sources):
+    """始点ノードごとの到達可能なノード数と最短経路長の和を求める。
+
+    Args:
+        adjacency (scipy.sparse.csr_matrix): 隣接行列
+        sources (np.ndarray): 始点ノードのインデックス
+
+    Returns:
+        tuple: (始点インデックス, 到達可能なノード数（始点を除く）, 最短経路長の和)
+    """
+    dist = bfs_distances(adjacency, sources)
+    reachable = np.isfinite(dist)
+    expansion = reachable.sum(axis=1) - 1
+    farness = np.where(reachable, dist, 0).sum(axis=1)
+    return sources, expansion, farness
+
+
+def distance_profile_arrays(adjacency, sources):
+    """1回の探索で始点ノードごとの距離に関する指標をまとめて求める。
+    拡張度、伸長度（離心率）、近接中心性、調和中心性とホップ数のヒストグラムを返す。
+
+    Args:
+        adjacency (scipy.sparse.csr_matrix): 隣接行列
+        sources (np.ndarray): 始点ノードのインデックス
+
+    Returns:
+        tuple: (始点インデックス, 拡張度, 伸長度, 近接中心性, 調和中心性, ヒストグラム)
+    """
+    dist = bfs_distances(adjacency, sources)
+    reachable = np.isfinite(dist)
+    hops = np.where(reachable, dist, 0).astype(np.int64)
+    expansion = reachable.sum(axis=1) - 1
+    elongation = hops.max(axis=1)
+    farness = hops.sum(axis=1)
+    closeness = np.divide(
+        expansion, farness, out=np.zeros(len(sources)), where=farness > 0
+    )
+    inverse = np.divide(1.0, dist, out=np.zeros(dist.shape), where=hops > 0)
+    harmonic = inverse.sum(axis=1)
+
+    width = int(elongation.max()) + 1
+    rows = np.broadcast_to(np.arange(len(sources))[:, None], dist.shape)
+    keys = rows[reachable] * width + hops[reachable]
+    histogram = np.bincount(keys, minlength=len(sources) * width)
+    histogram = histogram.reshape(len(sources), width)
+    return sources, expansion, elongation, closeness, harmonic, histogram
+
+
+def brandes_arrays(adjacency, sources):
+    """Brandesのアルゴリズムによる、始点ノードのバッチからの媒介中心性の部分和
+    幅優先探索を階層ごとにまとめて行い、最短経路数と依存度をNumPyで集計する。
+
+    Args:
+        adjacency (scipy.sparse.csr_matrix): 隣接行列
+        sources (np.ndarray): 始点ノードのインデックス
+
+    Returns:
+        np.ndarray: ノードごとの依存度の合計（正規化前）
+    """
+    indptr, indices = adjacency.indptr, adjacency.indices
+    n = len(indptr) - 1
+    betweenness = np.zeros(n)
+    dist = np.full(n, -1, dtype=np.int64)
+    sigma = np.zeros(n)
+    delta = np.zeros(n)
+    for s in np.asarray(sources).tolist():
+        dist[s] = 0
+        sigma[s] = 1.0
+        frontier = np.array([s], dtype=np.int64)
+        visited = [frontier]
+        levels = []
+        level = 0
+        while True:
+            starts = indptr[frontier]
+            counts = indptr[frontier + 1] - starts
+            total = int(counts.sum())
+            if total == 0:
+                break
+            offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            tails = np.repeat(frontier, counts)
+            heads = indices[np.repeat(starts, counts) + offsets]
+            discovered = np.unique(heads[dist[heads] < 0])
+            if len(discovered) == 0:
+                break
+            dist[discovered] = level + 1
+            on_dag = dist[heads] == level + 1
+            tails, heads = tails[on_dag], heads[on_dag]
+            # 次の階層の最短経路数 = 前の階層からの最短経路数の和
+            head_pos = np.searchsorted(discovered, heads)
+            sigma[discovered] = np.bincount(
+                head_pos, weights=sigma[tails], minlength=len(discovered)
+            )
+            levels.append((frontier, tails, heads))
+            visited.append(discovered)
+            frontier = discovered
+            level += 1
+
+        # 深い階層から依存度を逆伝搬する
+        for frontier, tails, heads in reversed(levels):
+            tail_pos = np.searchsorted(frontier, tails)
+            contribution = sigma[tails] / sigma[heads] * (1.0 + delta[heads])
+            delta[frontier] += np.bincount(
+                tail_pos, weights=contribution, minlength=len(frontier)
+            )
+        reached = np.concatenate(visited)
+        delta[s] = 0.0
+        betweenness[reached] += delta[reached]
+        dist[reached] = -1
+        sigma[reached] = 0.0
+        delta[reached] = 0.0
+    return betweenness
@@ -0,0 +1,279 @@
+from contextlib import contextmanager
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger("grina")
+
+# 計測する処理の区分
+PHASES = (
+    "conversion",  # networkx/igraph/CSRへの変換
+    "pool",        # ワーカープールの起動
+    "ipc",         # 共有メモリへの配置、引数と結果の受け渡し
+    "compute",     # 指標の計算
+    "reduction",   # バッチごとの結果の集約
+    "sorting",     # 結果の並べ替え・辞書への変換
+)
+
+_sinks = []
+_owner_pid = None
+_trace_memory = False
+_local = threading.local()
+
+
+class CallProfile:
+    """1回の指標の呼び出しの計測結果
+    phasesは区分ごとの時間（秒）で、入れ子の区分の時間は内側の区分にのみ計上する。
+
+    Attributes:
+        metric (str): 関数名（モジュール名.関数名）
+        n_nodes (int): グラフのノード数（不明な場合はNone）
+        n_edges (int): グラフのエッジ数（不明な場合はNone）
+        wall (float): 呼び出し全体の時間（秒）
+        phases (dict): 区分 → 時間（秒）
+        peak_rss (int): 呼び出し終了時点のプロセスのピークRSS（バイト）
+        peak_traced (int): 呼び出し中にPythonが確保したメモリのピーク（バイト）。
+            trace_memory=Trueの場合のみ
+    """
+
+    def __init__(self, metric, n_nodes=None, n_edges=None):
+        self.metric = metric
+        self.n_nodes = n_nodes
+        self.n_edges = n_edges
+        self.wall = 0.0
+        self.phases = {}
+        self.peak_rss = None
+        self.peak_traced = None
+        self._stack = []
+
+    @property
+    def other(self):
+        """どの区分にも含まれない時間（秒）"""
+        return max(self.wall - sum(self.phases.values()), 0.0)
+
+    def add(self, phase, seconds):
+        """区分の時間を加算する。"""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def as_dict(self):
+        return {
+            "metric": self.metric,
+            "n_nodes": self.n_nodes,
+            "n_edges": self.n_edges,
+            "wall": self.wall,
+            "phases": dict(self.phases, other=self.other),
+            "peak_rss": self.peak_rss,
+            "peak_traced": self.peak_traced,
+        }
+
+    def __repr__(self):
+        phases = ", ".join(
+            f"{name}={seconds:.4f}s"
+            for name, seconds in dict(self.phases, other=self.other).items()
+        )
+        memory = ""
+        if self.peak_rss is not None:
+            memory += f" peak_rss={self.peak_rss / 2 ** 20:.1f}MB"
+        if self.peak_traced is not None:
+            memory += f" peak_traced={self.peak_traced / 2 ** 20:.1f}MB"
+        return (
+            f"{self.metric}(nodes={self.n_nodes}, edges={self.n_edges}) "
+            f"wall={self.wall:.4f}s [{phases}]{memory}"
+        )
+
+
+class ProfileCollector:
+    """計測結果を溜めておくコレクタ（enable_profilingのcallbackとして使う）"""
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(record)
+
+    def summary(self):
+        """関数ごとの呼び出し回数と合計時間
+
+        Returns:
+            dict: 関数名 → {"calls", "wall", "phases"}
+        """
+        summary = {}
+        for record in self.records:
+            entry = summary.setdefault(
+                record.metric, {"calls": 0, "wall": 0.0, "phases": {}}
+            )
+            entry["calls"] += 1
+            entry["wall"] += record.wall
+            for name, seconds in dict(record.phases, other=record.other).items():
+                entry["phases"][name] = entry["phases"].get(name, 0.0) + seconds
+        return summary
+
+    def clear(self):
+        self.records.clear()
+
+    def __len__(self):
+        return len(self.records)
+
+
+def log_profile(record):
+    """計測結果を"grina"ロガーにINFOで出力する（enable_profilingの既定の出力先）"""
+    logger.info(f"profile: {record!r}")
+
+
+def enable_profiling(callback=None, trace_memory=False):
+    """計測を有効にする。有効にしたプロセスでの呼び出しのみを計測する。
+
+    Args:
+        callback (callable, optional): 計測結果（CallProfile）を受け取る関数。
+            Noneの場合は"grina"ロガーに出力する。
+        trace_memory (bool, optional): Trueの場合はtracemallocで呼び出し中の
+            メモリ確保のピークも計測する（計算が遅くなる）
+
+    Returns:
+        callable: 登録したcallback（disable_profilingに渡す）
+    """
+    global _owner_pid, _trace_memory
+    if callback is None:
+        callback = log_profile
+    _sinks.append(callback)
+    _owner_pid = os.getpid()
+    _trace_memory = _trace_memory or trace_memory
+    return callback
+
+
+def disable_profiling(callback=None):
+    """計測を無効にする。
+
+    Args:
+        callback (callable, optional): 外す出力先。Noneの場合は全て外す。
+    """
+    global _trace_memory
+    if callback is None:
+        _sinks.clear()
+    elif callback in _sinks:
+        _sinks.remove(callback)
+    if not _sinks:
+        _trace_memory = False
+
+
+def is_profiling():
+    """このプロセスで計測が有効かどうか"""
+    return bool(_sinks) and _owner_pid == os.getpid()
+
+
+@contextmanager
+def profile(callback=None, trace_memory=False):
+    """withブロックの中だけ計測を有効にする。
+
+    Args:
+        callback (callable, optional): 計測結果を受け取る関数。Noneの場合はProfileCollector。
+        trace_memory (bool, optional): enable_profilingを参照
+
+    Yields:
+        callable: callback（省略時はProfileCollector）
+    """
+    if callback is None:
+        callback = ProfileCollector()
+    enable_profiling(callback, trace_memory)
+    try:
+        yield callback
+    finally:
+        disable_profiling(callback)
+
+
+def current():
+    """このスレッドで計測中の呼び出しのCallProfile（計測中でなければNone）"""
+    return getattr(_local, "record", None)
+
+
+@contextmanager
+def phase(name):
+    """ブロックの時間を計測中の呼び出しの区分に加算する。
+    計測中でなければ何もしない。入れ子の場合、内側の時間は外側の区分から除く。
+
+    Args:
+        name (str): 区分（PHASESのいずれか）
+    """
+    record = current()
+    if record is None:
+        yield
+        return
+    frame = [name, time.perf_counter(), 0.0]
+    record._stack.append(frame)
+    try:
+        yield
+    finally:
+        record._stack.pop()
+        elapsed = time.perf_counter() - frame[1]
+        record.add(name, elapsed - frame[2])
+        if record._stack:
+            record._stack[-1][2] += elapsed
+
+
+def add_phase(name, seconds):
+    """ワーカーで計測した時間などを、計測中の呼び出しの区分に加算する。
+    加算した時間は、実行中の外側の区分からは除く。"""
+    record = current()
+    if record is None:
+        return
+    record.add(name, seconds)
+    if record._stack:
+        record._stack[-1][2] += seconds
+
+
+def _graph_size(g):
+    try:
+        return g.number_of_nodes(), g.number_of_edges()
+    except (AttributeError, TypeError):
+        return None, None
+
+
+def _peak_rss():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOSはバイト、Linuxはキロバイト
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def profiled(fn):
+    """指標の関数を計測の対象にするデコレータ
+    計測が無効の場合はそのまま呼び出す。指標の中から呼ばれた指標は、
+    外側の呼び出しの一部として計測する。"""
+    metric = f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _sinks or current() is not None or _owner_pid != os.getpid():
+            return fn(*args, **kwargs)
+        n_nodes, n_edges = _graph_size(args[0]) if args else (None, None)
+        record = CallProfile(metric, n_nodes, n_edges)
+        tracing = _trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        elif _trace_memory:
+            tracemalloc.reset_peak()
+        _local.record = record
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            record.wall = time.perf_counter() - started
+            _local.record = None
+            record.peak_rss = _peak_rss()
+            if _trace_memory:
+                record.peak_traced = tracemalloc.get_traced_memory()[1]
+                if tracing:
+                    tracemalloc.stop()
+            for sink in list(_sinks):
+                sink(record)
+    return wrapper
@@ -0,0 +1,207 @@
+from collections import namedtuple
+import networkx as nx
+import numpy as np
+from grina.compiled import compile_graph, graph_type
+from grina.profiling import phase
+from grina.table import NodeTable
+
+# このノード数を超えるグラフでは疎行列バックエンドを利用する
+SPARSE_THRESHOLD_NODES = 2000
+
+ReciprocityCounts = namedtuple(
+    "ReciprocityCounts", ["bidirect", "unidirect", "n_relations"]
+)
+
+
+def _reciprocal_mask(n, src, dst):
+    """逆向きのエッジが存在するエッジをTrueとするマスクを返す。
+    i->jを整数キー i*n+j に変換し、j->iのキーの存在をソートベースで判定する。
+    自己ループは自分自身が逆向きのエッジとなるためTrueになる。
+    """
+    with phase("compute"):
+        keys = src * n + dst
+        return np.isin(dst * n + src, keys)
+
+
+def _dense_counts(cg):
+    """隣接行列による双方向・単方向の接続数の算出"""
+    with phase("compute"):
+        adj = np.zeros((cg.n_nodes, cg.n_nodes))
+        adj[cg.src, cg.dst] = cg.weight
+        i_adj = np.where(adj > 0, 1, 0)
+        unidirect = np.count_nonzero(i_adj - i_adj.T) / 2
+        bidirect = np.count_nonzero(i_adj * i_adj.T) / 2
+    return ReciprocityCounts(bidirect, unidirect, cg.n_undirected_edges)
+
+
+def _sparse_counts(cg):
+    """エッジ配列による双方向・単方向の接続数の算出
+    隣接行列を作らずにO(E)のメモリで隣接行列版と同じ値を返す。
+    隣接行列版と同様に重みが正のエッジのみを接続とみなし、
+    自己ループは双方向の接続0.5本として数える。
+    """
+    with phase("compute"):
+        positive = cg.weight > 0
+        src, dst = cg.src[positive], cg.dst[positive]
+        is_loop = src == dst
+        mask = _reciprocal_mask(cg.n_nodes, src, dst)
+        # 隣接行列版と同じnumpyの型にする（関係数0のときの割り算がnanになるように）
+        bidirect = np.float64(np.count_nonzero(mask & ~is_loop)
+                              + np.count_nonzero(is_loop)) / 2
+        unidirect = np.float64(np.count_nonzero(~mask))
+    return ReciprocityCounts(bidirect, unidirect, cg.n_undirected_edges)
+
+
+def reciprocity_counts(dg, backend=None):
+    """双方向・単方向の接続数と全関係数を算出する。
+
+    Args:
+        dg (nx.DiGraph or CompiledGraph): 有向グラフ
+        backend (str, optional): "dense"（隣接行列）or "sparse"（エッジ配列）。
+            Noneの場合はノード数がSPARSE_THRESHOLD_NODESを超えると"sparse"を選ぶ。
+
+    Raises:
+        ValueError: 未知のbackendが指定された場合
+
+    Returns:
+        ReciprocityCounts: (双方向の接続数, 単方向の接続数, 全関係数)
+    """
+    cg = compile_graph(dg)
+    if backend is None:
+        if len(cg) > SPARSE_THRESHOLD_NODES:
+            backend = "sparse"
+        else:
+            backend = "dense"
+    if backend == "dense":
+        return _dense_counts(cg)
+    if backend == "sparse":
+        return _sparse_counts(cg)
+    raise ValueError(f"Unknown backend: {backend}")
+
+
+def node_reciprocity_table(dg):
+    """ノードごとの師弟度・同僚度・単方向密度・双方向密度を一度に算出する。
+    エッジ配列から入次数・出次数・双方向の関係数を数え、
+    グラフのコピーやノードごとのループなしで4つの指標をまとめて求める。
+    双方向の関係数 = (入次数 + 出次数) - 全関係数
+
+    Args:
+        dg (nx.DiGraph or CompiledGraph): 有向グラフ
+
+    Raises:
+        Exception: クラスチェック
+
+    Returns:
+        NodeTable: teacher_disciple_degree, colleague_degree,
+            unidirect_density, bidirect_densityの列を持つ表
+    """
+    if graph_type(dg) != nx.DiGraph:
+        raise Exception("dg is not DiGraph")
+    cg = compile_graph(dg)
+    n = cg.n_nodes
+    src, dst = cg.src, cg.dst
+    with phase("compute"):
+        reciprocal = _reciprocal_mask(n, src, dst) & (src != dst)
+        bidirect = np.bincount(src[reciprocal], minlength=n)
+        in_degrees = np.bincount(dst, minlength=n)
+        out_degrees = np.bincount(src, minlength=n)
+        degrees = in_degrees + out_degrees - bidirect
+        unidirect = degrees - bidirect
+
+        has_degree = degrees > 0
+        teacher_disciple = np.divide(
+            unidirect, degrees, out=np.zeros(n), where=has_degree
+        )
+        colleague = np.divide(
+            bidirect, degrees, out=np.zeros(n), where=has_degree
+        )
+    return NodeTable(cg.nodes, {
+        "teacher_disciple_degree": teacher_disciple,
+        "colleague_degree": colleague,
+        "unidirect_density": unidirect / (2 * n),
+        "bidirect_density": bidirect / (2 * n),
+    })
+
+
+class ReciprocalEdgeIndex:
+    """エッジを双方向（逆向きのエッジが存在する）と単方向に分類した索引
+    エッジを整数キーに変換してソートベースで逆向きのエッジを判定するため、
+    エッジごとにリストを探索せずにO(E log E)で全エッジを分類できる。
+    無向グラフでは全てのエッジを双方向とみなす。
+    分類結果は件数、インデックス配列、ノードIDのペアを少しずつ返すイテレータで取り出せる。
+
+    Attributes:
+        graph (CompiledGraph): 対象のグラフ
+        reciprocal (np.ndarray): エッジ配列の順に、双方向のエッジをTrueとするマスク
+    """
+
+    def __init__(self, dg):
+        self.graph = compile_graph(dg)
+        cg = self.graph
+        if cg.directed:
+            self.reciprocal = _reciprocal_mask(cg.n_nodes, cg.src, cg.dst)
+        else:
+            self.reciprocal = np.ones(cg.n_edges, dtype=bool)
+
+    @property
+    def n_bidirect(self):
+        """双方向の接続数（自己ループは1本として数える）"""
+        return len(self.bidirect_arrays()[0])
+
+    @property
+    def n_unidirect(self):
+        """単方向の接続数"""
+        return int(np.count_nonzero(~self.reciprocal))
+
+    def bidirect_arrays(self):
+        """双方向の接続を1組につき1本ずつ返す。
+        有向グラフでは始点のインデックスが終点以下の向きのエッジを代表とする。
+
+        Returns:
+            tuple: (始点のインデックス配列, 終点のインデックス配列)
+        """
+        cg = self.graph
+        mask = self.reciprocal
+        if cg.directed:
+            mask = mask & (cg.src <= cg.dst)
+        return cg.src[mask], cg.dst[mask]
+
+    def unidirect_arrays(self):
+        """単方向のエッジを返す。
+
+        Returns:
+            tuple: (始点のインデックス配列, 終点のインデックス配列)
+        """
+        cg = self.graph
+        mask = ~self.reciprocal
+        return cg.src[mask], cg.dst[mask]
+
+    def _iter_edges(self, src, dst, chunk_size):
+        nodes = self.graph.nodes
+        for start in range(0, len(src), chunk_size):
+            for u, v in zip(src[start:start + chunk_size].tolist(),
+                            dst[start:start + chunk_size].tolist()):
+                yield nodes[u], nodes[v]
+
+    def bidirect_edges(self, chunk_size=65536):
+        """双方向の接続をノードIDのペアとして順に返す。
+        ノードIDへの変換はchunk_size本ずつ行うため、全エッジ分のリストは作らない。
+
+        Args:
+            chunk_size (int, optional): 一度にノードIDへ変換するエッジ数
+
+        Yields:
+            tuple: (始点, 終点)
+        """
+        return self._iter_edges(*self.bidirect_arrays(), chunk_size)
+
+    def unidirect_edges(self, chunk_size=65536):
+        """単方向のエッジをノードIDのペアとして順に返す。
+
+        Args:
+            chunk_size (int, optional): 一度にノードIDへ変換するエッジ数
+
+        Yields:
+            tuple: (始点, 終点)
+        """
+        return self._iter_edges(*self.unidirect_arrays(), chunk_size)
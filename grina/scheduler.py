@@ -0,0 +1,201 @@
+from collections import namedtuple
+import time
+import numpy as np
+from grina.compiled import _csr
+from grina.parallel import (
+    BATCH_BYTES, SharedArrays, begin, checked, collect, csr_adjacency,
+    current_job, get_pool, run_attached, submit, timed, untime
+)
+from grina.profiling import is_profiling, phase
+
+# このノード数以下の連結成分はワーカーに送らず、まとめてプロセス内で計算する
+TINY_COMPONENT_NODES = 32
+# 連結成分をまとめて1単位にするときのノード数の目安。これより大きい成分は始点で分割する
+GROUP_NODES = 1024
+# Jobの実行中に1つの作業に含める始点数の上限（進捗の通知と中断の確認の間隔）
+JOB_UNIT_SOURCES = 64
+
+WorkUnit = namedtuple("WorkUnit", ["start", "stop", "sources", "cost", "inline"])
+WorkUnit.__doc__ = """作業の単位
+並べ替え後のノード[start, stop)（1つ以上の連結成分）の部分グラフで、
+sources（部分グラフ内のインデックス）を始点として探索する。costは推定コスト。"""
+
+
+def _groups(starts, sizes, per_source_costs, first, last, inline):
+    """連続する小さい連結成分[first, last)を、ノード数がGROUP_NODES程度ごとにまとめる。"""
+    if first >= last:
+        return []
+    offset = starts[first]
+    group_ids = (starts[first:last] - offset) // GROUP_NODES
+    bounds = np.flatnonzero(np.diff(group_ids)) + 1
+    units = []
+    for lo, hi in zip(np.r_[0, bounds] + first, np.r_[bounds, last - first] + first):
+        start, stop = int(starts[lo]), int(starts[hi - 1] + sizes[hi - 1])
+        cost = float(np.sum(sizes[lo:hi] * per_source_costs[lo:hi]))
+        units.append(WorkUnit(start, stop, np.arange(stop - start), cost, inline))
+    return units
+
+
+class ComponentSchedule:
+    """弱連結成分を単位とした全始点探索の作業の割り当て
+    ノードを連結成分ごとに連続するよう（大きい成分から順に）並べ替え、
+    各作業は成分の部分グラフだけを探索する。始点1つのコストを成分のノード数+エッジ数、
+    成分全体のコストをノード数×(ノード数+エッジ数)と見積もり、
+    - TINY_COMPONENT_NODES以下の成分はGROUP_NODES程度ずつまとめてプロセス内で計算し、
+    - GROUP_NODES以下の成分は同じくまとめてワーカーに送り、
+    - それより大きい成分は全体のコストをワーカー数の4倍で割ったコストごとに始点で分割する。
+    max_sourcesを指定した場合は、始点数がそれを超える作業をさらに始点で分割する。
+    作業はコストの降順に並べ、長いものから順にワーカーへ渡す。
+
+    Args:
+        labels (np.ndarray): ノードごとの弱連結成分のラベル
+        indptr (np.ndarray): CSRのindptr
+        indices (np.ndarray): CSRのindices
+        n_workers (int, optional): ワーカー数
+        inline (bool, optional): Trueの場合は全ての作業をプロセス内で計算する
+        max_sources (int, optional): 1つの作業の始点数の上限
+
+    Attributes:
+        order (np.ndarray): 並べ替え後の位置 → 元のインデックス
+        indptr (np.ndarray): 並べ替え後のCSRのindptr
+        indices (np.ndarray): 並べ替え後のCSRのindices
+        units (list): WorkUnitのリスト（コストの降順）
+    """
+
+    def __init__(self, labels, indptr, indices, n_workers=1, inline=False,
+                 max_sources=None):
+        n = len(indptr) - 1
+        degree = np.diff(indptr)
+        sizes = np.bincount(labels, minlength=1)
+        n_edges = np.bincount(labels, weights=degree, minlength=1)
+        component_order = np.argsort(-sizes, kind="stable")
+        component_rank = np.empty_like(component_order)
+        component_rank[component_order] = np.arange(len(component_order))
+        with phase("conversion"):
+            self.order = np.argsort(component_rank[labels], kind="stable")
+            rank = np.empty(n, dtype=np.int64)
+            rank[self.order] = np.arange(n)
+            self.indptr, self.indices = _csr(
+                n, rank[np.repeat(np.arange(n), degree)], rank[indices]
+            )
+
+        sizes = sizes[component_order]
+        sizes = sizes[sizes > 0]
+        per_source_costs = sizes + n_edges[component_order][:len(sizes)]
+        starts = np.r_[0, np.cumsum(sizes)[:-1]].astype(np.int64)
+        target = max(float(np.sum(sizes * per_source_costs)) / (n_workers * 4), 1.0)
+
+        n_large = int(np.count_nonzero(sizes > GROUP_NODES))
+        n_pooled = int(np.count_nonzero(sizes > TINY_COMPONENT_NODES))
+        units = []
+        for i in range(n_large):
+            start, size = int(starts[i]), int(sizes[i])
+            cost = float(size * per_source_costs[i])
+            n_chunks = max(
+                -(-cost // target),
+                -(-size * size * 8 // BATCH_BYTES),
+            )
+            for sources in np.array_split(np.arange(size), min(int(n_chunks), size)):
+                units.append(WorkUnit(
+                    start, start + size, sources,
+                    float(len(sources) * per_source_costs[i]), inline,
+                ))
+        units += _groups(starts, sizes, per_source_costs, n_large, n_pooled, inline)
+        units += _groups(starts, sizes, per_source_costs, n_pooled, len(sizes), True)
+        if max_sources is not None:
+            units = [
+                unit._replace(sources=sources,
+                              cost=unit.cost * len(sources) / len(unit.sources))
+                for unit in units
+                for sources in np.array_split(
+                    unit.sources, -(-len(unit.sources) // max_sources)
+                )
+            ]
+        units.sort(key=lambda unit: -unit.cost)
+        self.units = units
+
+    def nodes(self, unit):
+        """作業の部分グラフのノードの元のインデックス"""
+        return self.order[unit.start:unit.stop]
+
+
+def _block_adjacency(indptr, indices, start, stop, cache=None):
+    """並べ替え後のノード[start, stop)の部分グラフの隣接行列"""
+    if cache is not None and cache.get("block", (None,))[0] == (start, stop):
+        return cache["block"][1]
+    lo, hi = indptr[start], indptr[stop]
+    adjacency = csr_adjacency(indptr[start:stop + 1] - lo, indices[lo:hi] - start)
+    if cache is not None:
+        cache["block"] = ((start, stop), adjacency)
+    return adjacency
+
+
+def _unit_on_arrays(arrays, kernel, start, stop, sources):
+    adjacency = _block_adjacency(arrays["indptr"], arrays["indices"], start, stop)
+    return kernel(adjacency, sources)
+
+
+def _run_unit(kernel, handle, start, stop, sources):
+    return run_attached(handle, _unit_on_arrays, kernel, start, stop, sources)
+
+
+def _run_local(kernel, schedule, units):
+    cache = {}
+    with phase("compute"):
+        return [
+            (schedule.nodes(unit), kernel(_block_adjacency(
+                schedule.indptr, schedule.indices, unit.start, unit.stop, cache
+            ), unit.sources))
+            for unit in checked(units, [len(unit.sources) for unit in units])
+        ]
+
+
+def map_components(kernel, labels, indptr, indices, processes=None, inline=False):
+    """弱連結成分ごとに分割して、全ノードを始点とするkernelを実行する。
+    kernelは連結成分の部分グラフの隣接行列と部分グラフ内の始点インデックスを受け取る。
+    並べ替えたCSR配列を共有メモリに一度だけ配置し、ワーカーへの作業を
+    コストの降順に1つずつ渡す。その間にプロセス内で小さい成分を計算する。
+    Jobの実行中は、進捗の通知と中断の確認のために作業をJOB_UNIT_SOURCESの始点ごとに分割する。
+
+    Args:
+        kernel (callable): kernel(adjacency, sources)を受け取るモジュールレベルの関数
+        labels (np.ndarray): ノードごとの弱連結成分のラベル
+        indptr (np.ndarray): CSRのindptr
+        indices (np.ndarray): CSRのindices
+        processes (int, optional): プロセス数
+        inline (bool, optional): Trueの場合は全てプロセス内で実行する
+
+    Returns:
+        list: (部分グラフのノードの元のインデックス, kernelの戻り値)のリスト。
+            kernelの戻り値の始点インデックスなどは部分グラフ内のインデックスのまま。
+    """
+    pool = None if inline else get_pool(processes)
+    n_workers = 1 if inline else len(pool._pool)
+    max_sources = None if current_job() is None else JOB_UNIT_SOURCES
+    schedule = ComponentSchedule(labels, indptr, indices, n_workers, inline, max_sources)
+    pooled = [unit for unit in schedule.units if not unit.inline]
+    local = [unit for unit in schedule.units if unit.inline]
+    begin(len(indptr) - 1)
+    if not pooled:
+        return _run_local(kernel, schedule, local)
+
+    profiling = is_profiling()
+    with SharedArrays({"indptr": schedule.indptr, "indices": schedule.indices}) as shared:
+        with phase("ipc"):
+            args = [
+                (kernel, shared.handle, unit.start, unit.stop, unit.sources)
+                for unit in pooled
+            ]
+            if profiling:
+                args = [(_run_unit, *arg) for arg in args]
+            pending = submit(pool, timed if profiling else _run_unit, args)
+        # ワーカーの計算中に小さい成分を計算する
+        res = _run_local(kernel, schedule, local)
+        with phase("ipc"):
+            started = time.perf_counter()
+            pooled_res = collect(pending, [len(unit.sources) for unit in pooled])
+            if profiling:
+                pooled_res = untime(pooled_res, time.perf_counter() - started)
+    return [
+        (schedule.nodes(unit), result) for unit, result in zip(pooled, pooled_res)
+    ] + res
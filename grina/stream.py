@@ -0,0 +1,214 @@
+from collections import defaultdict
+import math
+import networkx as nx
+
+
+class IncrementalMetrics:
+    """エッジの追加・削除イベントから次数系・相互性の指標を逐次更新する。
+    1イベントあたりO(1)で入次数・出次数・双方向の関係数・無向グラフとしての次数と、
+    グラフ全体の双方向・単方向の接続数を更新するため、いつでも再計算なしで
+    teacher_disciple_degreeなどの指標を返すことができる。
+    エッジの重みは扱わず、全てのエッジを接続とみなす。
+    """
+
+    def __init__(self):
+        self._nodes = {}
+        self._edges = set()
+        self._in_degree = defaultdict(int)
+        self._out_degree = defaultdict(int)
+        self._bidirect = defaultdict(int)
+        self.n_reciprocal_pairs = 0
+        self.n_self_loops = 0
+
+    @classmethod
+    def from_graph(cls, dg):
+        """既存の有向グラフから初期化する。
+
+        Args:
+            dg (nx.DiGraph): 有向グラフ
+
+        Returns:
+            IncrementalMetrics: 指標の管理オブジェクト
+        """
+        metrics = cls()
+        for node in dg:
+            metrics.add_node(node)
+        for u, v in dg.edges():
+            metrics.add_edge(u, v)
+        return metrics
+
+    @property
+    def n_nodes(self):
+        return len(self._nodes)
+
+    @property
+    def n_edges(self):
+        return len(self._edges)
+
+    def has_edge(self, u, v):
+        return (u, v) in self._edges
+
+    def add_node(self, node):
+        self._nodes.setdefault(node, None)
+
+    def remove_node(self, node):
+        """孤立したノードを削除する。
+
+        Raises:
+            nx.NetworkXError: ノードにエッジが接続している場合
+        """
+        if self.in_degree(node) or self.out_degree(node):
+            raise nx.NetworkXError(f"The node {node} still has edges.")
+        self._nodes.pop(node, None)
+        self._in_degree.pop(node, None)
+        self._out_degree.pop(node, None)
+        self._bidirect.pop(node, None)
+
+    def add_edge(self, u, v):
+        """エッジu->vを追加する。既に存在する場合は何もしない。
+
+        Returns:
+            bool: エッジを追加した場合はTrue
+        """
+        if (u, v) in self._edges:
+            return False
+        self.add_node(u)
+        self.add_node(v)
+        self._edges.add((u, v))
+        self._out_degree[u] += 1
+        self._in_degree[v] += 1
+        if u == v:
+            self.n_self_loops += 1
+        elif (v, u) in self._edges:
+            self._bidirect[u] += 1
+            self._bidirect[v] += 1
+            self.n_reciprocal_pairs += 1
+        return True
+
+    def remove_edge(self, u, v):
+        """エッジu->vを削除する。ノードは残す。
+
+        Raises:
+            nx.NetworkXError: エッジが存在しない場合
+        """
+        if (u, v) not in self._edges:
+            raise nx.NetworkXError(f"The edge {u}-{v} is not in the graph.")
+        self._edges.remove((u, v))
+        self._out_degree[u] -= 1
+        self._in_degree[v] -= 1
+        if u == v:
+            self.n_self_loops -= 1
+        elif (v, u) in self._edges:
+            self._bidirect[u] -= 1
+            self._bidirect[v] -= 1
+            self.n_reciprocal_pairs -= 1
+
+    def ingest(self, events):
+        """イベント列を順に反映する。
+
+        Args:
+            events (iterable): (操作, 始点, 終点)のイベント。
+                操作は"add" or "remove"（+1 or -1でもよい）
+        """
+        for op, u, v in events:
+            if op in ("add", 1):
+                self.add_edge(u, v)
+            elif op in ("remove", -1):
+                self.remove_edge(u, v)
+            else:
+                raise ValueError(f"Unknown operation: {op}")
+
+    # --- ノードごとの指標 ---
+
+    def in_degree(self, node):
+        return self._in_degree.get(node, 0)
+
+    def out_degree(self, node):
+        return self._out_degree.get(node, 0)
+
+    def bidirect(self, node):
+        """双方向の関係数"""
+        return self._bidirect.get(node, 0)
+
+    def undirected_degree(self, node):
+        """無向グラフとしての次数 = 入次数 + 出次数 - 双方向の関係数"""
+        return self.in_degree(node) + self.out_degree(node) - self.bidirect(node)
+
+    def _node_values(self, fn, node):
+        if node is not None:
+            return fn(node)
+        return {v: fn(v) for v in self._nodes}
+
+    def get_inxout_degree(self, node=None):
+        """入次数×出次数。nodeを省略した場合は全ノードの辞書を返す。"""
+        return self._node_values(
+            lambda v: self.in_degree(v) * self.out_degree(v), node
+        )
+
+    def get_gatekeeper_degree(self, node=None):
+        """ゲートキーパー度 (入次数×出次数)**0.5"""
+        return self._node_values(
+            lambda v: math.sqrt(self.in_degree(v) * self.out_degree(v)), node
+        )
+
+    def node_teacher_disciple_degree(self, node=None):
+        """師弟度（あるノードの全関係に対する単方向の関係の割合）"""
+        def value(v):
+            degree = self.undirected_degree(v)
+            if degree > 0:
+                return (degree - self.bidirect(v)) / degree
+            return 0
+        return self._node_values(value, node)
+
+    def node_colleague_degree(self, node=None):
+        """同僚度（あるノードの全関係に対する双方向の関係の割合）"""
+        def value(v):
+            degree = self.undirected_degree(v)
+            if degree > 0:
+                return self.bidirect(v) / degree
+            return 0
+        return self._node_values(value, node)
+
+    def node_unidirect_density(self, node=None):
+        """単方向密度"""
+        return self._node_values(
+            lambda v: (self.undirected_degree(v) - self.bidirect(v))
+            / (2 * self.n_nodes), node
+        )
+
+    def node_bidirect_density(self, node=None):
+        """双方向密度"""
+        return self._node_values(
+            lambda v: self.bidirect(v) / (2 * self.n_nodes), node
+        )
+
+    # --- グラフ全体の指標 ---
+
+    @property
+    def n_bidirect(self):
+        """双方向の接続数（自己ループは0.5として数える）"""
+        return self.n_reciprocal_pairs + self.n_self_loops / 2
+
+    @property
+    def n_unidirect(self):
+        """単方向の接続数"""
+        return self.n_edges - 2 * self.n_reciprocal_pairs - self.n_self_loops
+
+    @property
+    def n_relations(self):
+        """全関係数（無向グラフに変換したときのエッジ数）"""
+        return self.n_edges - self.n_reciprocal_pairs
+
+    def teacher_disciple_degree(self):
+        return self.n_unidirect / self.n_relations
+
+    def colleague_degree(self):
+        return self.n_bidirect / self.n_relations
+
+    def unidirect_density(self):
+        N = self.n_nodes
+        return self.n_unidirect / (N * (N - 1) / 2)
+
+    def bidirect_density(self):
+        N = self.n_nodes
+        return self.n_bidirect / (N * (N - 1) / 2)
@@ -0,0 +1,258 @@
+import numpy as np
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is required for Arrow/Parquet/Feather export. "
+            "Install it with `pip install pyarrow`."
+        ) from e
+    return pyarrow
+
+
+class NodeTable:
+    """ノードごとの指標を列指向で保持する表
+    各列はノードの並び順に揃えたnp.ndarrayで、列名で取り出すことができる。
+    複数の指標の表を結合したり、pandas/Arrowへコピーなしで変換したりできる。
+
+    Attributes:
+        nodes (list): ノードID
+        index (np.ndarray): 各行のノードの整数インデックス（CompiledGraphのノード番号）
+        columns (dict): 列名 → np.ndarray
+    """
+
+    def __init__(self, nodes, columns, index=None):
+        self.nodes = list(nodes)
+        if index is None:
+            index = np.arange(len(self.nodes))
+        self.index = np.asarray(index, dtype=np.int64)
+        if len(self.index) != len(self.nodes):
+            raise ValueError(
+                f"index has {len(self.index)} rows, expected {len(self.nodes)}"
+            )
+        self.columns = {
+            name: np.asarray(values) for name, values in columns.items()
+        }
+        for name, values in self.columns.items():
+            if len(values) != len(self.nodes):
+                raise ValueError(
+                    f"column {name} has {len(values)} rows, "
+                    f"expected {len(self.nodes)}"
+                )
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def keys(self):
+        return self.columns.keys()
+
+    def to_dict(self, name, sort=False):
+        """列をノードID → 値の辞書に変換する。
+
+        Args:
+            name (str): 列名
+            sort (bool, optional): Trueの場合は値の降順に並べる（同じ値は元の順序を保つ）
+
+        Returns:
+            dict: ノードIDと値の辞書
+        """
+        values = self.columns[name]
+        if not sort:
+            return dict(zip(self.nodes, values.tolist()))
+        order = np.argsort(-values, kind="stable")
+        nodes = self.nodes
+        return {nodes[i]: v for i, v in zip(order.tolist(), values[order].tolist())}
+
+    def sort_values(self, name, descending=True):
+        """列の値で行を並べ替えた表を返す。
+
+        Args:
+            name (str): 列名
+            descending (bool, optional): Trueの場合は降順
+
+        Returns:
+            NodeTable: 並べ替えた表
+        """
+        values = self.columns[name]
+        order = np.argsort(-values if descending else values, kind="stable")
+        return self.take(order)
+
+    def top_k(self, name, k):
+        """列の値の上位k行を降順に並べた表を返す。
+        全体を並べ替えずにnp.argpartitionで上位k件を選び、その中だけを並べ替える。
+        同じ値は元の順序を保ち、NaNは最後に並べる（sort_valuesの先頭k行と同じ）。
+
+        Args:
+            name (str): 列名
+            k (int): 行数
+
+        Returns:
+            NodeTable: 上位k行の表
+        """
+        values = self.columns[name]
+        k = min(k, len(values))
+        valid = np.flatnonzero(~np.isnan(values))
+        if k > len(valid):
+            rows = np.concatenate([
+                valid[np.argsort(-values[valid], kind="stable")],
+                np.flatnonzero(np.isnan(values))[:k - len(valid)],
+            ])
+            return self.take(rows)
+        if k <= 0:
+            return self.take(valid[:0])
+        threshold = values[valid[np.argpartition(-values[valid], k - 1)[k - 1]]]
+        above = np.flatnonzero(values > threshold)
+        ties = np.flatnonzero(values == threshold)[:k - len(above)]
+        rows = np.concatenate([above, ties])
+        # 値の降順、同じ値は行番号の昇順
+        rows = rows[np.lexsort((rows, -values[rows]))]
+        return self.take(rows)
+
+    def take(self, rows):
+        """指定した行だけを取り出した表を返す。
+
+        Args:
+            rows (np.ndarray): 行番号の配列
+
+        Returns:
+            NodeTable: 取り出した表
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        nodes = self.nodes
+        return NodeTable(
+            [nodes[i] for i in rows.tolist()],
+            {name: values[rows] for name, values in self.columns.items()},
+            index=self.index[rows],
+        )
+
+    def merge(self, *others):
+        """他の表の列をノードIDで揃えて結合する。
+        ノードの並びが全て同じ場合は列の配列をそのまま共有する。
+        そうでない場合はノードの和集合を行とし、値のないセルはNaNとする。
+
+        Args:
+            *others (NodeTable): 結合する表
+
+        Raises:
+            ValueError: 列名が重複している場合
+
+        Returns:
+            NodeTable: 結合した表
+        """
+        tables = (self,) + others
+        names = [name for table in tables for name in table.columns]
+        if len(names) != len(set(names)):
+            raise ValueError(f"duplicate columns: {names}")
+        if all(table.nodes == self.nodes for table in others):
+            columns = {}
+            for table in tables:
+                columns.update(table.columns)
+            return NodeTable(self.nodes, columns, index=self.index)
+
+        position = {}
+        for table in tables:
+            for node in table.nodes:
+                position.setdefault(node, len(position))
+        nodes = list(position)
+        columns = {}
+        for table in tables:
+            rows = np.fromiter(
+                (position[node] for node in table.nodes),
+                dtype=np.int64, count=len(table),
+            )
+            for name, values in table.columns.items():
+                merged = np.full(
+                    (len(nodes),) + values.shape[1:], np.nan,
+                    dtype=np.result_type(values.dtype, np.float64),
+                )
+                merged[rows] = values
+                columns[name] = merged
+        return NodeTable(nodes, columns)
+
+    def _flat_columns(self):
+        """2次元の列を"列名_i"の1次元の列に展開する。"""
+        for name, values in self.columns.items():
+            if values.ndim == 1:
+                yield name, values
+            else:
+                for i in range(values.shape[1]):
+                    yield f"{name}_{i}", values[:, i]
+
+    def to_pandas(self):
+        """ノードIDを行ラベルとするpd.DataFrameに変換する。
+        列の配列はコピーせずに共有する（DataFrameへの書き込みは表にも反映される）。
+        2次元の列は"列名_i"の列に展開する。
+
+        Returns:
+            pd.DataFrame: 指標の表
+        """
+        import pandas as pd
+        return pd.DataFrame(
+            dict(self._flat_columns()),
+            index=pd.Index(self.nodes, name="node"),
+            copy=False,
+        )
+
+    def to_arrow(self):
+        """pyarrow.Tableに変換する。
+        数値の列はコピーせずにArrowの配列とし、ノードIDは"node"列に入れる
+        （型が混在する場合は文字列に変換する）。
+        2次元の列は固定長のリスト型の列とする。
+
+        Raises:
+            ImportError: pyarrowがインストールされていない場合
+
+        Returns:
+            pyarrow.Table: 指標の表
+        """
+        pa = _import_pyarrow()
+        try:
+            nodes = pa.array(self.nodes)
+        except (pa.ArrowTypeError, pa.ArrowInvalid):
+            # 型が混在するノードIDは文字列として保存する
+            nodes = pa.array([str(node) for node in self.nodes])
+        arrays = {"node": nodes}
+        for name, values in self.columns.items():
+            if values.ndim == 1:
+                arrays[name] = pa.array(values)
+            else:
+                flat = pa.array(np.ascontiguousarray(values).reshape(-1))
+                arrays[name] = pa.FixedSizeListArray.from_arrays(
+                    flat, values.shape[1]
+                )
+        return pa.table(arrays)
+
+    def to_parquet(self, path, **kwargs):
+        """Parquetファイルに書き出す。
+
+        Args:
+            path (str): 出力先
+            **kwargs: pyarrow.parquet.write_tableに渡す引数
+        """
+        _import_pyarrow()
+        import pyarrow.parquet as pq
+        pq.write_table(self.to_arrow(), path, **kwargs)
+
+    def to_feather(self, path, **kwargs):
+        """Feather（Arrow IPC）ファイルに書き出す。
+
+        Args:
+            path (str): 出力先
+            **kwargs: pyarrow.feather.write_featherに渡す引数
+        """
+        _import_pyarrow()
+        import pyarrow.feather as feather
+        feather.write_feather(self.to_arrow(), path, **kwargs)
+
+    def __repr__(self):
+        return "NodeTable(n_nodes={}, columns={})".format(
+            len(self.nodes), list(self.columns)
+        )
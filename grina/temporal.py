@@ -0,0 +1,193 @@
+from collections import defaultdict, deque
+import logging
+import networkx as nx
+from grina import network
+from grina.backends import resolve_metric
+from grina.eigenvector import sparse_eigenvector_centrality
+from grina.stream import IncrementalMetrics
+
+logger = logging.getLogger("grina")
+
+# IncrementalMetricsが再計算なしで返せる指標
+INCREMENTAL_METRICS = (
+    "teacher_disciple_degree",
+    "colleague_degree",
+    "unidirect_density",
+    "bidirect_density",
+    "get_inxout_degree",
+    "get_gatekeeper_degree",
+    "node_teacher_disciple_degree",
+    "node_colleague_degree",
+    "node_unidirect_density",
+    "node_bidirect_density",
+)
+
+# 無向グラフのみを受け付ける指標（窓のグラフは有向グラフのため使えない）
+UNDIRECTED_METRICS = ("components_size", "components_density")
+
+
+class SnapshotPipeline:
+    """時間窓ごとのグラフを差分更新しながら指標を算出する。
+    窓をずらすときは、窓から外れたエッジと新たに入ったエッジの差分だけを
+    有向グラフとIncrementalMetricsに反映する。
+    次数・相互性の指標はIncrementalMetricsから再計算なしで求め、
+    warm_start=Trueの場合、固有ベクトル中心性は前の窓の結果を初期値にする。
+    ただし強連結でないグラフでは最大固有値に対応する固有ベクトルが一意に定まらず、
+    初期値によって収束先が変わりうるため、calc_eigen_centralitiesと一致させたい場合はFalseにする。
+    差分がなかった窓では前の窓の結果をそのまま使う。
+
+    Args:
+        metrics (list): 指標名のリスト。grina.node / grina.networkの関数名と
+            "analyze_components"（弱連結成分）を指定できる。
+            無向グラフ用の指標（UNDIRECTED_METRICS）は指定できない。
+        warm_start (bool, optional): 固有ベクトル中心性の初期値に前の窓の結果を使うか
+
+    Raises:
+        ValueError: 未知の指標名、または無向グラフ用の指標が指定された場合
+    """
+
+    def __init__(self, metrics, warm_start=True):
+        self.metrics = list(metrics)
+        self.warm_start = warm_start
+        for name in self.metrics:
+            if name in UNDIRECTED_METRICS:
+                raise ValueError(
+                    f"{name} requires an undirected graph; "
+                    "use 'analyze_components' for the components of each window"
+                )
+            if name not in INCREMENTAL_METRICS and name != "analyze_components":
+                resolve_metric(name)
+        self.graph = nx.DiGraph()
+        self.incremental = IncrementalMetrics()
+        self._counts = defaultdict(int)
+        self._weights = defaultdict(float)
+        self._dirty = set()
+        self._results = None
+        self._eigen = None
+
+    def add(self, u, v, weight=1):
+        """窓に入ったエッジの出現を1件反映する。"""
+        self._counts[(u, v)] += 1
+        self._weights[(u, v)] += weight
+        self._dirty.add((u, v))
+
+    def remove(self, u, v, weight=1):
+        """窓から外れたエッジの出現を1件反映する。"""
+        self._counts[(u, v)] -= 1
+        self._weights[(u, v)] -= weight
+        self._dirty.add((u, v))
+
+    def _apply(self):
+        """溜まった差分をグラフに反映する。変化があればTrueを返す。"""
+        changed = False
+        for u, v in self._dirty:
+            count = self._counts[(u, v)]
+            if count > 0:
+                weight = self._weights[(u, v)]
+                if not self.graph.has_edge(u, v):
+                    self.graph.add_edge(u, v, weight=weight)
+                    self.incremental.add_edge(u, v)
+                    changed = True
+                elif self.graph[u][v]["weight"] != weight:
+                    self.graph[u][v]["weight"] = weight
+                    changed = True
+            else:
+                del self._counts[(u, v)]
+                del self._weights[(u, v)]
+                if self.graph.has_edge(u, v):
+                    self.graph.remove_edge(u, v)
+                    self.incremental.remove_edge(u, v)
+                    changed = True
+                    for n in {u, v}:
+                        if self.graph.degree(n) == 0:
+                            self.graph.remove_node(n)
+                            self.incremental.remove_node(n)
+        self._dirty.clear()
+        return changed
+
+    def _compute(self, name):
+        if name in INCREMENTAL_METRICS:
+            return getattr(self.incremental, name)()
+        if name == "analyze_components":
+            return network.analyze_components(self.graph, "weak")
+        if name == "calc_eigen_centralities":
+            result = sparse_eigenvector_centrality(
+                self.graph, max_iter=1000,
+                nstart=self._eigen if self.warm_start else None,
+            )
+            self._eigen = result.values
+            return {k: v for k, v in sorted(result.values.items(), key=lambda x: x[1], reverse=True)}
+        return resolve_metric(name)(self.graph)
+
+    def results(self):
+        """現在の窓の指標を返す。空のグラフなどで計算できない指標はNaNとする。
+
+        Returns:
+            dict: 指標名 → 値
+        """
+        if not self._apply() and self._results is not None:
+            return dict(self._results)
+        results = {}
+        for name in self.metrics:
+            try:
+                results[name] = self._compute(name)
+            except (ZeroDivisionError, nx.NetworkXException) as e:
+                logger.debug(f"{name} is not available in this window: {e}")
+                results[name] = float("nan")
+        self._results = results
+        return dict(results)
+
+
+def snapshot_metrics(edges, window, slide, metrics, start=None, warm_start=True):
+    """タイムスタンプ付きのエッジ列から、時間窓ごとの指標を順に算出する。
+    窓は[start + k * slide, start + k * slide + window)で、
+    窓の中に1回以上出現したエッジ（重みは出現ごとの重みの合計）からなる有向グラフを対象とし、
+    最後のエッジの時刻を含む窓まで算出する。
+
+    Args:
+        edges (iterable): 時刻順に並んだ(時刻, 始点, 終点)または(時刻, 始点, 終点, 重み)
+        window: 窓の幅（時刻の差と同じ型。数値やdatetime.timedelta）
+        slide: 窓をずらす幅
+        metrics (list): 指標名のリスト（SnapshotPipelineを参照）
+        start (optional): 最初の窓の開始時刻。Noneの場合は最初のエッジの時刻。
+        warm_start (bool, optional): 固有ベクトル中心性の初期値に前の窓の結果を使うか
+
+    Raises:
+        ValueError: windowまたはslideが正でない場合、未知の指標名が指定された場合、
+            エッジが時刻順でない場合
+
+    Yields:
+        tuple: (窓の開始時刻, 窓の終了時刻, 指標名 → 値の辞書)
+    """
+    # 0との比較はwindow・slideと同じ型（数値やtimedelta）で行う
+    if not window > window - window:
+        raise ValueError(f"window must be positive: {window!r}")
+    if not slide > slide - slide:
+        raise ValueError(f"slide must be positive: {slide!r}")
+    pipeline = SnapshotPipeline(metrics, warm_start=warm_start)
+    events = iter(edges)
+    pending = next(events, None)
+    if pending is None:
+        return
+    window_start = pending[0] if start is None else start
+    in_window = deque()
+    last_time = None
+
+    while True:
+        window_end = window_start + window
+        while in_window and in_window[0][0] < window_start:
+            t, u, v, *w = in_window.popleft()
+            pipeline.remove(u, v, *w)
+        while pending is not None and pending[0] < window_end:
+            if last_time is not None and pending[0] < last_time:
+                raise ValueError("edges must be sorted by time.")
+            last_time = pending[0]
+            if pending[0] >= window_start:
+                t, u, v, *w = pending
+                pipeline.add(u, v, *w)
+                in_window.append(pending)
+            pending = next(events, None)
+        yield window_start, window_end, pipeline.results()
+        if pending is None and window_start + slide > last_time:
+            break
+        window_start += slide
@@ -0,0 +1,183 @@
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+import unittest
+import networkx as nx
+from grina import aio
+from grina.node import (
+    calc_between_centralities, calc_close_centralities,
+    get_degree_expansion_elongation, get_distance_profile
+)
+from grina.parallel import Job, JobCancelled, close_pool, current_job
+
+
+class TestJob(unittest.TestCase):
+    def setUp(self):
+        self.dg = nx.gnp_random_graph(1500, 0.003, seed=0, directed=True)
+
+    def tearDown(self):
+        close_pool()
+
+    def test_progress(self):
+        calls = []
+        with Job(lambda done, total: calls.append((done, total))) as job:
+            self.assertIs(current_job(), job)
+            res = get_degree_expansion_elongation(self.dg, 2)
+        self.assertIsNone(current_job())
+        self.assertEqual(res, get_degree_expansion_elongation(self.dg, 2))
+        self.assertEqual(calls[0], (0, 1500))
+        self.assertEqual(calls[-1], (1500, 1500))
+        done = [c[0] for c in calls]
+        self.assertEqual(done, sorted(done))
+
+    def test_cancel(self):
+        before = set(multiprocessing.active_children())
+
+        def progress(done, total):
+            if done > 0:
+                job.cancel()
+
+        job = Job(progress)
+        with self.assertRaises(JobCancelled):
+            with job:
+                calc_between_centralities(self.dg, 2, backend="numpy")
+        # 専用のプールのワーカーは終了している
+        self.assertEqual(set(multiprocessing.active_children()) - before, set())
+
+    def test_progress_small_graph(self):
+        # 1つの作業にまとまる規模のグラフでも、進捗は少しずつ通知され途中で中断できる
+        dg = nx.gnp_random_graph(400, 0.01, seed=1, directed=True)
+        calls = []
+        with Job(lambda done, total: calls.append(done)):
+            get_degree_expansion_elongation(dg)
+        self.assertGreater(len(set(calls)), 3)
+        self.assertEqual(calls[-1], 400)
+
+        def progress(done, total):
+            calls.append(done)
+            if done > 0:
+                job.cancel()
+
+        calls = []
+        job = Job(progress)
+        with self.assertRaises(JobCancelled):
+            with job:
+                get_degree_expansion_elongation(dg)
+        self.assertLess(calls[-1], 400)
+
+    def test_unguarded_main(self):
+        # if __name__ == "__main__"で囲んでいないスクリプトは、待ち続けずにエラーで終わる
+        script = textwrap.dedent("""
+            import asyncio
+            import networkx as nx
+            from grina import aio
+
+            dg = nx.gnp_random_graph(600, 0.005, seed=0, directed=True)
+            asyncio.run(aio.get_degree_expansion_elongation(dg, 2))
+        """)
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, PYTHONPATH=root)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "script.py")
+            with open(path, "w") as f:
+                f.write(script)
+            proc = subprocess.run(
+                [sys.executable, path], capture_output=True, text=True,
+                timeout=120, env=env, cwd=directory,
+            )
+        self.assertNotEqual(proc.returncode, 0)
+        self.assertIn("__main__", proc.stderr.strip().splitlines()[-1])
+
+    def test_nested(self):
+        with Job():
+            with self.assertRaises(RuntimeError):
+                with Job():
+                    pass
+
+
+class TestAio(unittest.TestCase):
+    def setUp(self):
+        self.dg = nx.gnp_random_graph(1500, 0.003, seed=0, directed=True)
+
+    def tearDown(self):
+        close_pool()
+        aio.set_max_concurrent_jobs(2)
+
+    def test_results(self):
+        calls = []
+
+        async def main():
+            return await asyncio.gather(
+                aio.get_degree_expansion_elongation(
+                    self.dg, 2, progress=lambda *c: calls.append(c)
+                ),
+                aio.get_distance_profile(self.dg, "out", 2),
+                aio.calc_between_centralities(self.dg, 2),
+                aio.calc_close_centralities(self.dg),
+            )
+
+        expansion, profile, between, close = asyncio.run(main())
+        self.assertEqual(expansion, get_degree_expansion_elongation(self.dg, 2))
+        expected = get_distance_profile(self.dg, "out", 2)
+        for name in ["expansion", "elongation"]:
+            self.assertEqual(profile.to_dict(name), expected.to_dict(name))
+        for res, expected in [
+            (between, calc_between_centralities(self.dg, 2)),
+            (close, calc_close_centralities(self.dg)),
+        ]:
+            self.assertEqual(list(res), list(expected))
+            for k in expected:
+                self.assertAlmostEqual(res[k], expected[k])
+        self.assertEqual(calls[-1], (1500, 1500))
+
+    def test_cancel(self):
+        before = set(multiprocessing.active_children())
+
+        async def main():
+            task = None
+
+            def progress(done, total):
+                if done > 0:
+                    task.cancel()
+
+            task = asyncio.ensure_future(
+                aio.calc_between_centralities(self.dg, 2, progress=progress)
+            )
+            await task
+
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(main())
+        self.assertEqual(set(multiprocessing.active_children()) - before, set())
+
+    def test_max_concurrent_jobs(self):
+        with self.assertRaises(ValueError):
+            aio.set_max_concurrent_jobs(0)
+        aio.set_max_concurrent_jobs(1)
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def metric(x):
+            with lock:
+                running.append(x)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(x)
+            return x
+
+        async def main():
+            return await asyncio.gather(*[aio.run_metric(metric, i) for i in range(4)])
+
+        self.assertEqual(asyncio.run(main()), [0, 1, 2, 3])
+        self.assertEqual(max(peak), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import math
+import subprocess
+import sys
+import unittest
+import networkx as nx
+import grina
+from grina.backends import (
+    available_backends, get_backend, resolve_metric, set_backend, use_backend
+)
+from grina.node import (calc_between_centralities, calc_close_centralities,
+                        calc_degree_centralities, calc_eigen_centralities)
+
+
+class TestBackends(unittest.TestCase):
+    def setUp(self):
+        self.DG = nx.gnp_random_graph(80, 0.04, seed=3, directed=True)
+        self.DG.add_node("isolated")
+
+    def tearDown(self):
+        set_backend(None)
+
+    def assert_close(self, result, expected):
+        self.assertEqual(list(result), list(expected))
+        for node, value in expected.items():
+            if math.isnan(value):
+                self.assertTrue(math.isnan(result[node]))
+            else:
+                self.assertAlmostEqual(result[node], value)
+
+    def test_backends_agree(self):
+        for fn, metric in [(calc_degree_centralities, "degree_centrality"),
+                           (calc_close_centralities, "closeness"),
+                           (calc_between_centralities, "betweenness"),
+                           (calc_eigen_centralities, "eigenvector")]:
+            expected = fn(self.DG)
+            backends = available_backends(metric)
+            self.assertGreaterEqual(len(backends), 2)
+            for backend in backends:
+                self.assert_close(fn(self.DG, backend=backend), expected)
+
+    def test_global_backend(self):
+        expected = calc_close_centralities(self.DG)
+        with use_backend("networkx"):
+            self.assertEqual(get_backend(), "networkx")
+            self.assert_close(calc_close_centralities(self.DG), expected)
+            # networkxの実装がない指標は既定の実装を使う
+            self.assertEqual(grina.colleague_degree(self.DG), grina.colleague_degree(self.DG, backend="sparse"))
+        self.assertIsNone(get_backend())
+        with self.assertRaises(ValueError):
+            set_backend("cugraph")
+        with self.assertRaises(ValueError):
+            calc_eigen_centralities(self.DG, backend="igraph")
+
+    def test_resolve_metric(self):
+        self.assertIs(resolve_metric("calc_close_centralities"), calc_close_centralities)
+        self.assertIs(resolve_metric("colleague_degree"), grina.network.colleague_degree)
+        for name in ["no_such_metric", "_closeness_igraph", "N_PROCESSES"]:
+            with self.assertRaises(ValueError):
+                resolve_metric(name)
+
+    def test_lazy_import(self):
+        code = ("import sys, grina; "
+                "print('networkx' in sys.modules, 'numpy' in sys.modules); "
+                "grina.get_n_entry; print('networkx' in sys.modules)")
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                             text=True, check=True).stdout.split()
+        self.assertEqual(out, ["False", "False", "True"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import math
+import unittest
+import networkx as nx
+from grina.batch import analyze_many
+from grina.network import calc_network_density, colleague_degree
+from grina.node import calc_between_centralities, get_degree_expansion_elongation
+from grina.parallel import close_pool
+
+
+class TestAnalyzeMany(unittest.TestCase):
+    def setUp(self):
+        self.graphs = [
+            nx.gnp_random_graph(5 + (i * 37) % 80, 0.1, seed=i, directed=True)
+            for i in range(40)
+        ]
+        self.graphs.append(nx.DiGraph([(0, 1), (1, 0)]))
+
+    def tearDown(self):
+        close_pool()
+
+    def expected(self, g):
+        return {
+            "colleague_degree": colleague_degree(g),
+            "calc_network_density": calc_network_density(g),
+            "get_degree_expansion_elongation": get_degree_expansion_elongation(g, processes=1),
+            "calc_between_centralities": calc_between_centralities(g, processes=1),
+        }
+
+    def assert_results(self, results):
+        self.assertEqual(len(results), len(self.graphs))
+        for g, result in zip(self.graphs, results):
+            expected = self.expected(g)
+            for name, value in expected.items():
+                if isinstance(value, float) and math.isnan(value):
+                    self.assertTrue(math.isnan(result[name]))
+                elif name == "calc_between_centralities":
+                    self.assertEqual(list(result[name]), list(value))
+                    for node, v in value.items():
+                        self.assertAlmostEqual(result[name][node], v)
+                else:
+                    self.assertEqual(result[name], value)
+
+    def test_inline(self):
+        metrics = ["colleague_degree", "calc_network_density",
+                   "get_degree_expansion_elongation", calc_between_centralities]
+        self.assert_results(list(analyze_many(self.graphs, metrics, processes=1, errors="nan")))
+
+    def test_pool_keeps_order(self):
+        metrics = ["colleague_degree", "calc_network_density",
+                   "get_degree_expansion_elongation", "calc_between_centralities"]
+        results = analyze_many(self.graphs, metrics, processes=2, errors="nan",
+                               inline_threshold=20, batch_graphs=3)
+        self.assert_results(list(results))
+
+    def test_errors(self):
+        with self.assertRaises(nx.NetworkXPointlessConcept):
+            list(analyze_many([nx.DiGraph()], ["calc_eigen_centralities"], processes=1))
+        result, = analyze_many([nx.DiGraph()], ["calc_eigen_centralities"], processes=1, errors="nan")
+        self.assertTrue(math.isnan(result["calc_eigen_centralities"]))
+        with self.assertRaises(ValueError):
+            list(analyze_many([nx.DiGraph()], ["no_such_metric"], processes=1))
+
+    def test_unpicklable_metric(self):
+        def local_metric(g):
+            return g.number_of_edges()
+
+        for metric in [lambda g: g.number_of_nodes(), local_metric]:
+            with self.assertRaises(ValueError):
+                list(analyze_many(self.graphs, [metric], processes=2))
+        # プロセス内で計算する場合はそのまま使える
+        results = list(analyze_many(self.graphs, [local_metric], processes=1))
+        self.assertEqual(results[0]["local_metric"], self.graphs[0].number_of_edges())
+
+
+if __name__ == '__main__':
+    unittest.main()
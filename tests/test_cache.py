@@ -0,0 +1,105 @@
+import tempfile
+import unittest
+from unittest import mock
+import networkx as nx
+import numpy as np
+from grina.cache import ResultCache, graph_fingerprint
+from grina.compiled import CompiledGraph, compile_graph
+from grina.node import (
+    calc_between_centralities, get_degree_expansion_elongation, get_distance_profile
+)
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.DG = nx.gnp_random_graph(40, 0.1, seed=1, directed=True)
+        self.calls = 0
+
+    def counted(self, g, normalized=True):
+        self.calls += 1
+        return calc_between_centralities(g)
+
+    def test_fingerprint(self):
+        reordered = nx.DiGraph()
+        reordered.add_nodes_from(self.DG)
+        reordered.add_edges_from(reversed(list(self.DG.edges)))
+        self.assertEqual(graph_fingerprint(reordered), graph_fingerprint(self.DG))
+        self.assertEqual(graph_fingerprint(compile_graph(self.DG)), graph_fingerprint(self.DG))
+        changed = self.DG.copy()
+        changed.add_edge(0, 39, weight=2)
+        self.assertNotEqual(graph_fingerprint(changed), graph_fingerprint(self.DG))
+        self.assertNotEqual(graph_fingerprint(self.DG.to_undirected()), graph_fingerprint(self.DG))
+
+    def test_lru(self):
+        cache = ResultCache(maxsize=2)
+        fn = cache.wrap(self.counted)
+        graphs = [nx.gnp_random_graph(20, 0.2, seed=i, directed=True) for i in range(3)]
+        expected = fn(graphs[0])
+        self.assertEqual(fn(graphs[0]), expected)
+        self.assertEqual(fn(graphs[0], processes=2), expected)
+        fn(graphs[0], normalized=False)
+        self.assertEqual(self.calls, 2)
+        fn(graphs[1])
+        fn(graphs[2])
+        self.assertEqual(cache.stats().evictions, 2)
+        fn(graphs[0])
+        self.assertEqual(self.calls, 5)
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.size), (2, 5, 2))
+
+    def test_copy_protects_cache(self):
+        cache = ResultCache()
+        result = cache.call(self.counted, self.DG)
+        result.clear()
+        self.assertEqual(len(cache.call(self.counted, self.DG)), len(self.DG))
+
+    def test_copy_protects_nested_results(self):
+        cache = ResultCache()
+        expansion, elongation = cache.call(get_degree_expansion_elongation, self.DG, None)
+        expansion.clear()
+        self.assertEqual(
+            len(cache.call(get_degree_expansion_elongation, self.DG, None)[0]),
+            len(self.DG),
+        )
+        table = cache.call(get_distance_profile, self.DG)
+        table["expansion"][:] = -1
+        self.assertTrue(
+            (cache.call(get_distance_profile, self.DG)["expansion"] >= 0).all()
+        )
+
+    def test_compiles_once(self):
+        cache = ResultCache()
+        with mock.patch.object(
+                CompiledGraph, "from_networkx", wraps=CompiledGraph.from_networkx) as convert:
+            cache.call(calc_between_centralities, self.DG)
+        self.assertEqual(convert.call_count, 1)
+
+    def test_array_arguments(self):
+        cache = ResultCache()
+        a = np.zeros(2000)
+        b = a.copy()
+        b[1000] = 1
+        self.assertEqual(repr(a), repr(b))
+        self.assertNotEqual(
+            cache.key(self.counted, self.DG, (a,)), cache.key(self.counted, self.DG, (b,))
+        )
+        self.assertEqual(
+            cache.key(self.counted, self.DG, (a,)),
+            cache.key(self.counted, self.DG, (a.copy(),)),
+        )
+
+    def test_disk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first = ResultCache(directory=directory)
+            expected = first.call(self.counted, self.DG)
+            second = ResultCache(directory=directory)
+            self.assertEqual(second.call(self.counted, self.DG), expected)
+            self.assertEqual(self.calls, 1)
+            self.assertEqual(second.stats().disk_hits, 1)
+            second.clear(disk=True)
+            second.call(self.counted, self.DG)
+            self.assertEqual(self.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import math
+import unittest
+import networkx as nx
+import numpy as np
+from grina.closeness import top_k_closeness
+from grina.node import (calc_between_centralities, calc_close_centralities,
+                        calc_degree_centralities, calc_eigen_centralities)
+
+
+def assert_same_items(test, got, expected):
+    test.assertEqual(list(got), list(expected))
+    for node, value in expected.items():
+        if math.isnan(value):
+            test.assertTrue(math.isnan(got[node]))
+        else:
+            test.assertEqual(got[node], value)
+
+
+class TestTopKCloseness(unittest.TestCase):
+    def test_matches_full_closeness(self):
+        graphs = [
+            nx.gnp_random_graph(200, 0.01, seed=1, directed=True),
+            nx.barabasi_albert_graph(300, 2, seed=2),
+            nx.path_graph(30),
+        ]
+        for G in graphs:
+            G.add_node("isolated")
+            G.add_edge(1, 1)
+            full = calc_close_centralities(G)
+            for k in [1, 10, len(G) + 1]:
+                expected = dict(list(full.items())[:k])
+                assert_same_items(self, calc_close_centralities(G, top_k=k), expected)
+
+    def test_empty_results(self):
+        for G in [nx.path_graph(4, create_using=nx.DiGraph), nx.DiGraph()]:
+            self.assertEqual(calc_close_centralities(G, top_k=0), {})
+            self.assertEqual(calc_close_centralities(G, top_k=-1), {})
+            self.assertEqual(len(top_k_closeness(G, 0).table), 0)
+        self.assertEqual(calc_close_centralities(nx.DiGraph(), top_k=3), {})
+
+    def test_top_k_must_be_integer(self):
+        G = nx.path_graph(4, create_using=nx.DiGraph)
+        for fn in [calc_degree_centralities, calc_eigen_centralities,
+                   calc_between_centralities, calc_close_centralities]:
+            for top_k in [1.5, "2", True]:
+                with self.assertRaises(ValueError):
+                    fn(G, top_k=top_k)
+            self.assertEqual(len(fn(G, top_k=np.int64(2))), 2)
+
+    def test_prunes_searches(self):
+        G = nx.barabasi_albert_graph(2000, 3, seed=1)
+        result = top_k_closeness(G, 10)
+        self.assertEqual(len(result.table), 10)
+        self.assertGreater(result.bfs_pruned, len(G) // 2)
+
+    def test_top_k_selection(self):
+        DG = nx.gnp_random_graph(100, 0.05, seed=3, directed=True)
+        for fn in [calc_degree_centralities, calc_eigen_centralities,
+                   calc_between_centralities]:
+            expected = dict(list(fn(DG).items())[:7])
+            self.assertEqual(fn(DG, top_k=7), expected)
+        table = calc_degree_centralities(DG, as_table=True, top_k=3)
+        self.assertEqual(table.nodes, list(calc_degree_centralities(DG))[:3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import networkx as nx
+from grina import *
+
+
+class TestCompiledGraph(unittest.TestCase):
+    def setUp(self):
+        self.DG = nx.gnp_random_graph(40, 0.1, seed=2, directed=True)
+        self.DG.add_edge(0, 0)
+        self.CG = compile_graph(self.DG)
+
+    def test_csr(self):
+        indptr, indices = self.CG.out_csr
+        for i, node in enumerate(self.CG.nodes):
+            succ = {self.CG.nodes[j] for j in indices[indptr[i]:indptr[i + 1]]}
+            self.assertEqual(succ, set(self.DG.successors(node)))
+        g = self.DG.to_undirected()
+        self.assertEqual(self.CG.n_undirected_edges, g.number_of_edges())
+        self.assertEqual(self.CG.undirected_degree().tolist(),
+                         [d for _, d in g.degree(self.CG.nodes)])
+
+    def test_metrics_accept_compiled_graph(self):
+        for fn in [teacher_disciple_degree, colleague_degree,
+                   unidirect_density, bidirect_density,
+                   calc_network_density]:
+            self.assertEqual(fn(self.CG), fn(self.DG))
+        for fn in [node_teacher_disciple_degree, node_colleague_degree,
+                   node_unidirect_density, node_bidirect_density,
+                   get_n_entry, get_n_exit, get_gatekeeper_degree,
+                   calc_degree_centralities, calc_close_centralities]:
+            self.assertEqual(fn(self.CG), fn(self.DG))
+
+    def test_components_accept_compiled_graph(self):
+        G = nx.gnp_random_graph(30, 0.05, seed=3)
+        CG = compile_graph(G)
+        self.assertEqual(components_size(CG), components_size(G))
+        self.assertEqual(components_density(CG), components_density(G))
+
+    def test_from_edges(self):
+        CG = CompiledGraph(["a", "b", "c"], [0, 1, 1], [1, 0, 2])
+        self.assertEqual(colleague_degree(CG), 0.5)
+        self.assertEqual(sorted(CG.to_networkx().edges()),
+                         [("a", "b"), ("b", "a"), ("b", "c")])
+
+
+if __name__ == '__main__':
+    unittest.main()
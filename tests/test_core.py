@@ -0,0 +1,56 @@
+import unittest
+import networkx as nx
+from grina.compiled import compile_graph
+from grina.core import to_unweighted, undirected_view, unweighted_view
+from grina.network import components_size
+
+
+class TestCore(unittest.TestCase):
+    def setUp(self):
+        self.DG = nx.DiGraph()
+        self.DG.add_edge(1, 2, weight=5, label="a")
+        self.DG.add_edge(2, 1, weight=3)
+        self.DG.add_edge(2, 3)
+        self.DG.add_node(4)
+
+    def test_to_unweighted(self):
+        view = to_unweighted(self.DG)
+        self.assertEqual(type(view), nx.DiGraph)
+        self.assertEqual(
+            list(view.edges(data=True)),
+            [(1, 2, {"weight": 1, "label": "a"}), (2, 1, {"weight": 1}),
+             (2, 3, {"weight": 1})],
+        )
+        self.assertEqual(dict(view.in_degree(weight="weight")), {1: 1, 2: 1, 3: 1, 4: 0})
+        self.assertEqual(nx.shortest_path_length(view, 1, 3, weight="weight"), 2)
+        # 元のグラフは変わらず、変更はビューに反映される
+        self.assertEqual(self.DG[1][2]["weight"], 5)
+        self.DG.add_edge(3, 4, weight=9)
+        self.assertEqual(view[3][4], {"weight": 1})
+        with self.assertRaises(nx.NetworkXError):
+            view.add_edge(4, 1)
+        copied = view.copy()
+        copied.add_edge(4, 1)
+        self.assertEqual(copied[1][2], {"weight": 1, "label": "a"})
+        self.assertFalse(self.DG.has_edge(4, 1))
+
+    def test_views(self):
+        view = undirected_view(self.DG, unweighted=True)
+        self.assertEqual(type(view), nx.Graph)
+        self.assertEqual(view.number_of_edges(), 2)
+        self.assertEqual(view[3][2], {"weight": 1})
+        self.assertEqual(components_size(undirected_view(self.DG)), [3, 1])
+        multi = nx.MultiDiGraph([(1, 2, {"weight": 4}), (1, 2, {"weight": 7})])
+        self.assertEqual(
+            list(unweighted_view(multi).edges(keys=True, data="weight")),
+            [(1, 2, 0, 1), (1, 2, 1, 1)],
+        )
+        cg = compile_graph(self.DG)
+        unweighted = unweighted_view(cg)
+        self.assertEqual(unweighted.weight.tolist(), [1, 1, 1])
+        self.assertEqual(cg.weight.tolist(), [5, 3, 1])
+        self.assertIs(unweighted.src, cg.src)
+
+
+if __name__ == "__main__":
+    unittest.main()
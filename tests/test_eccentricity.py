@@ -0,0 +1,38 @@
+import unittest
+import networkx as nx
+from grina.eccentricity import calc_diameter, calc_eccentricities, calc_radius
+
+
+class TestEccentricity(unittest.TestCase):
+    def test_bounded_matches_bfs(self):
+        graphs = [
+            nx.DiGraph(nx.scale_free_graph(300, seed=3)),
+            nx.gnp_random_graph(200, 0.01, seed=1, directed=True),
+            nx.barabasi_albert_graph(300, 2, seed=1),
+        ]
+        for G in graphs:
+            for mode in ["out", "in", "all"]:
+                bfs = calc_eccentricities(G, mode, method="bfs")
+                bounded = calc_eccentricities(G, mode, method="bounded")
+                self.assertEqual(bounded.values, bfs.values)
+                self.assertEqual(bounded.bfs_saved, max(len(G) - bounded.bfs_runs, 0))
+                values = list(bfs.values.values())
+                self.assertEqual(calc_diameter(G, mode), max(values))
+                self.assertEqual(calc_radius(G, mode), min(values))
+
+    def test_bfs_saved(self):
+        G = nx.barabasi_albert_graph(1000, 2, seed=1)
+        result = calc_eccentricities(G, "all")
+        self.assertEqual(result.values, nx.eccentricity(G))
+        self.assertGreater(result.bfs_saved, 0)
+
+    def test_bfs_saved_directed(self):
+        # 有向グラフでは逆方向の探索の分、探索回数がノード数を上回ることがある
+        G = nx.gnp_random_graph(100, 0.05, seed=0, directed=True)
+        result = calc_eccentricities(G, "out")
+        self.assertGreater(result.bfs_runs, len(G))
+        self.assertEqual(result.bfs_saved, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+import networkx as nx
+from grina.eigenvector import sparse_eigenvector_centrality
+
+
+class TestEigenvector(unittest.TestCase):
+    def setUp(self):
+        self.DG = nx.DiGraph(nx.scale_free_graph(300, seed=1))
+        self.DG.add_edges_from([(v, u) for u, v in list(self.DG.edges())[::3]])
+
+    def test_matches_networkx(self):
+        expected = nx.eigenvector_centrality(self.DG, max_iter=1000)
+        result = sparse_eigenvector_centrality(self.DG)
+        self.assertLess(result.residual, len(self.DG) * 1e-06)
+        for node, value in expected.items():
+            self.assertAlmostEqual(result.values[node], value)
+
+    def test_warm_start(self):
+        previous = sparse_eigenvector_centrality(self.DG, tol=1e-08)
+        DG = self.DG.copy()
+        DG.add_edges_from([(1, 200), (5, 17), (300, 4)])
+        cold = sparse_eigenvector_centrality(DG, tol=1e-08)
+        warm = sparse_eigenvector_centrality(DG, tol=1e-08, nstart=previous.values)
+        self.assertLess(warm.n_iter, cold.n_iter)
+        for node, value in cold.values.items():
+            self.assertAlmostEqual(warm.values[node], value, places=5)
+
+    def test_failed_convergence(self):
+        with self.assertRaises(nx.PowerIterationFailedConvergence):
+            sparse_eigenvector_centrality(self.DG, max_iter=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
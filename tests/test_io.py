@@ -0,0 +1,90 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+import networkx as nx
+import numpy as np
+import pandas as pd
+from grina.io import EdgeListBuilder, read_binary_edges, read_edgelist
+from grina.network import colleague_degree, teacher_disciple_degree
+from grina.node import get_n_entry
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def edge_weights(cg):
+    return {
+        (cg.nodes[u], cg.nodes[v]): w
+        for u, v, w in zip(cg.src.tolist(), cg.dst.tolist(), cg.weight.tolist())
+    }
+
+
+class TestIO(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        m = 3000
+        self.edges_df = pd.DataFrame({
+            "source": rng.integers(0, 200, m),
+            "target": rng.integers(0, 200, m),
+            "weight": rng.integers(1, 10, m).astype(float),
+        })
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_read_csv_in_chunks(self):
+        path = self.path("edges.csv")
+        self.edges_df.to_csv(path, index=False)
+        cg = read_edgelist(path, weight="weight", chunksize=250)
+        DG = nx.from_pandas_edgelist(self.edges_df, "source", "target", create_using=nx.DiGraph)
+        self.assertEqual(cg.nodes, list(DG))
+        expected = self.edges_df.groupby(["source", "target"])["weight"].sum().to_dict()
+        self.assertEqual(edge_weights(cg), expected)
+        self.assertEqual(colleague_degree(cg), colleague_degree(DG))
+        self.assertEqual(get_n_entry(cg), get_n_entry(DG))
+
+    def test_aggregate_last_matches_networkx(self):
+        path = self.path("edges.csv")
+        self.edges_df.to_csv(path, index=False)
+        cg = read_edgelist(path, weight="weight", aggregate="last", chunksize=100)
+        DG = nx.from_pandas_edgelist(self.edges_df, "source", "target", ["weight"], create_using=nx.DiGraph)
+        self.assertEqual(edge_weights(cg), {(u, v): w for u, v, w in DG.edges(data="weight")})
+
+    def test_read_binary_edges(self):
+        path = self.path("edges.bin")
+        records = np.empty(len(self.edges_df), dtype=[("source", np.int32), ("target", np.int32)])
+        records["source"] = self.edges_df["source"]
+        records["target"] = self.edges_df["target"]
+        records.tofile(path)
+        cg = read_binary_edges(path, id_dtype=np.int32, chunksize=500)
+        DG = nx.from_pandas_edgelist(self.edges_df, "source", "target", create_using=nx.DiGraph)
+        self.assertEqual(cg.nodes, list(range(200)))
+        self.assertEqual(cg.n_edges, DG.number_of_edges())
+        self.assertEqual(teacher_disciple_degree(cg), teacher_disciple_degree(DG))
+        # 重みの列がない場合はsumで出現回数になる
+        self.assertEqual(cg.weight.sum(), len(self.edges_df))
+
+    def test_undirected_builder(self):
+        builder = EdgeListBuilder(directed=False, aggregate="max")
+        builder.add_edges(["a", "b"], ["b", "c"], [1.0, 2.0])
+        builder.add_edges(["b", "c"], ["a", "c"], [3.0, 4.0])
+        cg = builder.build()
+        self.assertFalse(cg.directed)
+        self.assertEqual(cg.nodes, ["a", "b", "c"])
+        self.assertEqual(edge_weights(cg), {("a", "b"): 3.0, ("b", "c"): 2.0, ("c", "c"): 4.0})
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_read_parquet(self):
+        path = self.path("edges.parquet")
+        self.edges_df.to_parquet(path)
+        cg = read_edgelist(path, weight="weight", chunksize=300)
+        expected = self.edges_df.groupby(["source", "target"])["weight"].sum().to_dict()
+        self.assertEqual(edge_weights(cg), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -84,6 +84,26 @@ class TestNetwork(unittest.TestCase):
         correct = np.array([4, 2])
         self.assertTrue((sizes == correct).all())
 
+    def test_analyze_components(self):
+        columns = ["source", "target", "weight"]
+        edges = [
+            [1, 2, 2],
+            [2, 1, 5],
+            [2, 3, 1],
+            [3, 1, 1],
+            [4, 5, 1],
+        ]
+        edges_df = pd.DataFrame(edges, columns=columns)
+        DG = nx.from_pandas_edgelist(edges_df, "source", "target", ["weight"], create_using=nx.DiGraph)
+        weak = analyze_components(DG, "weak")
+        self.assertEqual(weak.sizes.tolist(), [3, 2])
+        self.assertEqual(weak.n_edges.tolist(), [4, 1])
+        self.assertEqual(weak.densities.tolist(), [4/6, 1/2])
+        self.assertEqual(weak.labels.tolist(), [0, 0, 0, 1, 1])
+        strong = analyze_components(DG, "strong")
+        self.assertEqual(strong.sizes.tolist(), [3, 1, 1])
+        self.assertEqual(strong.n_edges.tolist(), [4, 0, 0])
+
  
 
 if __name__ == '__main__':
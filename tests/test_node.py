@@ -59,6 +59,41 @@ class TestNode(unittest.TestCase):
         correct_dict = {1:1/3 , 2:1/3 , 3:0, 4:0} 
         self.assertTrue([node_dict[l] == correct_dict[l] for l in node_dict.keys()].all())
 
+    def test_degree_features(self):
+        columns = ["source", "target", "weight"]
+        edges = [
+            [1, 2, 2],
+            [1, 3, 5],
+            [2, 1, 6],
+            [2, 4, 1],
+        ]
+        edges_df = pd.DataFrame(edges, columns=columns)
+        DG = nx.from_pandas_edgelist(edges_df, "source", "target", ["weight"], create_using=nx.DiGraph)
+        table = degree_features(DG)
+        self.assertEqual(table.to_dict("in_degree"), {1: 1, 2: 1, 3: 1, 4: 1})
+        self.assertEqual(table.to_dict("out_degree"), {1: 2, 2: 2, 3: 0, 4: 0})
+        self.assertEqual(table.to_dict("out_in_degree"), {1: 1, 2: 1, 3: -1, 4: -1})
+        self.assertEqual(table.to_dict("diff_entry_exit"), {1: 1, 2: 1, 3: 1, 4: 1})
+        self.assertEqual(table.to_dict("inxout_degree"), {1: 2, 2: 2, 3: 0, 4: 0})
+        self.assertEqual(table.to_dict("gatekeeper_degree"), {1: 2**0.5, 2: 2**0.5, 3: 0, 4: 0})
+        self.assertEqual(table.to_dict("in_strength"), {1: 6, 2: 2, 3: 5, 4: 1})
+        self.assertEqual(table.to_dict("out_strength"), {1: 7, 2: 7, 3: 0, 4: 0})
+        self.assertEqual(degree_features(DG, weight=None).to_dict("out_strength"), {1: 2, 2: 2, 3: 0, 4: 0})
+        self.assertEqual(get_n_entry(DG), dict(DG.in_degree()))
+        self.assertEqual(get_out_in_degree(DG), {1: 1, 2: 1, 3: -1, 4: -1})
+
+    def test_degree_wrappers_accept_directed_variants(self):
+        class SubDiGraph(nx.DiGraph):
+            pass
+
+        MDG = nx.MultiDiGraph([(1, 2), (1, 2), (2, 1), (2, 3)])
+        self.assertEqual(get_n_entry(MDG), dict(MDG.in_degree()))
+        self.assertEqual(get_n_exit(MDG), dict(MDG.out_degree()))
+        self.assertEqual(get_out_in_degree(MDG), {1: 1, 2: 0, 3: -1})
+        SDG = SubDiGraph([(1, 2), (2, 3)])
+        self.assertEqual(get_n_entry(SDG), {1: 0, 2: 1, 3: 1})
+        self.assertEqual(get_diff_entry_exit(SDG), {1: 1, 2: 0, 3: 1})
+
 
 
 if __name__ == '__main__':
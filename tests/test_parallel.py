@@ -0,0 +1,114 @@
+import math
+import os
+import unittest
+import networkx as nx
+from unittest import mock
+import grina.node
+from grina.node import (
+    approximate_betweenness_centrality, betweenness_centrality_parallel,
+    calc_between_centralities, calc_close_centralities, get_degree_expansion_elongation,
+    get_distance_profile
+)
+from grina.parallel import close_pool, get_pool
+
+
+def _mapped_shared_memory(_):
+    with open("/proc/self/maps") as f:
+        return [line for line in f if "/dev/shm/psm_" in line]
+
+
+class TestParallel(unittest.TestCase):
+    def tearDown(self):
+        close_pool()
+
+    def test_expansion_elongation(self):
+        DG = nx.gnp_random_graph(120, 0.03, seed=4, directed=True)
+        expected_expansion = {}
+        expected_elongation = {}
+        for node in DG:
+            lengths = nx.shortest_path_length(DG, node)
+            expected_expansion[node] = len(lengths) - 1
+            expected_elongation[node] = max(lengths.values())
+        with mock.patch.object(grina.node, "PARALLEL_THRESHOLD_NODES", 0):
+            for processes in [1, 2]:
+                expansion, elongation = get_degree_expansion_elongation(DG, processes)
+                self.assertEqual(expansion, expected_expansion)
+                self.assertEqual(elongation, expected_elongation)
+
+    def test_distance_profile(self):
+        DG = nx.gnp_random_graph(120, 0.03, seed=4, directed=True)
+        expansion, elongation = get_degree_expansion_elongation(DG)
+        with mock.patch.object(grina.node, "PARALLEL_THRESHOLD_NODES", 0):
+            profile = get_distance_profile(DG, processes=2)
+        self.assertEqual(profile.to_dict("expansion"), expansion)
+        self.assertEqual(profile.to_dict("elongation"), elongation)
+        self.assertTrue(
+            (profile["distance_histogram"].sum(axis=1) == profile["expansion"] + 1).all()
+        )
+        harmonic = nx.harmonic_centrality(DG)
+        profile = get_distance_profile(DG, mode="in")
+        for node, value in profile.to_dict("harmonic_closeness").items():
+            self.assertAlmostEqual(value, harmonic[node])
+
+    def test_distance_profile_closeness(self):
+        # mode="all"の近接中心性はcalc_close_centralitiesと一致し、孤立ノードは0とする
+        DG = nx.gnp_random_graph(150, 0.01, seed=2, directed=True)
+        DG.add_node("isolated")
+        profile = get_distance_profile(DG, mode="all", processes=1)
+        expected = calc_close_centralities(DG)
+        for node, value in profile.to_dict("closeness").items():
+            if math.isnan(expected[node]):
+                self.assertEqual(value, 0)
+            else:
+                self.assertAlmostEqual(value, expected[node])
+        self.assertTrue(math.isnan(expected["isolated"]))
+        # 向きのある探索では一般に一致しない
+        out = get_distance_profile(DG, mode="out", processes=1).to_dict("closeness")
+        self.assertTrue(any(
+            not math.isnan(expected[node]) and abs(out[node] - expected[node]) > 1e-9
+            for node in DG
+        ))
+
+    @unittest.skipUnless(os.path.exists("/proc/self/maps"), "requires /proc")
+    def test_workers_detach_shared_memory(self):
+        DG = nx.gnp_random_graph(120, 0.03, seed=4, directed=True)
+        with mock.patch.object(grina.node, "PARALLEL_THRESHOLD_NODES", 0):
+            get_distance_profile(DG, processes=2)
+        pool = get_pool(2)
+        for mapped in pool.map(_mapped_shared_memory, range(8), chunksize=1):
+            self.assertEqual(mapped, [])
+
+    def test_betweenness_centrality_parallel(self):
+        graphs = [
+            nx.gnp_random_graph(80, 0.05, seed=1, directed=True),
+            nx.barabasi_albert_graph(80, 2, seed=1),
+            nx.path_graph(3),
+        ]
+        for G in graphs:
+            expected = nx.betweenness_centrality(G)
+            actual = betweenness_centrality_parallel(G, processes=2)
+            self.assertEqual(list(actual), list(expected))
+            for node, value in expected.items():
+                self.assertAlmostEqual(actual[node], value)
+
+    def test_approximate_betweenness_centrality(self):
+        G = nx.barabasi_albert_graph(500, 2, seed=1)
+        expected = nx.betweenness_centrality(G)
+        for processes in [1, 2]:
+            actual, error = approximate_betweenness_centrality(
+                G, epsilon=0.2, seed=0, processes=processes
+            )
+            self.assertGreater(error, 0)
+            self.assertLessEqual(error, 0.2)
+            for node, value in expected.items():
+                self.assertLessEqual(abs(actual[node] - value), error)
+        ranking, error = calc_between_centralities(
+            G, time_budget=0.1, seed=0, processes=1, return_error=True
+        )
+        self.assertEqual(len(ranking), len(G))
+        self.assertEqual(list(ranking.values()), sorted(ranking.values(), reverse=True))
+        self.assertGreater(error, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
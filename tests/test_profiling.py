@@ -0,0 +1,71 @@
+import logging
+import unittest
+import networkx as nx
+from grina.compiled import compile_graph
+from grina.node import calc_close_centralities, get_distance_profile, get_n_entry
+from grina.parallel import close_pool
+from grina.profiling import (
+    PHASES, ProfileCollector, disable_profiling, enable_profiling,
+    is_profiling, profile
+)
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.DG = nx.gnp_random_graph(600, 0.01, seed=1, directed=True)
+
+    def tearDown(self):
+        disable_profiling()
+
+    def test_disabled(self):
+        self.assertFalse(is_profiling())
+        collector = ProfileCollector()
+        enable_profiling(collector)
+        disable_profiling(collector)
+        get_n_entry(self.DG)
+        self.assertEqual(len(collector), 0)
+
+    def test_record(self):
+        with profile() as collector:
+            self.assertTrue(is_profiling())
+            result = calc_close_centralities(self.DG)
+        self.assertFalse(is_profiling())
+        self.assertEqual(result, calc_close_centralities(self.DG))
+        self.assertEqual(len(collector), 1)
+        record = collector.records[0]
+        self.assertEqual(record.metric, "grina.node.calc_close_centralities")
+        self.assertEqual(record.n_nodes, 600)
+        self.assertEqual(record.n_edges, self.DG.number_of_edges())
+        self.assertIn("conversion", record.phases)
+        self.assertIn("compute", record.phases)
+        self.assertTrue(set(record.phases) <= set(PHASES))
+        self.assertLessEqual(sum(record.phases.values()), record.wall + 1e-9)
+        self.assertGreater(record.peak_rss, 0)
+
+    def test_nested_and_parallel(self):
+        close_pool()
+        cg = compile_graph(self.DG)
+        with profile(trace_memory=True) as collector:
+            get_n_entry(cg)
+            get_distance_profile(cg, processes=2)
+        # get_n_entryの中のdegree_featuresは外側の呼び出しとして計測する
+        self.assertEqual(
+            [record.metric for record in collector.records],
+            ["grina.node.get_n_entry", "grina.node.get_distance_profile"],
+        )
+        phases = collector.records[1].phases
+        for name in ("pool", "ipc", "compute", "reduction"):
+            self.assertIn(name, phases)
+        self.assertIsNotNone(collector.records[1].peak_traced)
+        summary = collector.summary()
+        self.assertEqual(summary["grina.node.get_n_entry"]["calls"], 1)
+
+    def test_logger(self):
+        enable_profiling()
+        with self.assertLogs("grina", level=logging.INFO) as logs:
+            get_n_entry(self.DG)
+        self.assertIn("grina.node.get_n_entry", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
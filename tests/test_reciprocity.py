@@ -0,0 +1,96 @@
+import math
+import unittest
+import warnings
+import networkx as nx
+import pandas as pd
+from grina.network import (
+    bidirect_density, colleague_degree, teacher_disciple_degree, unidirect_density
+)
+from grina.reciprocity import ReciprocalEdgeIndex, node_reciprocity_table, reciprocity_counts
+
+
+class TestReciprocity(unittest.TestCase):
+    def test_sparse_matches_dense(self):
+        DG = nx.gnp_random_graph(60, 0.1, seed=1, directed=True)
+        DG.add_edge(3, 3)
+        DG.add_edge(4, 5, weight=0)
+        DG.add_edge(5, 4, weight=2)
+        dense = reciprocity_counts(DG, backend="dense")
+        sparse = reciprocity_counts(DG, backend="sparse")
+        self.assertEqual(dense, sparse)
+
+    def test_edgeless_graph(self):
+        DG = nx.DiGraph()
+        DG.add_nodes_from(range(3))
+        for backend in ["dense", "sparse"]:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                self.assertTrue(math.isnan(teacher_disciple_degree(DG, backend)))
+                self.assertTrue(math.isnan(colleague_degree(DG, backend)))
+            self.assertEqual(unidirect_density(DG, backend), 0)
+            self.assertEqual(bidirect_density(DG, backend), 0)
+
+    def test_sparse_counts(self):
+        columns = ["source", "target", "weight"]
+        edges = [
+            [1, 2, 2],
+            [1, 3, 5],
+            [2, 1, 6],
+            [2, 4, 1],
+        ]
+        edges_df = pd.DataFrame(edges, columns=columns)
+        DG = nx.from_pandas_edgelist(edges_df, "source", "target", ["weight"], create_using=nx.DiGraph)
+        counts = reciprocity_counts(DG, backend="sparse")
+        self.assertEqual(counts.bidirect, 1)
+        self.assertEqual(counts.unidirect, 2)
+        self.assertEqual(counts.n_relations, 3)
+
+    def test_node_reciprocity_table(self):
+        columns = ["source", "target", "weight"]
+        edges = [
+            [1, 2, 2],
+            [1, 3, 5],
+            [2, 1, 6],
+            [2, 4, 1],
+        ]
+        edges_df = pd.DataFrame(edges, columns=columns)
+        DG = nx.from_pandas_edgelist(edges_df, "source", "target", ["weight"], create_using=nx.DiGraph)
+        table = node_reciprocity_table(DG)
+        self.assertEqual(table.to_dict("colleague_degree"), {1: 0.5, 2: 0.5, 3: 0, 4: 0})
+        self.assertEqual(table.to_dict("teacher_disciple_degree"), {1: 0.5, 2: 0.5, 3: 1, 4: 1})
+        self.assertEqual(table.to_dict("unidirect_density"), {1: 1/8, 2: 1/8, 3: 1/8, 4: 1/8})
+        self.assertEqual(table.to_dict("bidirect_density"), {1: 1/8, 2: 1/8, 3: 0, 4: 0})
+
+    def test_reciprocal_edge_index(self):
+        DG = nx.DiGraph([(1, 2), (2, 1), (1, 3), (3, 3), (4, 2), (3, 4), (4, 3)])
+        index = ReciprocalEdgeIndex(DG)
+        self.assertEqual(index.n_bidirect, 3)
+        self.assertEqual(index.n_unidirect, 2)
+        self.assertEqual(
+            {frozenset(e) for e in index.bidirect_edges(chunk_size=2)},
+            {frozenset((1, 2)), frozenset((3,)), frozenset((3, 4))},
+        )
+        self.assertEqual(sorted(index.unidirect_edges(chunk_size=1)), [(1, 3), (4, 2)])
+        src, dst = index.unidirect_arrays()
+        self.assertEqual(len(src), 2)
+        self.assertEqual(len(dst), 2)
+
+    def test_reciprocal_edge_index_matches_brute_force(self):
+        DG = nx.gnp_random_graph(100, 0.05, seed=2, directed=True)
+        DG.add_edge(7, 7)
+        expected_unidirect = sorted((u, v) for u, v in DG.edges if not DG.has_edge(v, u))
+        expected_bidirect = {frozenset((u, v)) for u, v in DG.edges if DG.has_edge(v, u)}
+        index = ReciprocalEdgeIndex(DG)
+        self.assertEqual(sorted(index.unidirect_edges()), expected_unidirect)
+        self.assertEqual({frozenset(e) for e in index.bidirect_edges()}, expected_bidirect)
+        self.assertEqual(index.n_bidirect, len(expected_bidirect))
+
+    def test_reciprocal_edge_index_undirected(self):
+        G = nx.path_graph(5)
+        index = ReciprocalEdgeIndex(G)
+        self.assertEqual(index.n_bidirect, 4)
+        self.assertEqual(index.n_unidirect, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import networkx as nx
+import numpy as np
+from grina.compiled import compile_graph
+from grina.parallel import expansion_elongation_arrays, map_sources
+from grina.scheduler import (
+    GROUP_NODES, TINY_COMPONENT_NODES, ComponentSchedule, map_components
+)
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        parts = (
+            [nx.gnp_random_graph(GROUP_NODES + 200, 0.004, seed=1, directed=True)]
+            + [nx.gnp_random_graph(k, 0.2, seed=k, directed=True) for k in range(2, 80, 7)]
+            + [nx.DiGraph([(0, 1)])] * 50
+            + [nx.empty_graph(20, create_using=nx.DiGraph)]
+        )
+        self.cg = compile_graph(nx.disjoint_union_all(parts))
+        self.labels = self.cg.weak_components[1]
+
+    def test_schedule(self):
+        indptr, indices = self.cg.out_csr
+        schedule = ComponentSchedule(self.labels, indptr, indices, n_workers=2)
+        costs = [unit.cost for unit in schedule.units]
+        self.assertEqual(costs, sorted(costs, reverse=True))
+        covered = np.concatenate([
+            schedule.nodes(unit)[unit.sources] for unit in schedule.units
+        ])
+        self.assertEqual(sorted(covered.tolist()), list(range(self.cg.n_nodes)))
+        # 部分グラフは連結成分の境界で区切られている
+        component_sizes = np.bincount(self.labels)
+        for unit in schedule.units:
+            nodes = schedule.nodes(unit)
+            sizes = np.bincount(self.labels[nodes], minlength=len(component_sizes))
+            np.testing.assert_array_equal(sizes[sizes > 0], component_sizes[sizes > 0])
+            if unit.inline:
+                self.assertLessEqual(sizes[sizes > 0].max(), TINY_COMPONENT_NODES)
+        # 大きい成分は始点で分割される
+        self.assertGreater(
+            sum(unit.stop - unit.start > GROUP_NODES for unit in schedule.units), 1
+        )
+
+    def test_max_sources(self):
+        indptr, indices = self.cg.out_csr
+        schedule = ComponentSchedule(self.labels, indptr, indices, n_workers=2)
+        split = ComponentSchedule(
+            self.labels, indptr, indices, n_workers=2, max_sources=16
+        )
+        self.assertTrue(all(len(unit.sources) <= 16 for unit in split.units))
+        self.assertGreater(len(split.units), len(schedule.units))
+        self.assertAlmostEqual(
+            sum(unit.cost for unit in split.units),
+            sum(unit.cost for unit in schedule.units),
+        )
+        covered = np.concatenate([
+            split.nodes(unit)[unit.sources] for unit in split.units
+        ])
+        self.assertEqual(sorted(covered.tolist()), list(range(self.cg.n_nodes)))
+
+    def test_map_components(self):
+        n = self.cg.n_nodes
+        indptr, indices = self.cg.out_csr
+        expected = np.zeros((2, n), dtype=np.int64)
+        for sources, expansion, elongation in map_sources(
+                expansion_elongation_arrays, indptr, indices, np.arange(n),
+                inline=True):
+            expected[:, sources] = expansion, elongation
+        for inline in (True, False):
+            actual = np.zeros((2, n), dtype=np.int64)
+            for nodes, (sources, expansion, elongation) in map_components(
+                    expansion_elongation_arrays, self.labels, indptr, indices,
+                    processes=2, inline=inline):
+                actual[:, nodes[sources]] = expansion, elongation
+            np.testing.assert_array_equal(actual, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
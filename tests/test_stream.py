@@ -0,0 +1,42 @@
+import random
+import unittest
+import networkx as nx
+from grina import *
+from grina.stream import IncrementalMetrics
+
+
+class TestIncrementalMetrics(unittest.TestCase):
+    def test_matches_batch_metrics(self):
+        rng = random.Random(0)
+        DG = nx.DiGraph()
+        DG.add_nodes_from(range(15))
+        metrics = IncrementalMetrics.from_graph(DG)
+        for _ in range(300):
+            u, v = rng.randrange(15), rng.randrange(15)
+            if DG.has_edge(u, v):
+                DG.remove_edge(u, v)
+                metrics.ingest([("remove", u, v)])
+            else:
+                DG.add_edge(u, v)
+                metrics.ingest([("add", u, v)])
+            self.assertAlmostEqual(metrics.teacher_disciple_degree(), teacher_disciple_degree(DG))
+            self.assertAlmostEqual(metrics.colleague_degree(), colleague_degree(DG))
+            self.assertAlmostEqual(metrics.unidirect_density(), unidirect_density(DG))
+            self.assertAlmostEqual(metrics.bidirect_density(), bidirect_density(DG))
+        self.assertEqual(metrics.get_inxout_degree(), get_inxout_degree(DG))
+        self.assertEqual(metrics.get_gatekeeper_degree(), get_gatekeeper_degree(DG))
+        self.assertEqual(metrics.node_teacher_disciple_degree(), node_teacher_disciple_degree(DG))
+        self.assertEqual(metrics.node_colleague_degree(), node_colleague_degree(DG))
+        self.assertEqual(metrics.node_unidirect_density(), node_unidirect_density(DG))
+        self.assertEqual(metrics.node_bidirect_density(), node_bidirect_density(DG))
+
+    def test_remove_missing_edge(self):
+        metrics = IncrementalMetrics()
+        metrics.add_edge(1, 2)
+        self.assertFalse(metrics.add_edge(1, 2))
+        with self.assertRaises(nx.NetworkXError):
+            metrics.remove_edge(2, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+import networkx as nx
+import numpy as np
+from grina.node import calc_degree_centralities, calc_eigen_centralities, degree_features
+from grina.table import NodeTable
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+class TestNodeTable(unittest.TestCase):
+    def setUp(self):
+        self.table = NodeTable(["a", "b", "c"], {"x": np.array([1.0, 3.0, 3.0])})
+
+    def test_to_dict_sort(self):
+        self.assertEqual(list(self.table.to_dict("x", sort=True).items()),
+                         [("b", 3.0), ("c", 3.0), ("a", 1.0)])
+        self.assertEqual(self.table.sort_values("x").nodes, ["b", "c", "a"])
+        self.assertEqual(self.table.sort_values("x").index.tolist(), [1, 2, 0])
+
+    def test_merge_same_nodes_shares_arrays(self):
+        other = NodeTable(["a", "b", "c"], {"y": np.arange(3)})
+        merged = self.table.merge(other)
+        self.assertIs(merged["x"], self.table["x"])
+        self.assertIs(merged["y"], other["y"])
+
+    def test_merge_aligns_nodes(self):
+        other = NodeTable(["c", "d"], {"y": np.array([5, 6])})
+        merged = self.table.merge(other)
+        self.assertEqual(merged.nodes, ["a", "b", "c", "d"])
+        np.testing.assert_array_equal(merged["x"], [1.0, 3.0, 3.0, np.nan])
+        np.testing.assert_array_equal(merged["y"], [np.nan, np.nan, 5, 6])
+        with self.assertRaises(ValueError):
+            self.table.merge(self.table)
+
+    def test_to_pandas_zero_copy(self):
+        DG = nx.gnp_random_graph(30, 0.1, seed=1, directed=True)
+        table = degree_features(DG).merge(calc_degree_centralities(DG, as_table=True))
+        df = table.to_pandas()
+        self.assertEqual(df.index.tolist(), list(DG))
+        self.assertTrue(np.shares_memory(df["in_strength"].to_numpy(), table["in_strength"]))
+        self.assertEqual(df["degree_centrality"].to_dict(), nx.degree_centrality(DG))
+
+    def test_as_table_matches_dict(self):
+        DG = nx.gnp_random_graph(30, 0.1, seed=2, directed=True)
+        table = calc_eigen_centralities(DG, as_table=True)
+        self.assertEqual(table.to_dict("eigenvector_centrality", sort=True),
+                         calc_eigen_centralities(DG))
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_arrow_export(self):
+        import pyarrow.parquet as pq
+        table = self.table.merge(NodeTable(["a", "b", "c"], {"h": np.eye(3)}))
+        arrow = table.to_arrow()
+        self.assertEqual(arrow.column("node").to_pylist(), ["a", "b", "c"])
+        self.assertEqual(arrow.column("h").to_pylist()[1], [0.0, 1.0, 0.0])
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "table.parquet")
+            table.to_parquet(path)
+            self.assertEqual(pq.read_table(path).column("x").to_pylist(), [1.0, 3.0, 3.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
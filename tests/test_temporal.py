@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+import math
+import random
+import unittest
+import networkx as nx
+from grina import *
+from grina.temporal import snapshot_metrics
+
+
+class TestSnapshotMetrics(unittest.TestCase):
+    def test_matches_rebuilt_windows(self):
+        rng = random.Random(1)
+        edges = sorted(
+            (rng.uniform(0, 100), rng.randrange(12), rng.randrange(12), 1.0)
+            for _ in range(400)
+        )
+        metrics = ["colleague_degree", "node_teacher_disciple_degree",
+                   "get_gatekeeper_degree", "calc_eigen_centralities",
+                   "analyze_components", "calc_network_density"]
+        n_windows = 0
+        for start, end, results in snapshot_metrics(edges, 20, 5, metrics, warm_start=False):
+            DG = nx.DiGraph()
+            for t, u, v, w in edges:
+                if start <= t < end:
+                    if DG.has_edge(u, v):
+                        DG[u][v]["weight"] += w
+                    else:
+                        DG.add_edge(u, v, weight=w)
+            self.assertAlmostEqual(results["colleague_degree"], colleague_degree(DG))
+            self.assertEqual(results["node_teacher_disciple_degree"], node_teacher_disciple_degree(DG))
+            self.assertEqual(results["get_gatekeeper_degree"], get_gatekeeper_degree(DG))
+            self.assertEqual(results["calc_network_density"], calc_network_density(DG))
+            self.assertEqual(sorted(results["analyze_components"].sizes.tolist()),
+                             sorted(len(c) for c in nx.weakly_connected_components(DG)))
+            expected = nx.eigenvector_centrality(DG, max_iter=1000, weight=None)
+            for node, value in expected.items():
+                self.assertAlmostEqual(results["calc_eigen_centralities"][node], value, places=4)
+            n_windows += 1
+        self.assertEqual(n_windows, 20)
+
+    def test_eigen_warm_start(self):
+        # 強連結なグラフでは固有ベクトルが一意なので、初期値によらず一致する
+        edges = [(t, t % 6, (t + 1) % 6) for t in range(30)]
+        edges += [(t + 0.5, (t + 1) % 6, t % 6) for t in range(30)]
+        edges.sort()
+        metrics = ["calc_eigen_centralities"]
+        warm = list(snapshot_metrics(edges, 12, 3, metrics))
+        cold = list(snapshot_metrics(edges, 12, 3, metrics, warm_start=False))
+        self.assertEqual(len(warm), len(cold))
+        for (_, _, w), (_, _, c) in zip(warm, cold):
+            for key, value in c["calc_eigen_centralities"].items():
+                self.assertAlmostEqual(w["calc_eigen_centralities"][key], value, places=4)
+
+    def test_unavailable_metric_is_nan(self):
+        edges = [(0, "a", "b"), (10, "b", "a")]
+        results = [r for _, _, r in snapshot_metrics(edges, 1, 1, ["colleague_degree", "calc_eigen_centralities"])]
+        self.assertEqual(results[0]["colleague_degree"], 0)
+        # 辺のない窓は空グラフになり計算できない
+        self.assertTrue(math.isnan(results[1]["colleague_degree"]))
+        self.assertTrue(math.isnan(results[1]["calc_eigen_centralities"]))
+        self.assertEqual(results[-1]["colleague_degree"], 0)
+
+    def test_unknown_metric(self):
+        with self.assertRaises(ValueError):
+            list(snapshot_metrics([(0, 1, 2)], 1, 1, ["no_such_metric"]))
+
+    def test_undirected_metric(self):
+        for name in ["components_size", "components_density"]:
+            with self.assertRaises(ValueError):
+                list(snapshot_metrics([(0, 1, 2)], 1, 1, [name]))
+        (_, _, result), = snapshot_metrics([(0, 1, 2)], 1, 1, ["analyze_components"])
+        self.assertIn("analyze_components", result)
+
+    def test_invalid_window(self):
+        edges = [(0, 1, 2), (5, 2, 1)]
+        for window, slide in [(3, 0), (3, -1), (0, 1), (-3, 1)]:
+            with self.assertRaises(ValueError):
+                list(snapshot_metrics(edges, window, slide, ["colleague_degree"]))
+        with self.assertRaises(ValueError):
+            list(snapshot_metrics(
+                [(datetime(2024, 1, 1), 1, 2)], timedelta(days=1), timedelta(0),
+                ["colleague_degree"],
+            ))
+
+
+if __name__ == '__main__':
+    unittest.main()